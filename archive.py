@@ -0,0 +1,106 @@
+"""
+Archivado de datos históricos para el Sistema de Gestión de Cine.
+
+Los horarios que empezaron hace más de ARCHIVE_AFTER_DAYS días se mueven,
+junto con sus reservas, a `showtimes_archive` y `bookings_archive` por lotes
+(un commit por lote). Así los índices de las tablas vivas solo cubren el
+futuro y el pasado reciente; los endpoints de lectura pueden incluir el
+archivo con `include_archived=true`.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, delete, insert, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from jobs import job
+from metrics import Counter
+from models import Booking, BookingArchive, Showtime, ShowtimeArchive
+from schemas import ArchiveReport
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+# Horarios por lote; cada lote arrastra todas sus reservas
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+rows_archived = Counter("archived_rows_total", "Filas movidas a las tablas de archivo")
+
+
+def with_archived(model, archive_model):
+    """
+    Subconsulta `UNION ALL` de la tabla viva y su archivo.
+
+    Expone las columnas de la tabla viva, de modo que sirve igual que el
+    modelo en los filtros y en los esquemas de respuesta.
+    """
+    names = [column.name for column in model.__table__.columns]
+    return union_all(
+        select(*[model.__table__.c[name] for name in names]),
+        select(*[archive_model.__table__.c[name] for name in names]),
+    ).subquery(model.__tablename__)
+
+
+def _copy_columns(model, archived_at: datetime):
+    """Columnas de `model` más `archived_at`, para INSERT ... SELECT al archivo."""
+    columns = list(model.__table__.columns)
+    names = [column.name for column in columns]
+    return [*names, "archived_at"], select(*columns, literal(archived_at, DateTime))
+
+
+async def archive_batch(db: AsyncSession, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE):
+    """
+    Mueve un lote de horarios que empezaron antes de `cutoff` y sus reservas.
+
+    Todo el lote se copia y se borra en una transacción. Devuelve
+    `(horarios, reservas)` archivados.
+    """
+    result = await db.execute(
+        select(Showtime.id).where(Showtime.start_time < cutoff).order_by(Showtime.id).limit(batch_size)
+        .execution_options(include_deleted=True)
+    )
+    ids = result.scalars().all()
+    if not ids:
+        return 0, 0
+
+    now = datetime.utcnow()
+    names, stmt = _copy_columns(Booking, now)
+    await db.execute(insert(BookingArchive).from_select(names, stmt.where(Booking.showtime_id.in_(ids))))
+    names, stmt = _copy_columns(Showtime, now)
+    await db.execute(insert(ShowtimeArchive).from_select(names, stmt.where(Showtime.id.in_(ids))))
+
+    bookings = await db.execute(delete(Booking).where(Booking.showtime_id.in_(ids)))
+    await db.execute(delete(Showtime).where(Showtime.id.in_(ids)))
+    await db.commit()
+
+    rows_archived.inc(len(ids), table="showtimes")
+    rows_archived.inc(bookings.rowcount, table="bookings")
+    return len(ids), bookings.rowcount
+
+
+async def archive_old_data(
+    db: AsyncSession,
+    older_than: Optional[timedelta] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> ArchiveReport:
+    """Archiva por lotes todo lo que empezó hace más de `older_than`."""
+    if older_than is None:
+        older_than = timedelta(days=ARCHIVE_AFTER_DAYS)
+    cutoff = datetime.utcnow() - older_than
+    showtimes = 0
+    bookings = 0
+    while True:
+        batch_showtimes, batch_bookings = await archive_batch(db, cutoff, batch_size)
+        if batch_showtimes == 0:
+            break
+        showtimes += batch_showtimes
+        bookings += batch_bookings
+    return ArchiveReport(cutoff=cutoff, showtimes=showtimes, bookings=bookings)
+
+
+@job("archive.run")
+async def archive_job(db: AsyncSession, payload: dict):
+    """Trabajo en segundo plano de archivado. Payload: `older_than_days` (opcional)."""
+    days = payload.get("older_than_days")
+    await archive_old_data(db, timedelta(days=days) if days is not None else None)
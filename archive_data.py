@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Script para archivar horarios antiguos y sus reservas.
+
+Mueve por lotes a `showtimes_archive` y `bookings_archive` los horarios que
+empezaron hace más de N días.
+
+Uso:
+    python archive_data.py [--days 365] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archive_old_data
+from database import async_session
+
+
+async def main(args) -> bool:
+    """Archiva los datos anteriores al corte."""
+    try:
+        print(f"🗄️  Archivando horarios de hace más de {args.days:g} días...")
+        async with async_session() as session:
+            report = await archive_old_data(session, timedelta(days=args.days), args.batch_size)
+        print(f"✅ Archivados {report.showtimes} horarios y {report.bookings} reservas (anteriores a {report.cutoff:%Y-%m-%d})")
+    except Exception as e:
+        print(f"❌ Error archivando datos: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivar horarios y reservas antiguos")
+    parser.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    success = asyncio.run(main(parser.parse_args()))
+    exit(0 if success else 1)
@@ -4,25 +4,44 @@ Módulo de autenticación para el Sistema de Gestión de Cine.
 Incluye funciones para hashing de contraseñas, creación de tokens JWT y verificación.
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import BackgroundTasks, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database import get_db
-from models import User
+from jwt_keys import SIGNING_ALGORITHM, key_registry, token_verifications, verified_tokens
+from metrics import Counter
+from models import User, UserRole
+from passwords import pwd_context
 from schemas import TokenData
+from tokens import ACCESS_TOKEN_EXPIRE_MINUTES, new_token_id, token_denylist
 
-# Configuración de seguridad
-SECRET_KEY = "your-secret-key-here"  # En producción, usar variable de entorno
+# Configuración de seguridad. Sin JWT_KEYS_DIR se firma con HS256 y este
+# secreto; con él, con ES256 y las claves del directorio (ver jwt_keys.py).
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Contexto para hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pool acotado para bcrypt: no bloquea el event loop y limita el CPU que
+# pueden consumir los logins; si hay demasiados esperando se rechaza.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+password_rehashes = Counter("password_rehashes_total", "Hashes de contraseña actualizados al perfil actual")
+
+
+class PasswordHashPoolBusy(Exception):
+    """Hay demasiadas verificaciones de contraseña en cola."""
 
 # Esquema OAuth2 para tokens
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -35,45 +54,135 @@ def get_password_hash(password: str) -> str:
     """Genera el hash de una contraseña."""
     return pwd_context.hash(password)
 
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """Hash con el mismo coste que los reales, para usuarios inexistentes."""
+    return pwd_context.hash("dummy-password-for-unknown-users")
+
+async def verify_password_async(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """
+    Verifica la contraseña en el pool acotado.
+
+    Sin hash (usuario inexistente) verifica contra un hash ficticio y
+    devuelve False, de modo que ambos casos tardan lo mismo.
+    """
+    if _hash_slots.locked():
+        raise PasswordHashPoolBusy()
+    async with _hash_slots:
+        loop = asyncio.get_running_loop()
+        if hashed_password is None:
+            await loop.run_in_executor(_hash_executor, verify_password, plain_password, _dummy_password_hash())
+            return False
+        return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Crea un token de acceso JWT."""
+    """Crea un token de acceso JWT de vida corta, con un `jti` revocable."""
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(days=1)  # Token con 1 día de vida
-    to_encode.update({"exp": expire})
+        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "jti": new_token_id()})
+    if key_registry is not None:
+        kid, key = key_registry.signing_key()
+        return jwt.encode(to_encode, key, algorithm=SIGNING_ALGORITHM, headers={"kid": kid})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verifica la firma y caducidad de un token y devuelve su payload.
+
+    Lanza `JWTError` si no es válido. Los tokens ya verificados se sirven
+    de `verified_tokens` sin repetir la criptografía.
+    """
+    payload = verified_tokens.get(token)
+    if payload is not None:
+        token_verifications.inc(result="cached")
+        return payload
+    try:
+        if key_registry is not None:
+            key = key_registry.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise JWTError("Unknown signing key")
+            payload = jwt.decode(token, key, algorithms=[SIGNING_ALGORITHM])
+        else:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        token_verifications.inc(result="invalid")
+        raise
+    token_verifications.inc(result="verified")
+    verified_tokens.put(token, payload)
+    return payload
+
 async def get_user(db: AsyncSession, username: str) -> Optional[User]:
     """Obtiene un usuario por nombre de usuario."""
     result = await db.execute(select(User).where(User.username == username))
     return result.scalars().first()
 
-async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
-    """Autentica a un usuario con nombre de usuario y contraseña."""
+async def rehash_password(session_factory, user_id: int, password: str, old_hash: str):
+    """
+    Rehace el hash de la contraseña con el perfil actual.
+
+    Se ejecuta después de responder al login. Si el pool de hashing está
+    lleno se deja para el siguiente login; el UPDATE es condicional para no
+    pisar un cambio de contraseña hecho mientras tanto.
+    """
+    if _hash_slots.locked():
+        return
+    async with _hash_slots:
+        loop = asyncio.get_running_loop()
+        new_hash = await loop.run_in_executor(_hash_executor, get_password_hash, password)
+    async with session_factory() as session:
+        result = await session.execute(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        await session.commit()
+    if result.rowcount:
+        password_rehashes.inc()
+
+async def authenticate_user(
+    db: AsyncSession,
+    username: str,
+    password: str,
+    background_tasks: Optional[BackgroundTasks] = None,
+    session_factory=None,
+) -> Optional[User]:
+    """
+    Autentica a un usuario con nombre de usuario y contraseña.
+
+    Si el hash no corresponde al perfil actual y se pasan `background_tasks`
+    y `session_factory`, se rehace tras responder (ver `rehash_password`).
+    """
     user = await get_user(db, username)
-    if not user:
-        return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash if user else None):
         return None
+    if background_tasks is not None and pwd_context.needs_update(user.password_hash):
+        background_tasks.add_task(rehash_password, session_factory, user.id, password, user.password_hash)
     return user
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+async def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+) -> User:
     """Obtiene el usuario actual desde el token JWT."""
+    # Sub-petición de POST /batch: el lote ya autenticó este mismo token
+    batch_user = request.scope.get("batch_user")
+    if batch_user is not None:
+        return batch_user
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         print("--- FLAG ---")
         print("--- FLAG ---")
         print("--- FLAG ---")
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or token_denylist.is_revoked(payload):
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
@@ -83,6 +192,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         raise credentials_exception
     return user
 
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """Devuelve el payload de un token de acceso válido y no revocado."""
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        payload = None
+    if payload is None or token_denylist.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Obtiene el usuario actual activo."""
     return current_user
@@ -102,18 +225,24 @@ async def get_current_empleado(current_user: User = Depends(get_current_user)) -
 
 async def get_current_gerente(current_user: User = Depends(get_current_user)) -> User:
     """Verifica que el usuario sea gerente."""
-    if current_user.role != "gerente":
+    if current_user.role != UserRole.gerente:
         raise HTTPException(status_code=403, detail="Not enough permissionsss")
     return current_user
 
+async def get_current_staff(current_user: User = Depends(get_current_user)) -> User:
+    """Verifica que el usuario sea empleado o gerente."""
+    if current_user.role not in (UserRole.empleado, UserRole.gerente):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return current_user
+
 async def get_current_gerente_optional(token: Optional[str] = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Optional[User]:
     """Obtiene el gerente actual si está autenticado, None si no."""
     if not token:
         return None
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or token_denylist.is_revoked(payload):
             return None
         user = await get_user(db, username=username)
         if user and user.role == "gerente":
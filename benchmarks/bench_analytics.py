@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los reportes de analítica.
+
+Genera un año de reservas sintéticas y compara el GROUP BY ad hoc sobre
+`bookings` con la lectura de las tablas de agregados.
+
+Uso:
+    python benchmarks/bench_analytics.py --bookings 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Booking, DailySales, Movie, MovieSales, Showtime
+from rollups import rebuild_rollups
+
+MOVIES = 200
+SHOWTIMES = 20_000
+SEED_BATCH = 50_000
+
+
+async def seed(session_factory, bookings: int):
+    """Inserta películas, horarios y un año de reservas."""
+    rng = random.Random(7)
+    start = datetime(2031, 1, 1)
+    async with session_factory() as session:
+        await session.execute(insert(Movie), [{"title": f"Movie {i}", "duration": 120} for i in range(MOVIES)])
+        await session.execute(insert(Showtime), [
+            {
+                "movie_id": i % MOVIES + 1,
+                "theater": f"Sala {i % 50}",
+                "start_time": start + timedelta(hours=i // 2),
+                "end_time": start + timedelta(hours=i // 2 + 2),
+                "price": 1000,
+            }
+            for i in range(SHOWTIMES)
+        ])
+        for offset in range(0, bookings, SEED_BATCH):
+            await session.execute(insert(Booking), [
+                {
+                    "user_id": 1,
+                    "showtime_id": rng.randint(1, SHOWTIMES),
+                    "seats_booked": 2,
+                    "total_price": 2000,
+                    "booking_time": start + timedelta(minutes=rng.randint(0, 525_600)),
+                    "status": "confirmed",
+                }
+                for _ in range(offset, min(offset + SEED_BATCH, bookings))
+            ])
+        await session.commit()
+
+
+async def timed(name, session_factory, stmt, repeat=5):
+    """Ejecuta la consulta varias veces y reporta la mejor marca."""
+    best = float("inf")
+    async with session_factory() as session:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = (await session.execute(stmt)).all()
+            best = min(best, time.perf_counter() - started)
+    print(f"{name:<22} rows={len(rows):>6} best={best * 1000:>9.2f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=300_000)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"Insertando {args.bookings:,} reservas...")
+    await seed(session_factory, args.bookings)
+    async with session_factory() as session:
+        await rebuild_rollups(session)
+
+    await timed("adhoc revenue/movie", session_factory,
+                select(Showtime.movie_id, func.sum(Booking.total_price))
+                .join(Booking, Booking.showtime_id == Showtime.id)
+                .group_by(Showtime.movie_id))
+    await timed("rollup revenue/movie", session_factory,
+                select(MovieSales.movie_id, MovieSales.revenue).order_by(MovieSales.revenue.desc()))
+    await timed("adhoc sales/day", session_factory,
+                select(func.date(Booking.booking_time), func.sum(Booking.total_price))
+                .group_by(func.date(Booking.booking_time)))
+    await timed("rollup sales/day", session_factory,
+                select(DailySales).order_by(DailySales.day))
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark del archivado de horarios y reservas.
+
+Genera cinco años de horarios y reservas sintéticos (cuatro en el pasado y
+uno en el futuro), mide el tamaño de los índices de las tablas vivas y la
+latencia de las consultas habituales, archiva lo anterior a un año y repite
+las mediciones.
+
+Uso:
+    python benchmarks/bench_archive.py --bookings 50000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from archive import archive_old_data
+from database import Base
+from models import Booking, Movie, Showtime
+
+MOVIES = 500
+SHOWTIMES_PER_DAY = 200
+PAST_DAYS = 4 * 365
+FUTURE_DAYS = 365
+SEED_BATCH = 50_000
+
+
+async def seed(session_factory, bookings: int):
+    """Inserta horarios de cinco años y reservas repartidas entre ellos."""
+    rng = random.Random(5)
+    now = datetime.utcnow().replace(microsecond=0)
+    first_day = now - timedelta(days=PAST_DAYS)
+    showtimes = (PAST_DAYS + FUTURE_DAYS) * SHOWTIMES_PER_DAY
+    async with session_factory() as session:
+        await session.execute(insert(Movie), [{"title": f"Movie {i}", "duration": 120} for i in range(MOVIES)])
+        for offset in range(0, showtimes, SEED_BATCH):
+            await session.execute(insert(Showtime), [
+                {
+                    "id": i + 1,
+                    "movie_id": i % MOVIES + 1,
+                    "theater": f"Sala {i % SHOWTIMES_PER_DAY}",
+                    "start_time": first_day + timedelta(minutes=i * 1440 // SHOWTIMES_PER_DAY),
+                    "end_time": first_day + timedelta(minutes=i * 1440 // SHOWTIMES_PER_DAY + 120),
+                    "available_seats": 100,
+                    "capacity": 100,
+                    "price": 1000,
+                }
+                for i in range(offset, min(offset + SEED_BATCH, showtimes))
+            ])
+        for offset in range(0, bookings, SEED_BATCH):
+            rows = []
+            for _ in range(offset, min(offset + SEED_BATCH, bookings)):
+                showtime_id = rng.randint(1, showtimes)
+                rows.append({
+                    "user_id": rng.randint(1, 100_000),
+                    "showtime_id": showtime_id,
+                    "seats_booked": 2,
+                    "total_price": 2000,
+                    "booking_time": first_day + timedelta(minutes=(showtime_id - 1) * 1440 // SHOWTIMES_PER_DAY - rng.randint(0, 20_000)),
+                    "status": "confirmed",
+                })
+            await session.execute(insert(Booking), rows)
+        await session.commit()
+    return now
+
+
+async def index_sizes(session) -> dict:
+    """Tamaño en bytes de los índices de `showtimes` y `bookings`."""
+    if session.get_bind().dialect.name == "postgresql":
+        result = await session.execute(text(
+            "SELECT relname, pg_indexes_size(relname::regclass) FROM pg_class "
+            "WHERE relname IN ('showtimes', 'bookings')"
+        ))
+    else:
+        result = await session.execute(text(
+            "SELECT tbl_name, SUM(pgsize) FROM dbstat JOIN sqlite_master ON dbstat.name = sqlite_master.name "
+            "WHERE sqlite_master.type = 'index' AND tbl_name IN ('showtimes', 'bookings') GROUP BY tbl_name"
+        ))
+    return dict(result.all())
+
+
+async def measure(label, session_factory, now, repeat=20):
+    """Tamaño de índices y mejor latencia de las consultas habituales."""
+    queries = {
+        "next 7 days": select(Showtime.id, Showtime.start_time)
+        .where(Showtime.start_time >= now, Showtime.start_time < now + timedelta(days=7))
+        .order_by(Showtime.start_time),
+        "bookings last 7d": select(func.count()).select_from(Booking)
+        .where(Booking.booking_time >= now - timedelta(days=7)),
+        "user bookings": select(Booking.id).where(Booking.user_id == 42),
+        "count showtimes": select(func.count()).select_from(Showtime),
+    }
+    async with session_factory() as session:
+        sizes = await index_sizes(session)
+        print(f"[{label}] índices: " + ", ".join(f"{t}={s / 2**20:,.1f} MiB" for t, s in sorted(sizes.items())))
+        for name, stmt in queries.items():
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                (await session.execute(stmt)).all()
+                best = min(best, time.perf_counter() - started)
+            print(f"[{label}] {name:<18} best={best * 1000:>9.3f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=2_000_000)
+    parser.add_argument("--days", type=float, default=365, help="Archivar lo anterior a N días")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"Insertando {args.bookings:,} reservas...")
+    now = await seed(session_factory, args.bookings)
+    await measure("antes", session_factory, now)
+
+    started = time.perf_counter()
+    async with session_factory() as session:
+        report = await archive_old_data(session, timedelta(days=args.days), args.batch_size)
+        if session.get_bind().dialect.name == "sqlite":
+            # Reconstruir los índices para que reflejen las filas borradas
+            await session.execute(text("VACUUM"))
+    print(
+        f"Archivados {report.showtimes:,} horarios y {report.bookings:,} reservas "
+        f"en {time.perf_counter() - started:.1f} s"
+    )
+    await measure("después", session_factory, now)
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
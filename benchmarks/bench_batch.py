@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark de POST /batch frente a peticiones sueltas.
+
+Simula la pantalla de inicio de la app (catálogo, horarios, reservas,
+perfil y fichas) contra la aplicación completa en proceso, con un retardo
+de red por petición HTTP (`--rtt-ms`). Compara:
+
+- secuencial: una petición tras otra por la misma conexión;
+- concurrente: todas a la vez (cada una paga middlewares y autenticación);
+- batch: un único POST /batch (un viaje de red, una autenticación).
+
+Uso:
+    python benchmarks/bench_batch.py --rounds 50 --rtt-ms 40
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def seed(session_factory, movies: int):
+    from auth import create_access_token, get_password_hash
+    from models import Movie, Showtime, User, UserRole
+
+    async with session_factory() as session:
+        user = User(
+            username="bench", email="bench@example.com",
+            password_hash=get_password_hash("benchpass"), role=UserRole.cliente,
+        )
+        session.add(user)
+        start = datetime.now() + timedelta(days=1)
+        for i in range(movies):
+            movie = Movie(title=f"Película {i}", description="Sinopsis " * 20, duration=110, genre="Drama")
+            session.add(movie)
+            await session.flush()
+            for j in range(3):
+                session.add(Showtime(
+                    movie_id=movie.id, theater=f"Sala {j}", start_time=start + timedelta(hours=3 * j),
+                    end_time=start + timedelta(hours=3 * j + 2), available_seats=100, capacity=100, price=900,
+                ))
+        await session.commit()
+        return user.id, create_access_token({"sub": user.username})
+
+
+def launch_screen(user_id: int):
+    return [
+        {"method": "GET", "path": "/movies/?limit=20&fields=title,genre"},
+        {"method": "GET", "path": "/showtimes/?limit=50"},
+        {"method": "GET", "path": "/bookings/"},
+        {"method": "GET", "path": f"/users/{user_id}"},
+        {"method": "GET", "path": "/movies/1"},
+        {"method": "GET", "path": "/movies/2"},
+        {"method": "GET", "path": "/showtimes/1"},
+        {"method": "GET", "path": "/showtimes/2"},
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--movies", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=40, help="Retardo de red simulado por petición HTTP")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["SQL_ECHO"] = "false"
+    os.environ["RESPONSE_CACHE_SECONDS"] = "0"  # medir las consultas, no la caché
+
+    from httpx import ASGITransport, AsyncClient
+
+    from database import Base, async_session, engine
+    from main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    user_id, token = await seed(async_session, args.movies)
+    headers = {"Authorization": f"Bearer {token}"}
+    calls = launch_screen(user_id)
+    rtt = args.rtt_ms / 1000
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        async def request(method, path, **kwargs):
+            await asyncio.sleep(rtt)
+            return await client.request(method, path, headers=headers, **kwargs)
+
+        async def sequential():
+            return [await request(call["method"], call["path"]) for call in calls]
+
+        async def concurrent():
+            return await asyncio.gather(*(request(call["method"], call["path"]) for call in calls))
+
+        async def batched():
+            return await request("POST", "/batch", json={"requests": calls})
+
+        for name, scenario in (("secuencial", sequential), ("concurrente", concurrent), ("batch", batched)):
+            warmup = await scenario()  # calentamiento
+            if name == "batch":
+                statuses = sorted(item["status"] for item in warmup.json()["responses"])
+                print(f"estados de las sub-peticiones: {statuses}")
+            timings = []
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                await scenario()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(
+                f"{name:<12} {len(calls)} llamadas: p50 {statistics.median(timings):>7.1f} ms  "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:>7.1f} ms"
+            )
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
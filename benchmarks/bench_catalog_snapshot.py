@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la instantánea en memoria del catálogo.
+
+Mide la memoria de una instantánea (registros e índices) por cada 100.000
+películas, el tiempo de montarla y de aplicar un cambio incremental, y la
+latencia de leer una película y una página desde la instantánea frente a
+la consulta a la base de datos.
+
+Uso:
+    python benchmarks/bench_catalog_snapshot.py --movies 100000 --description-bytes 300
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GENRES = ["Drama", "Comedia", "Acción", "Terror", "Animación", "Documental", "Drama, Comedia"]
+
+
+def rows(count: int, description_bytes: int):
+    rng = random.Random(1)
+    now = datetime(2026, 1, 1)
+    for i in range(1, count + 1):
+        yield {
+            "id": i,
+            "title": f"Película {i}",
+            "description": ("Sinopsis " * (description_bytes // 9 + 1))[:description_bytes],
+            "duration": rng.randint(80, 180),
+            "genre": rng.choice(GENRES),
+            "release_date": now - timedelta(days=rng.randint(0, 20000)),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+async def database_reads(count: int, description_bytes: int, lookups: int, url: str):
+    """Latencia media de leer por id y una página de 100 desde la BD."""
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.future import select
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    from models import Movie
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        batch = []
+        for row in rows(count, description_bytes):
+            batch.append(row)
+            if len(batch) == 5000:
+                await conn.execute(insert(Movie.__table__), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(Movie.__table__), batch)
+
+    rng = random.Random(2)
+    async with session_factory() as session:
+        started = time.perf_counter()
+        for _ in range(lookups):
+            (await session.execute(select(Movie).where(Movie.id == rng.randint(1, count)))).scalars().first()
+            session.expunge_all()
+        by_id = (time.perf_counter() - started) / lookups
+        started = time.perf_counter()
+        for _ in range(lookups // 10 or 1):
+            (await session.execute(select(Movie).order_by(Movie.id).offset(rng.randint(0, count - 100)).limit(100))).scalars().all()
+            session.expunge_all()
+        page = (time.perf_counter() - started) / (lookups // 10 or 1)
+    await engine.dispose()
+    return by_id, page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--description-bytes", type=int, default=300)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--skip-database", action="store_true", help="No medir las lecturas desde la BD")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    from catalog import CatalogMovie, CatalogSnapshot, _record
+
+    class Row:
+        __slots__ = CatalogMovie._fields
+
+        def __init__(self, data):
+            for name in self.__slots__:
+                setattr(self, name, data[name])
+
+    # Memoria: registros, cadenas e índices creados para la instantánea
+    tracemalloc.start()
+    snapshot = CatalogSnapshot(1, {
+        row.id: _record(row) for row in (Row(data) for data in rows(args.movies, args.description_bytes))
+    })
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_100k = size * 100_000 / args.movies
+    print(f"instantánea de {args.movies:,} películas: {size / 2**20:.1f} MiB "
+          f"({per_100k / 2**20:.1f} MiB por 100k, descripción de {args.description_bytes} bytes)")
+
+    source = [Row(data) for data in rows(args.movies, args.description_bytes)]
+    started = time.perf_counter()
+    snapshot = CatalogSnapshot(1, {row.id: _record(row) for row in source})
+    print(f"montaje completo: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    snapshot.apply(2, {1: None, args.movies + 1: _record(source[0])._replace(id=args.movies + 1)})
+    print(f"cambio incremental (nueva instantánea): {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    rng = random.Random(2)
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        snapshot.get(rng.randint(1, args.movies))
+    by_id = (time.perf_counter() - started) / args.lookups
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        snapshot.page(rng.randint(0, args.movies - 100), 100)
+    page = (time.perf_counter() - started) / args.lookups
+    print(f"instantánea: por id {by_id * 1e6:8.2f} µs   página de 100 {page * 1e6:8.2f} µs")
+
+    if not args.skip_database:
+        tmpdir = None
+        url = args.database_url
+        if url is None:
+            tmpdir = tempfile.TemporaryDirectory()
+            url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+        db_by_id, db_page = asyncio.run(database_reads(args.movies, args.description_bytes, args.lookups, url))
+        print(f"base de datos: por id {db_by_id * 1e6:8.2f} µs   página de 100 {db_page * 1e6:8.2f} µs")
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
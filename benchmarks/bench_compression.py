@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compresión de respuestas: CPU frente a bytes ahorrados.
+
+Serializa listados de películas y horarios como los de la API y, para cada
+codificación y nivel disponibles, mide el tiempo de CPU, el ratio y el
+tiempo de transferencia estimado en un enlace lento. Muestra también el
+coste amortizado de la caché precomprimida (una compresión por página).
+
+Uso:
+    python benchmarks/bench_compression.py --rows 100 --link-mbps 2
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compression
+from compression import available_encodings, compress
+from schemas import MovieResponse, ShowtimeResponse
+
+LEVELS = {
+    "gzip": ("GZIP_LEVEL", [1, 5, 9]),
+    "br": ("BROTLI_QUALITY", [1, 4, 11]),
+    "zstd": ("ZSTD_LEVEL", [1, 3, 19]),
+}
+GENRES = ["Drama", "Comedia", "Acción", "Terror", "Animación", "Documental"]
+
+
+def payloads(rows: int) -> dict:
+    """Cuerpos JSON representativos de los listados."""
+    rng = random.Random(1)
+    now = datetime(2026, 1, 1, 20, 0)
+    movies = [
+        MovieResponse(
+            id=i, title=f"Película {i}", description="Sinopsis de la película " * rng.randint(2, 8),
+            duration=rng.randint(80, 180), genre=rng.choice(GENRES),
+            release_date=now - timedelta(days=rng.randint(0, 3000)), created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    showtimes = [
+        ShowtimeResponse(
+            id=i, movie_id=rng.randint(1, rows), theater=f"Sala {i % 12}",
+            start_time=now + timedelta(minutes=30 * i), end_time=now + timedelta(minutes=30 * i + 120),
+            available_seats=rng.randint(0, 200), capacity=200, seats_sold=0, price=rng.choice([800, 1000, 1200]),
+            created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    return {
+        "movies": ("[" + ",".join(m.model_dump_json() for m in movies) + "]").encode(),
+        "showtimes": ("[" + ",".join(s.model_dump_json() for s in showtimes) + "]").encode(),
+    }
+
+
+def cpu_time(function, repeat: int) -> float:
+    """Mejor tiempo de CPU de `repeat` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        function()
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Filas por listado (limit)")
+    parser.add_argument("--link-mbps", type=float, default=2.0, help="Ancho de banda del cliente")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--hits", type=int, default=100, help="Peticiones por entrada de caché y TTL")
+    args = parser.parse_args()
+
+    defaults = {setting: getattr(compression, setting) for setting, _ in LEVELS.values()}
+
+    bytes_per_ms = args.link_mbps * 1_000_000 / 8 / 1000
+    for name, body in payloads(args.rows).items():
+        print(f"\n{name}: {len(body):,} bytes sin comprimir, {len(body) / bytes_per_ms:.1f} ms de transferencia")
+        print(f"{'codificación':<14} {'bytes':>9} {'ratio':>6} {'CPU ms':>8} {'transf. ms':>10} {'ahorro ms':>10}")
+        for encoding in available_encodings():
+            setting, levels = LEVELS[encoding]
+            for level in levels:
+                setattr(compression, setting, level)
+                compressed = compress(encoding, body)
+                cpu_ms = cpu_time(lambda: compress(encoding, body), args.repeat) * 1000
+                transfer_ms = len(compressed) / bytes_per_ms
+                saved_ms = len(body) / bytes_per_ms - transfer_ms - cpu_ms
+                print(
+                    f"{encoding + '-' + str(level):<14} {len(compressed):>9,} {len(body) / len(compressed):>6.1f} "
+                    f"{cpu_ms:>8.3f} {transfer_ms:>10.1f} {saved_ms:>10.1f}"
+                )
+        # Con la caché precomprimida, la compresión se paga una vez por página y TTL
+        for encoding in available_encodings():
+            setting, _ = LEVELS[encoding]
+            setattr(compression, setting, defaults[setting])
+            cpu_ms = cpu_time(lambda: compress(encoding, body), args.repeat) * 1000
+            print(
+                f"caché {encoding}-{defaults[setting]}: {cpu_ms:.3f} ms por compresión, "
+                f"{cpu_ms / args.hits:.4f} ms por petición con {args.hits} aciertos por entrada"
+            )
+
+    missing = sorted(set(LEVELS) - set(available_encodings()))
+    if missing:
+        print(f"\nNo instalados: {', '.join(missing)} (paquetes brotli / zstandard)")
+
+
+if __name__ == "__main__":
+    main()
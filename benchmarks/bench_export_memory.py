@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria para la exportación de reservas.
+
+Compara el pico de memoria de cargar todas las reservas con
+`scalars().all()` (como hace `GET /bookings/`) frente a la exportación
+en streaming de `exports.stream_rows`.
+
+Uso:
+    python benchmarks/bench_export_memory.py --rows 10000000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from exports import ExportFormat, stream_rows
+from models import Booking, Movie, Showtime, User
+from schemas import BookingResponse
+
+SEED_BATCH = 50_000
+
+
+async def seed(session_factory, rows: int):
+    """Inserta `rows` reservas sintéticas en lotes."""
+    async with session_factory() as session:
+        session.add(User(username="bench", email="bench@example.com", password_hash="x"))
+        session.add(Movie(title="Bench", duration=120))
+        await session.flush()
+        now = datetime(2030, 1, 1)
+        session.add(Showtime(movie_id=1, theater="Sala 1", start_time=now,
+                             end_time=now + timedelta(hours=2), price=10))
+        await session.commit()
+
+        for offset in range(0, rows, SEED_BATCH):
+            batch = [
+                {
+                    "user_id": 1,
+                    "showtime_id": 1,
+                    "seats_booked": 1,
+                    "total_price": 10,
+                    "booking_time": now - timedelta(seconds=i),
+                    "status": "confirmed",
+                }
+                for i in range(offset, min(offset + SEED_BATCH, rows))
+            ]
+            await session.execute(insert(Booking), batch)
+            await session.commit()
+
+
+async def load_all(session_factory) -> int:
+    """Ruta actual: cargar todo y serializar una lista."""
+    async with session_factory() as session:
+        result = await session.execute(select(Booking))
+        bookings = result.scalars().all()
+        payload = [BookingResponse.model_validate(b).model_dump_json() for b in bookings]
+        return sum(len(item) for item in payload)
+
+
+async def stream_all(session_factory) -> int:
+    """Ruta nueva: exportación en streaming."""
+    columns = [column.name for column in Booking.__table__.columns]
+    stmt = select(*Booking.__table__.columns).order_by(Booking.id)
+    total = 0
+    async for chunk in stream_rows(session_factory, stmt, columns, ExportFormat.ndjson):
+        total += len(chunk)
+    return total
+
+
+async def measure(name: str, func, session_factory):
+    """Mide el pico de memoria y el tiempo de una estrategia."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await func(session_factory)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} bytes={size:>14,} peak={peak / 1024 / 1024:>10.1f} MiB time={elapsed:>8.2f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--skip-load-all", action="store_true",
+                        help="No ejecutar la ruta de carga completa (útil con millones de filas)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"Insertando {args.rows:,} reservas...")
+    await seed(session_factory, args.rows)
+
+    await measure("stream", stream_all, session_factory)
+    if not args.skip_load_all:
+        await measure("load_all", load_all, session_factory)
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark del filtro por género: LIKE sobre `movies.genre` frente a la
+tabla normalizada `movie_genres`.
+
+Carga un catálogo, mide el backfill de los enlaces por lotes y compara,
+para una página de películas de un género y para los conteos de todos los
+géneros, `genre LIKE '%drama%'` (recorre la tabla entera) con el índice
+`(genre_id, movie_id)` y un GROUP BY sobre los enlaces.
+
+Uso:
+    python benchmarks/bench_genres.py --movies 100000 --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GENRES = [
+    "Drama", "Comedia", "Acción", "Terror", "Animación", "Documental", "Romance",
+    "Ciencia ficción", "Suspense", "Aventura", "Fantasía", "Musical", "Western", "Bélica",
+]
+
+
+def rows(count: int):
+    rng = random.Random(1)
+    now = datetime(2026, 1, 1)
+    for i in range(1, count + 1):
+        yield {
+            "title": f"Película {i}",
+            "duration": rng.randint(80, 180),
+            "genre": ", ".join(rng.sample(GENRES, rng.choice([1, 1, 2, 3]))),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+async def timed(repeat: int, run):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = await run()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--genre", default="Western", help="Género a filtrar")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    from sqlalchemy import func, insert
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.future import select
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    from genres import backfill_movie_genres, genre_counts, movies_in_genre
+    from models import Movie
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        batch = []
+        for row in rows(args.movies):
+            batch.append(row)
+            if len(batch) == 5000:
+                await conn.execute(insert(Movie.__table__), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(Movie.__table__), batch)
+
+    async with session_factory() as session:
+        started = time.perf_counter()
+        total = await backfill_movie_genres(session, args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"backfill: {total:,} películas en {elapsed:.2f} s ({total / elapsed:,.0f} películas/s)")
+
+        genre = args.genre.lower()
+        like = select(Movie).where(func.lower(Movie.genre).like(f"%{genre}%")).order_by(Movie.id)
+
+        async def page(stmt, skip):
+            result = await session.execute(stmt.offset(skip).limit(100))
+            rows = result.scalars().all()
+            session.expunge_all()
+            return len(rows)
+
+        async def like_counts():
+            counts = {}
+            for name in GENRES:
+                result = await session.execute(
+                    select(func.count()).select_from(Movie).where(func.lower(Movie.genre).like(f"%{name.lower()}%"))
+                )
+                counts[name.lower()] = result.scalar()
+            return counts
+
+        async def index_counts():
+            return await genre_counts(session)
+
+        print(f"{'consulta':<34}{'LIKE':>12}{'índice':>12}")
+        for skip in (0, 2000):
+            like_ms, _ = await timed(args.repeat, lambda: page(like, skip))
+            index_ms, _ = await timed(args.repeat, lambda: page(movies_in_genre(genre), skip))
+            print(f"{f'página de 100, skip={skip}':<34}{like_ms:>10.2f}ms{index_ms:>10.2f}ms")
+        like_ms, from_like = await timed(max(args.repeat // 4, 1), like_counts)
+        index_ms, from_index = await timed(max(args.repeat // 4, 1), index_counts)
+        print(f"{f'conteos de {len(GENRES)} géneros':<34}{like_ms:>10.2f}ms{index_ms:>10.2f}ms")
+        # Aquí ningún género contiene a otro; en general LIKE '%drama%' también contaría "Melodrama"
+        assert from_like == from_index, (from_like, from_index)
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
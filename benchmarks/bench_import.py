@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput para la importación masiva de horarios.
+
+Genera un archivo sintético en memoria y lo importa con
+`imports.import_showtimes`, reportando filas por segundo.
+
+Uso:
+    python benchmarks/bench_import.py --rows 500000 --format csv
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from imports import IMPORT_CHUNK_SIZE, ImportFormat, import_showtimes, iter_records
+from models import Movie
+
+MOVIES = 50
+
+
+def build_file(rows: int, fmt: ImportFormat) -> io.StringIO:
+    """Genera `rows` horarios sintéticos en el formato pedido."""
+    base = datetime(2030, 1, 1)
+    buffer = io.StringIO()
+    if fmt == ImportFormat.csv:
+        buffer.write("movie_id,theater,start_time,end_time,available_seats,price\n")
+    for i in range(rows):
+        start = base + timedelta(minutes=15 * i)
+        row = {
+            "movie_id": i % MOVIES + 1,
+            "theater": f"Sala {i % 200 + 1}",
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=2)).isoformat(),
+            "available_seats": 120,
+            "price": 900,
+        }
+        if fmt == ImportFormat.csv:
+            buffer.write(",".join(str(value) for value in row.values()) + "\n")
+        else:
+            buffer.write(json.dumps(row) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=[f.value for f in ImportFormat], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add_all(Movie(title=f"Movie {i}", duration=120) for i in range(MOVIES))
+        await session.commit()
+
+    fmt = ImportFormat(args.format)
+    stream = build_file(args.rows, fmt)
+
+    started = time.perf_counter()
+    async with session_factory() as session:
+        report = await import_showtimes(session, iter_records(stream, fmt), chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"format={fmt.value} rows={report.inserted:,} failed={report.failed} "
+          f"time={elapsed:.2f}s throughput={report.inserted / elapsed:,.0f} rows/s")
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
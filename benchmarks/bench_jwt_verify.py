@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de verificación de tokens de acceso.
+
+Compara tokens verificados por segundo con HS256 (secreto compartido),
+ES256 parseando la clave PEM en cada verificación, ES256 con la clave ya
+parseada del registro y la caché de tokens verificados.
+
+Uso:
+    python benchmarks/bench_jwt_verify.py --tokens 1000 --seconds 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from jwt_keys import SIGNING_ALGORITHM, KeyRegistry, VerifiedTokenCache
+
+SECRET = "bench-secret"
+
+
+def rate(label: str, verify, tokens, seconds: float):
+    """Verifica los tokens en bucle durante `seconds` y muestra tokens/s."""
+    done = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for token in tokens:
+            verify(token)
+        done += len(tokens)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {done / elapsed:>12,.0f} tokens/s  {elapsed / done * 1e6:>8.1f} µs/token")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000, help="Tokens distintos en rotación")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duración de cada medición")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as keys_dir:
+        private = ec.generate_private_key(ec.SECP256R1())
+        pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode()
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        with open(os.path.join(keys_dir, "bench.pem"), "w") as f:
+            f.write(pem)
+        registry = KeyRegistry(keys_dir)
+        kid, key = registry.signing_key()
+
+        exp = int(time.time()) + 3600
+        claims = [{"sub": f"user{i}", "exp": exp} for i in range(args.tokens)]
+        hs_tokens = [jwt.encode(c, SECRET, algorithm="HS256") for c in claims]
+        es_tokens = [jwt.encode(c, key, algorithm=SIGNING_ALGORITHM, headers={"kid": kid}) for c in claims]
+
+        rate("HS256 (jose)", lambda t: jwt.decode(t, SECRET, algorithms=["HS256"]), hs_tokens, args.seconds)
+        rate(
+            "ES256 PEM por token",
+            lambda t: jwt.decode(t, public_pem, algorithms=[SIGNING_ALGORITHM]),
+            es_tokens, args.seconds,
+        )
+
+        def verify_registry(token):
+            public = registry.verification_key(jwt.get_unverified_header(token)["kid"])
+            return jwt.decode(token, public, algorithms=[SIGNING_ALGORITHM])
+        rate("ES256 clave en caché", verify_registry, es_tokens, args.seconds)
+
+        cache = VerifiedTokenCache(ttl=60, max_size=args.tokens * 2)
+
+        def verify_cached(token):
+            payload = cache.get(token)
+            if payload is None:
+                payload = verify_registry(token)
+                cache.put(token, payload)
+            return payload
+        rate("ES256 + caché de tokens", verify_cached, es_tokens, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
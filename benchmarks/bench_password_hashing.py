@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia de login por perfil de hashing.
+
+Para cada perfil (coste de bcrypt, memoria y tiempo de argon2id) verifica
+contraseñas en un pool de hilos como el del login y muestra la latencia
+p50/p95 con un gráfico de barras. Los perfiles argon2 se omiten si no está
+instalado `argon2-cffi`.
+
+Uso:
+    python benchmarks/bench_password_hashing.py --logins 200 --concurrency 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import make_password_context
+
+PROFILES = {
+    "bcrypt-10": {"scheme": "bcrypt", "bcrypt_rounds": 10},
+    "bcrypt-12": {"scheme": "bcrypt", "bcrypt_rounds": 12},
+    "bcrypt-13": {"scheme": "bcrypt", "bcrypt_rounds": 13},
+    "bcrypt-14": {"scheme": "bcrypt", "bcrypt_rounds": 14},
+    "argon2id-m19M-t2": {"scheme": "argon2", "argon2_memory_cost": 19456, "argon2_time_cost": 2, "argon2_parallelism": 1},
+    "argon2id-m64M-t3": {"scheme": "argon2", "argon2_memory_cost": 65536, "argon2_time_cost": 3, "argon2_parallelism": 4},
+}
+BAR_WIDTH = 40
+
+
+def measure(context, logins: int, concurrency: int):
+    """Latencias (s) de `logins` verificaciones con `concurrency` hilos, y el tiempo total."""
+    hashed = context.hash("benchmark-password")
+
+    def login(_):
+        started = time.perf_counter()
+        assert context.verify("benchmark-password", hashed)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(login, range(logins)))
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+
+    results = []
+    for name in args.profiles:
+        try:
+            context = make_password_context(**PROFILES[name])
+        except RuntimeError as e:
+            print(f"{name:<18} omitido: {e}")
+            continue
+        latencies, elapsed = measure(context, args.logins, args.concurrency)
+        p50 = statistics.median(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        results.append((name, p50, p95, args.logins / elapsed))
+
+    if not results:
+        return
+    scale = max(p95 for _, _, p95, _ in results)
+    print(f"\n{'perfil':<18} {'p50 ms':>8} {'p95 ms':>8} {'logins/s':>9}")
+    for name, p50, p95, throughput in results:
+        bar = "█" * max(1, round(p50 / scale * BAR_WIDTH))
+        print(f"{name:<18} {p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {throughput:>9.1f}  {bar}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la reconciliación de asientos.
+
+Genera horarios con reservas sintéticas, desvía el contador de una fracción
+de ellos y mide una pasada completa de detección y otra de corrección.
+
+Uso:
+    python benchmarks/bench_reconcile.py --showtimes 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Booking, Movie, Showtime
+from reconciliation import RECONCILE_BATCH_SIZE, reconcile_seats
+
+CAPACITY = 100
+SEED_BATCH = 50_000
+
+
+async def seed(session_factory, showtimes: int, bookings_per_showtime: int, drift_ratio: float):
+    """Inserta horarios y reservas; una fracción de horarios queda desviada."""
+    rng = random.Random(11)
+    start = datetime(2034, 1, 1)
+    async with session_factory() as session:
+        await session.execute(insert(Movie), [{"title": "Bench Movie", "duration": 120}])
+        for offset in range(0, showtimes, SEED_BATCH):
+            ids = range(offset + 1, min(offset + SEED_BATCH, showtimes) + 1)
+            drifted = {i for i in ids if rng.random() < drift_ratio}
+            await session.execute(insert(Showtime), [
+                {
+                    "id": i,
+                    "movie_id": 1,
+                    "theater": f"Sala {i % 500}",
+                    "start_time": start + timedelta(hours=i),
+                    "end_time": start + timedelta(hours=i, minutes=120),
+                    "capacity": CAPACITY,
+                    "available_seats": CAPACITY - 2 * bookings_per_showtime + (1 if i in drifted else 0),
+                    "price": 1000,
+                }
+                for i in ids
+            ])
+            await session.execute(insert(Booking), [
+                {
+                    "user_id": 1,
+                    "showtime_id": i,
+                    "seats_booked": 2,
+                    "total_price": 2000,
+                    "booking_time": start,
+                    "status": "confirmed",
+                }
+                for i in ids
+                for _ in range(bookings_per_showtime)
+            ])
+            await session.commit()
+
+
+async def timed_pass(name, session_factory, **kwargs):
+    async with session_factory() as session:
+        started = time.perf_counter()
+        report = await reconcile_seats(session, **kwargs)
+        elapsed = time.perf_counter() - started
+    print(
+        f"{name:<10} checked={report.checked:>9,} drifted={report.drifted:>7,} "
+        f"fixed={report.fixed:>7,} time={elapsed:>8.2f} s ({report.checked / elapsed:,.0f} horarios/s)"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--showtimes", type=int, default=200_000)
+    parser.add_argument("--bookings-per-showtime", type=int, default=3)
+    parser.add_argument("--drift-ratio", type=float, default=0.01)
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"Insertando {args.showtimes:,} horarios...")
+    await seed(session_factory, args.showtimes, args.bookings_per_showtime, args.drift_ratio)
+
+    await timed_pass("detect", session_factory, batch_size=args.batch_size)
+    await timed_pass("fix", session_factory, fix=True, batch_size=args.batch_size)
+    await timed_pass("verify", session_factory, batch_size=args.batch_size)
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
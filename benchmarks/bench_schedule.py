@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark del generador de horarios.
+
+Programa `--screens` salas durante `--days` días con `scheduling.generate_schedule`
+y verifica el resultado con el barrido de `find_overlaps`, comparándolo con
+la verificación ingenua por pares.
+
+Uso:
+    python benchmarks/bench_schedule.py --screens 200 --days 30
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, time as dtime
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduling import find_overlaps, generate_schedule
+
+
+def pairwise_overlaps(showtimes) -> int:
+    """Verificación ingenua O(n²) por sala, como referencia."""
+    by_theater = {}
+    for theater, start, end in showtimes:
+        by_theater.setdefault(theater, []).append((start, end))
+    count = 0
+    for intervals in by_theater.values():
+        for (s1, e1), (s2, e2) in combinations(intervals, 2):
+            if s1 < e2 and s2 < e1:
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--screens", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--movies", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    movies = [(i + 1, rng.randint(85, 180)) for i in range(args.movies)]
+    theaters = [f"Sala {i + 1}" for i in range(args.screens)]
+
+    started = time.perf_counter()
+    generated = generate_schedule(movies, theaters, date(2031, 1, 1), args.days,
+                                  dtime(10, 0), dtime(1, 0), 20)
+    generate_time = time.perf_counter() - started
+
+    showtimes = [(theater, start, end) for _, theater, start, end in generated]
+    started = time.perf_counter()
+    overlaps = find_overlaps(showtimes)
+    sweep_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    naive = pairwise_overlaps(showtimes)
+    naive_time = time.perf_counter() - started
+
+    print(f"screens={args.screens} days={args.days} showtimes={len(generated):,}")
+    print(f"generate   {generate_time * 1000:>9.1f} ms")
+    print(f"sweep      {sweep_time * 1000:>9.1f} ms  overlaps={len(overlaps)}")
+    print(f"pairwise   {naive_time * 1000:>9.1f} ms  overlaps={naive}")
+
+
+if __name__ == "__main__":
+    main()
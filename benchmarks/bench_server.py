@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput del servidor.
+
+Arranca la API como se ejecutaba hasta ahora (un proceso de uvicorn, con el
+registro de SQL por defecto) y con `run_server.py` (un worker por núcleo,
+uvloop/httptools, sin registro de SQL), y mide peticiones por segundo y
+latencias con clientes concurrentes.
+
+El generador de carga es Python; con muchos núcleos conviene lanzar varios
+o usar una herramienta externa (wrk, oha) contra el mismo servidor.
+
+Uso:
+    python benchmarks/bench_server.py --clients 64 --seconds 20 --path /movies/
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import Base
+from models import Movie
+
+SETUPS = {
+    "actual": [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", "{port}"],
+    "run_server": [sys.executable, "run_server.py", "--host", "127.0.0.1", "--port", "{port}"],
+}
+
+
+async def seed(url: str, movies: int):
+    """Crea las tablas antes de arrancar los workers e inserta películas."""
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Movie), [{"title": f"Movie {i}", "duration": 120} for i in range(movies)])
+    await engine.dispose()
+
+
+async def wait_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def load(base_url: str, path: str, clients: int, seconds: float):
+    """Lanza `clients` bucles de peticiones durante `seconds` y devuelve las latencias."""
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + seconds
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+        await asyncio.gather(*(worker() for _ in range(clients)))
+    return sorted(latencies), errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--path", default="/movies/")
+    parser.add_argument("--movies", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--setups", nargs="+", choices=sorted(SETUPS), default=list(SETUPS))
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    for name in args.setups:
+        await seed(url, args.movies)
+        env = {**os.environ, "DATABASE_URL": url, "JOBS_WORKER_ENABLED": "false"}
+        command = [part.format(port=args.port) for part in SETUPS[name]]
+        server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            await wait_ready(base_url)
+            await load(base_url, args.path, args.clients, 2)  # calentamiento
+            latencies, errors = await load(base_url, args.path, args.clients, args.seconds)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        if not latencies:
+            print(f"{name:<11} sin respuestas correctas ({errors} errores)")
+            continue
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{name:<11} {len(latencies) / args.seconds:>9,.0f} req/s  "
+            f"p50={p50 * 1000:>7.1f} ms  p99={p99 * 1000:>7.1f} ms  errores={errors}"
+        )
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
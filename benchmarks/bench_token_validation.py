@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark del coste de validar un token de acceso.
+
+Compara decodificar el JWT y consultar la lista de revocación en memoria
+con decodificarlo y consultar `revoked_tokens` en la base de datos en cada
+petición, para distintos tamaños de la lista.
+
+Uso:
+    python benchmarks/bench_token_validation.py --sizes 0 10000 100000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from auth import ALGORITHM, SECRET_KEY, create_access_token
+from database import Base
+from models import RevokedToken
+from tokens import TokenDenylist, new_token_id
+
+SEED_BATCH = 50_000
+
+
+async def seed(session_factory, size: int):
+    """Rellena `revoked_tokens` con `size` ids vigentes."""
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    async with session_factory() as session:
+        await session.execute(delete(RevokedToken))
+        for offset in range(0, size, SEED_BATCH):
+            await session.execute(insert(RevokedToken), [
+                {"id": new_token_id(), "revoked_at": datetime.utcnow(), "expires_at": expires_at}
+                for _ in range(offset, min(offset + SEED_BATCH, size))
+            ])
+        await session.commit()
+
+
+async def measure(session_factory, size: int, requests: int):
+    tokens = [create_access_token({"sub": f"user{i}", "fam": new_token_id()}) for i in range(100)]
+    denylist = TokenDenylist()
+    async with session_factory() as session:
+        started = time.perf_counter()
+        await denylist.sync(session)
+        sync_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for i in range(requests):
+            payload = jwt.decode(tokens[i % len(tokens)], SECRET_KEY, algorithms=[ALGORITHM])
+            assert not denylist.is_revoked(payload)
+        memory = (time.perf_counter() - started) / requests
+
+        started = time.perf_counter()
+        for i in range(requests):
+            payload = jwt.decode(tokens[i % len(tokens)], SECRET_KEY, algorithms=[ALGORITHM])
+            result = await session.execute(
+                select(RevokedToken.id).where(RevokedToken.id.in_([payload["jti"], payload["fam"]]))
+            )
+            assert result.first() is None
+        database = (time.perf_counter() - started) / requests
+
+    print(
+        f"revocados={size:>8,}  memoria={memory * 1e6:>7.1f} µs/req  "
+        f"bd={database * 1e6:>7.1f} µs/req  sync completa={sync_ms:>8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    for size in args.sizes:
+        await seed(session_factory, size)
+        await measure(session_factory, size, args.requests)
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark del alta masiva de usuarios.
+
+Compara dar de alta usuarios uno a uno como `POST /users/` (tres SELECT de
+unicidad, hash síncrono y un commit por usuario) con `import_users`
+(una consulta de unicidad por bloque, hashing en un pool de procesos e
+INSERT multi-fila o COPY).
+
+Uso:
+    python benchmarks/bench_user_bulk.py --users 2000 --rounds 12
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def records(prefix: str, count: int):
+    return [
+        {"username": f"{prefix}{i}", "email": f"{prefix}{i}@example.com", "password": f"password{i}"}
+        for i in range(count)
+    ]
+
+
+async def one_by_one(session_factory, users):
+    """El camino de `POST /users/`: una transacción y un hash síncrono por usuario."""
+    from sqlalchemy.future import select
+
+    from auth import get_password_hash
+    from models import User
+
+    async with session_factory() as session:
+        for data in users:
+            await session.execute(select(User).limit(1))
+            await session.execute(select(User).where(User.username == data["username"]))
+            await session.execute(select(User).where(User.email == data["email"]))
+            session.add(User(
+                username=data["username"],
+                email=data["email"],
+                password_hash=get_password_hash(data["password"]),
+            ))
+            await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--one-by-one", type=int, default=100, help="Usuarios para el camino uno a uno")
+    parser.add_argument("--rounds", type=int, default=12, help="Coste de bcrypt")
+    parser.add_argument("--processes", type=int, default=0, help="Procesos de hashing (0 = uno por núcleo)")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    # El perfil se lee del entorno al importar, también en los procesos del pool
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_PROCESSES"] = str(args.processes)
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    from imports import import_users
+    from passwords import PASSWORD_HASH_PROCESSES, shutdown_hash_pool
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    started = time.perf_counter()
+    await one_by_one(session_factory, records("single", args.one_by_one))
+    elapsed = time.perf_counter() - started
+    print(f"uno a uno:    {args.one_by_one:>7,} usuarios en {elapsed:>7.2f} s  ({args.one_by_one / elapsed:>8.1f} usuarios/s)")
+
+    started = time.perf_counter()
+    async with session_factory() as session:
+        report = await import_users(session, enumerate(records("bulk", args.users)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"bulk ({PASSWORD_HASH_PROCESSES} proc): {report.inserted:>7,} usuarios en {elapsed:>7.2f} s  "
+        f"({report.inserted / elapsed:>8.1f} usuarios/s)"
+    )
+
+    shutdown_hash_pool()
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escrituras: releer la fila tras el commit frente a RETURNING.
+
+Repite el núcleo de los endpoints de escritura de películas y horarios de
+dos formas:
+
+- refresh: INSERT/UPDATE, commit y `session.refresh()` (un SELECT más), y al
+  cambiar la capacidad de un horario un UPDATE aparte para los asientos;
+- returning: INSERT/UPDATE con los valores generados en la propia sentencia
+  (o en los defaults de Python), y el horario en un único UPDATE ... RETURNING.
+
+`--latency-ms` simula la latencia de red hasta la base de datos en cada
+sentencia, que es donde más pesa la consulta ahorrada.
+
+Uso:
+    python benchmarks/bench_writes.py --writes 500 --latency-ms 1
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def with_refresh(session_factory, writes: int):
+    from sqlalchemy import update
+
+    from models import Movie, Showtime
+
+    start = datetime(2030, 1, 1)
+    async with session_factory() as session:
+        for i in range(writes):
+            movie = Movie(title=f"Refresh {i}", duration=100, genre="Drama")
+            session.add(movie)
+            await session.commit()
+            await session.refresh(movie)
+
+            movie.title = f"Refresh {i} (v2)"
+            await session.commit()
+            await session.refresh(movie)
+
+            showtime = Showtime(
+                movie_id=movie.id, theater="Sala refresh", start_time=start + timedelta(hours=3 * i),
+                end_time=start + timedelta(hours=3 * i + 2), available_seats=100, capacity=100, price=900,
+            )
+            session.add(showtime)
+            await session.commit()
+            await session.refresh(showtime)
+
+            await session.execute(
+                update(Showtime).where(Showtime.id == showtime.id, Showtime.seats_sold <= 120)
+                .values(capacity=120, available_seats=120 - Showtime.seats_sold)
+                .execution_options(synchronize_session=False)
+            )
+            showtime.price = 1000
+            await session.commit()
+            await session.refresh(showtime)
+
+
+async def with_returning(session_factory, writes: int):
+    from sqlalchemy import update
+
+    from models import Movie, Showtime
+
+    start = datetime(2040, 1, 1)
+    async with session_factory() as session:
+        for i in range(writes):
+            movie = Movie(title=f"Returning {i}", duration=100, genre="Drama")
+            session.add(movie)
+            await session.commit()
+
+            movie.title = f"Returning {i} (v2)"
+            await session.commit()
+
+            showtime = Showtime(
+                movie_id=movie.id, theater="Sala returning", start_time=start + timedelta(hours=3 * i),
+                end_time=start + timedelta(hours=3 * i + 2), available_seats=100, capacity=100, price=900,
+            )
+            session.add(showtime)
+            await session.commit()
+
+            await session.execute(
+                update(Showtime).where(Showtime.id == showtime.id, Showtime.seats_sold <= 120)
+                .values(capacity=120, available_seats=120 - Showtime.seats_sold, price=1000, updated_at=datetime.utcnow())
+                .returning(Showtime)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=500, help="Películas (y horarios) por variante")
+    parser.add_argument("--latency-ms", type=float, default=1, help="Latencia simulada por sentencia")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements = 0
+    latency = args.latency_ms / 1000
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_and_wait(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        statements += 1
+        # Las variantes son secuenciales: bloquear el hilo equivale a esperar la red
+        if latency:
+            time.sleep(latency)
+
+    # Cada iteración son 4 escrituras: crear y editar película, crear y editar horario
+    for name, run in [("refresh", with_refresh), ("returning", with_returning)]:
+        statements = 0
+        started = time.perf_counter()
+        await run(session_factory, args.writes)
+        elapsed = time.perf_counter() - started
+        total = 4 * args.writes
+        print(
+            f"{name:<10} {total:>6,} escrituras en {elapsed:>6.2f} s  ({total / elapsed:>7.1f} escrituras/s, "
+            f"{statements / total:.2f} sentencias por escritura)"
+        )
+
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,296 @@
+"""
+Instantánea en memoria del catálogo de películas para el Sistema de Gestión de Cine.
+
+Cada worker guarda las películas vivas en una instantánea inmutable (tuplas,
+sin objetos ORM) indexada por id, género y fecha de estreno, y las lecturas
+del catálogo se sirven de ella sin ir a la base de datos.
+
+Las escrituras de películas incrementan `catalog_version` y anotan en
+`catalog_changes` qué películas cambiaron, en la misma transacción. Cada
+`CATALOG_SYNC_SECONDS` los workers comparan su versión con la de la tabla
+(una consulta de una fila) y, si cambió, leen solo las películas afectadas
+y montan una instantánea nueva; los lectores siguen usando la anterior
+hasta que se sustituye. Si un worker se queda más de
+`CATALOG_CHANGES_RETENTION` versiones atrás, o una escritura pide recarga
+completa (importaciones), se vuelve a leer el catálogo entero.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from genres import genre_keys
+from metrics import Counter, Gauge
+from models import CatalogChange, CatalogVersion, Movie
+from response_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOT_ENABLED = os.getenv("CATALOG_SNAPSHOT_ENABLED", "true").lower() == "true"
+CATALOG_SYNC_SECONDS = float(os.getenv("CATALOG_SYNC_SECONDS", "1"))
+# Recarga completa periódica, por si una escritura no llegó a anotar su cambio
+CATALOG_FULL_RELOAD_SECONDS = float(os.getenv("CATALOG_FULL_RELOAD_SECONDS", "900"))
+CATALOG_CHANGES_RETENTION = int(os.getenv("CATALOG_CHANGES_RETENTION", "10000"))
+
+_UPSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+catalog_refreshes = Counter("catalog_snapshot_refreshes_total", "Refrescos de la instantánea del catálogo por tipo")
+catalog_movies = Gauge("catalog_snapshot_movies", "Películas en la instantánea del catálogo")
+catalog_snapshot_version = Gauge("catalog_snapshot_version", "Versión del catálogo de la instantánea")
+
+
+class CatalogMovie(NamedTuple):
+    """Película de la instantánea, con los campos de `MovieResponse`."""
+    id: int
+    title: str
+    description: Optional[str]
+    duration: int
+    genre: Optional[str]
+    release_date: Optional[datetime]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+_COLUMNS = [Movie.__table__.c[name] for name in CatalogMovie._fields]
+
+
+def _date_key(value: datetime) -> datetime:
+    """Fechas comparables entre sí: las que llevan zona pasan a UTC sin zona."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+_genre_strings: Dict[str, str] = {}
+
+
+def _record(row) -> CatalogMovie:
+    # Los géneros se repiten mucho: una sola copia de cada cadena
+    genre = row.genre
+    if genre is not None:
+        genre = _genre_strings.setdefault(genre, genre)
+    return CatalogMovie(
+        row.id, row.title, row.description, row.duration, genre,
+        row.release_date, row.created_at, row.updated_at,
+    )
+
+
+class CatalogSnapshot:
+    """Películas vivas en un momento dado, con sus índices. No se modifica nunca."""
+
+    __slots__ = ("version", "_by_id", "_ids", "_by_genre", "_release_dates", "_release_ids")
+
+    def __init__(self, version: int, movies: Dict[int, CatalogMovie]):
+        self.version = version
+        self._by_id = movies
+        self._ids = array("q", sorted(movies))
+        by_genre = defaultdict(list)
+        for movie_id in self._ids:
+            for genre in genre_keys(movies[movie_id].genre):
+                by_genre[genre].append(movie_id)
+        self._by_genre = {genre: array("q", ids) for genre, ids in by_genre.items()}
+        dated = sorted(
+            (_date_key(movie.release_date), movie.id) for movie in movies.values() if movie.release_date is not None
+        )
+        self._release_dates = [date for date, _ in dated]
+        self._release_ids = array("q", [movie_id for _, movie_id in dated])
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get(self, movie_id: int) -> Optional[CatalogMovie]:
+        return self._by_id.get(movie_id)
+
+    def page(self, skip: int, limit: int) -> List[CatalogMovie]:
+        """Películas por id ascendente, como `ORDER BY id OFFSET skip LIMIT limit`."""
+        skip = max(skip, 0)
+        return [self._by_id[movie_id] for movie_id in self._ids[skip:skip + max(limit, 0)]]
+
+    def by_genre(self, genre: str) -> List[CatalogMovie]:
+        return [self._by_id[movie_id] for movie_id in self._by_genre.get(genre.strip().lower(), ())]
+
+    def genre_counts(self) -> Dict[str, int]:
+        return {genre: len(ids) for genre, ids in self._by_genre.items()}
+
+    def released_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[CatalogMovie]:
+        """Películas con `start <= release_date < end`, por fecha de estreno."""
+        low = 0 if start is None else bisect_left(self._release_dates, _date_key(start))
+        high = len(self._release_dates) if end is None else bisect_left(self._release_dates, _date_key(end))
+        return [self._by_id[movie_id] for movie_id in self._release_ids[low:high]]
+
+    def apply(self, version: int, changed: Dict[int, Optional[CatalogMovie]]) -> "CatalogSnapshot":
+        """Instantánea nueva con `changed` aplicado (None = película borrada)."""
+        movies = dict(self._by_id)
+        for movie_id, movie in changed.items():
+            if movie is None:
+                movies.pop(movie_id, None)
+            else:
+                movies[movie_id] = movie
+        return CatalogSnapshot(version, movies)
+
+
+async def bump_catalog_version(db: AsyncSession, movie_ids: Optional[Iterable[int]]) -> int:
+    """
+    Incrementa la versión del catálogo y anota las películas cambiadas
+    (`None` pide una recarga completa), en la transacción del llamante.
+
+    Es un único INSERT ... ON CONFLICT DO UPDATE: crea la fila en la primera
+    escritura y, a partir de ahí, la bloquea hasta el commit, así que las
+    versiones se confirman en orden también con la tabla vacía.
+    """
+    upsert = _UPSERTS[db.get_bind().dialect.name]
+    stmt = upsert(CatalogVersion).values(id=1, version=1, updated_at=datetime.utcnow())
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"version": CatalogVersion.version + 1, "updated_at": stmt.excluded.updated_at},
+        )
+        .returning(CatalogVersion.version)
+    )
+    version = result.scalar_one()
+    ids = [None] if movie_ids is None else list(movie_ids)
+    await db.execute(insert(CatalogChange), [{"version": version, "movie_id": movie_id} for movie_id in ids])
+    await db.execute(delete(CatalogChange).where(CatalogChange.version <= version - CATALOG_CHANGES_RETENTION))
+    return version
+
+
+async def current_version(db: AsyncSession) -> int:
+    result = await db.execute(select(CatalogVersion.version).where(CatalogVersion.id == 1))
+    return result.scalar() or 0
+
+
+async def load_snapshot(db: AsyncSession) -> CatalogSnapshot:
+    """Lee el catálogo entero."""
+    version = await current_version(db)
+    result = await db.execute(select(*_COLUMNS).where(Movie.deleted_at.is_(None)))
+    snapshot = CatalogSnapshot(version, {row.id: _record(row) for row in result})
+    catalog_refreshes.inc(kind="full")
+    return snapshot
+
+
+async def refresh_snapshot(db: AsyncSession, snapshot: Optional[CatalogSnapshot]) -> CatalogSnapshot:
+    """Instantánea al día: la misma si no hubo cambios, o con solo las películas cambiadas releídas."""
+    if snapshot is None:
+        return await load_snapshot(db)
+    version = await current_version(db)
+    if version == snapshot.version:
+        return snapshot
+    if version < snapshot.version or version - snapshot.version >= CATALOG_CHANGES_RETENTION:
+        return await load_snapshot(db)
+
+    result = await db.execute(
+        select(CatalogChange.version, CatalogChange.movie_id).where(CatalogChange.version > snapshot.version)
+    )
+    changes = result.all()
+    if any(change.movie_id is None for change in changes):
+        return await load_snapshot(db)
+    changed: Dict[int, Optional[CatalogMovie]] = {change.movie_id: None for change in changes}
+    if changed:
+        result = await db.execute(select(*_COLUMNS, Movie.deleted_at).where(Movie.id.in_(list(changed))))
+        for row in result:
+            changed[row.id] = None if row.deleted_at is not None else _record(row)
+    # Las filas leídas pueden ser de una versión posterior a `version`
+    new_version = max([version, *(change.version for change in changes)])
+    catalog_refreshes.inc(kind="incremental")
+    return snapshot.apply(new_version, changed)
+
+
+class Catalog:
+    """Instantánea vigente del proceso; se sustituye entera en cada refresco."""
+
+    def __init__(self):
+        self.snapshot: Optional[CatalogSnapshot] = None
+
+    def get(self, movie_id: int) -> Optional[CatalogMovie]:
+        """Película de la instantánea, o None si no está (o no hay instantánea)."""
+        snapshot = self.snapshot
+        return snapshot.get(movie_id) if snapshot is not None else None
+
+    async def refresh(self, db: AsyncSession, full: bool = False):
+        current = self.snapshot
+        snapshot = await (load_snapshot(db) if full else refresh_snapshot(db, current))
+        if snapshot is current:
+            return
+        # Un refresco más lento no debe pisar uno más reciente
+        if self.snapshot is not None and self.snapshot is not current and self.snapshot.version > snapshot.version:
+            return
+        self._replace(snapshot)
+
+    def apply_write(self, version: int, movies: Dict[int, Optional[Movie]]):
+        """
+        Aplica una escritura ya confirmada por este proceso (`id -> película`,
+        None si se eliminó) a la instantánea, sin volver a la base de datos.
+
+        `version` es la que devolvió `bump_catalog_version`. Si la instantánea
+        no está justo en la anterior, le faltan escrituras de otros workers:
+        se aplica la fila pero se conserva su versión, y la sincronización
+        leerá los cambios que faltan (incluido este).
+        """
+        current = self.snapshot
+        if current is None or current.version >= version:
+            return
+        changed = {movie_id: None if movie is None else _record(movie) for movie_id, movie in movies.items()}
+        new_version = version if version == current.version + 1 else current.version
+        catalog_refreshes.inc(kind="local")
+        self._replace(current.apply(new_version, changed))
+
+    def _replace(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        catalog_cache.clear()
+        catalog_movies.set(len(snapshot))
+        catalog_snapshot_version.set(snapshot.version)
+
+    def clear(self):
+        self.snapshot = None
+
+
+catalog = Catalog()
+
+
+class CatalogSync:
+    """Carga la instantánea al arrancar y la mantiene al día."""
+
+    def __init__(
+        self,
+        session_factory,
+        interval: float = CATALOG_SYNC_SECONDS,
+        full_reload_interval: float = CATALOG_FULL_RELOAD_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.full_reload_interval = full_reload_interval
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        last_full = time.monotonic()
+        while not self._stopping.is_set():
+            full = time.monotonic() - last_full >= self.full_reload_interval
+            try:
+                async with self.session_factory() as session:
+                    await catalog.refresh(session, full=full)
+                if full:
+                    last_full = time.monotonic()
+            except Exception:
+                logger.exception("Catalog snapshot refresh failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._stopping.set()
@@ -0,0 +1,111 @@
+"""
+Agrupación de lecturas idénticas (single-flight) para el Sistema de Gestión de Cine.
+
+Cuando llegan a la vez muchas peticiones GET iguales (p. ej. la ficha de
+una película recién anunciada), el middleware ejecuta solo la primera y
+entrega a las demás la misma respuesta: una consulta a la base de datos y
+una serialización por ráfaga y worker. No es una caché: en cuanto la
+primera petición termina, la siguiente vuelve a ejecutarse.
+
+Solo se agrupan las rutas de `SINGLE_FLIGHT_ROUTES` (plantillas de ruta de
+Starlette separadas por comas; vacío desactiva la agrupación). Dos
+peticiones son iguales si coinciden ruta, query string y las cabeceras de
+`KEY_HEADERS`, de modo que nunca se comparte la respuesta de un token con
+otro.
+"""
+
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional
+
+from starlette.routing import compile_path
+
+from metrics import Counter
+
+SINGLE_FLIGHT_ROUTES = os.getenv(
+    "SINGLE_FLIGHT_ROUTES",
+    "/movies/,/movies/{movie_id:int},/showtimes/,/showtimes/{showtime_id:int}",
+)
+
+# Cabeceras de la petición que pueden cambiar la respuesta
+KEY_HEADERS = (b"authorization", b"accept", b"accept-encoding")
+
+single_flight_requests = Counter(
+    "single_flight_requests_total",
+    "Peticiones GET agrupables por ruta: ejecutadas (leader) o servidas con la respuesta de otra (follower)",
+)
+
+
+def parse_routes(value: str) -> List[str]:
+    return [route.strip() for route in value.split(",") if route.strip()]
+
+
+class SingleFlightMiddleware:
+    """Comparte la respuesta de una petición GET en curso con las idénticas que llegan mientras tanto."""
+
+    def __init__(self, app, routes: Optional[Iterable[str]] = None):
+        self.app = app
+        if routes is None:
+            routes = parse_routes(SINGLE_FLIGHT_ROUTES)
+        self.routes = [(route, compile_path(route)[0]) for route in routes]
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+
+    def _route(self, path: str) -> Optional[str]:
+        for route, regex in self.routes:
+            if regex.match(path):
+                return route
+        return None
+
+    async def __call__(self, scope, receive, send):
+        route = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            route = self._route(scope["path"])
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = (
+            scope["path"],
+            scope["query_string"],
+            *(tuple(value for name, value in scope["headers"] if name == header) for header in KEY_HEADERS),
+        )
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            role = "leader"
+            task = asyncio.ensure_future(self._run(dict(scope)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            role = "follower"
+        single_flight_requests.inc(route=route, role=role)
+
+        # shield: si el cliente que la lanzó se desconecta, las demás siguen esperándola
+        for message in await asyncio.shield(task):
+            if message["type"] == "http.response.start":
+                # Los middlewares exteriores modifican las cabeceras in situ
+                message = {**message, "headers": list(message["headers"])}
+            await send(message)
+
+    def _forget(self, key: tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _run(self, scope) -> List[dict]:
+        """Ejecuta la petición y devuelve los mensajes de respuesta completos."""
+        messages: List[dict] = []
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Sin desconexión: la respuesta se completa aunque su cliente se vaya
+            await asyncio.Event().wait()
+
+        async def send(message):
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+        return messages
+
@@ -0,0 +1,206 @@
+"""
+Compresión de respuestas para el Sistema de Gestión de Cine.
+
+Middleware ASGI que negocia zstd, brotli o gzip según `Accept-Encoding` y
+comprime las respuestas JSON, CSV y de texto a partir de
+`COMPRESSION_MIN_SIZE` bytes. Las respuestas en streaming (exportaciones)
+se comprimen por trozos. Los niveles por defecto priorizan CPU frente a
+ratio: en listados JSON repetitivos la diferencia de tamaño con niveles
+altos es pequeña y el coste de CPU se multiplica.
+
+zstd y brotli son opcionales (paquetes `zstandard` y `brotli`); sin ellos
+se negocia solo gzip. Las respuestas que ya traen `Content-Encoding` (p. ej.
+las de la caché de respuestas, guardadas ya comprimidas) pasan sin tocar.
+"""
+
+import os
+import time
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from metrics import Counter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson")
+
+compression_bytes = Counter("compression_bytes_total", "Bytes antes (input) y después (output) de comprimir")
+compression_seconds = Counter("compression_seconds_total", "Tiempo de CPU comprimiendo respuestas")
+
+
+class _Compressor:
+    """Interfaz común de compresión incremental: `compress(trozo)` y `finish()`."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        started = time.process_time()
+        if self.encoding == "br":
+            out = self._obj.process(data) + self._obj.flush()
+        elif self.encoding == "zstd":
+            out = self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        else:
+            out = self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+        self._account(len(data), len(out), started)
+        return out
+
+    def finish(self) -> bytes:
+        started = time.process_time()
+        out = self._obj.finish() if self.encoding == "br" else self._obj.flush()
+        self._account(0, len(out), started)
+        return out
+
+    def _account(self, size_in: int, size_out: int, started: float):
+        compression_seconds.inc(time.process_time() - started, encoding=self.encoding)
+        compression_bytes.inc(size_in, encoding=self.encoding, stage="input")
+        compression_bytes.inc(size_out, encoding=self.encoding, stage="output")
+
+
+def available_encodings() -> tuple:
+    """Codificaciones disponibles, en orden de preferencia del servidor."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Elige la codificación para un `Accept-Encoding`, o None para no comprimir.
+
+    Respeta los pesos `q` (q=0 excluye) y `*`; a igual peso gana la
+    preferencia del servidor (zstd, br, gzip).
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    """Comprime un cuerpo completo."""
+    compressor = _Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Comprime las respuestas según `Accept-Encoding`."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    """Envoltorio de `send` que decide al ver el primer trozo del cuerpo."""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            if _is_compressible(headers) and message["status"] not in (204, 304):
+                # Se decide con el primer trozo del cuerpo (umbral y streaming)
+                headers.add_vary_header("Accept-Encoding")
+                self.start = message
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            self.compressor = _Compressor(self.encoding)
+            if more_body:
+                # Streaming: la longitud final no se conoce
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+
+        out = self.compressor.compress(body)
+        if not more_body:
+            out += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": out, "more_body": more_body})
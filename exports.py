@@ -0,0 +1,102 @@
+"""
+Exportación en streaming para el Sistema de Gestión de Cine.
+
+Genera respuestas NDJSON o CSV a partir de cursores del lado del servidor,
+de modo que el consumo de memoria se mantiene constante sin importar
+cuántas filas se exporten.
+"""
+
+import csv
+import enum
+import io
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+# Número de filas que se leen del cursor y se serializan por bloque
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+
+class ExportFormat(str, enum.Enum):
+    """Formatos de exportación soportados."""
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _serialize_value(value):
+    """Convierte un valor de columna a un tipo serializable."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+# Un solo encoder reutilizado; `default` solo se invoca para fechas y enums
+_json_encoder = json.JSONEncoder(separators=(",", ":"), default=_serialize_value)
+
+
+def _ndjson_chunk(columns: Sequence[str], rows) -> str:
+    """Serializa un bloque de filas como NDJSON."""
+    encode = _json_encoder.encode
+    return "".join([encode(dict(zip(columns, row))) + "\n" for row in rows])
+
+
+def _csv_chunk(rows) -> str:
+    """Serializa un bloque de filas como CSV."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_serialize_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_rows(
+    session_factory,
+    stmt: Select,
+    columns: Sequence[str],
+    fmt: ExportFormat,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[str]:
+    """
+    Ejecuta la consulta con un cursor del lado del servidor y emite bloques serializados.
+
+    La consulta debe seleccionar columnas (no entidades ORM) para que las filas
+    no se acumulen en el identity map de la sesión.
+    """
+    if fmt == ExportFormat.csv:
+        header = io.StringIO()
+        csv.writer(header).writerow(columns)
+        yield header.getvalue()
+
+    async with session_factory() as session:
+        result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions(chunk_size):
+            if fmt == ExportFormat.ndjson:
+                yield _ndjson_chunk(columns, rows)
+            else:
+                yield _csv_chunk(rows)
+
+
+def export_response(
+    session_factory,
+    stmt: Select,
+    columns: Sequence[str],
+    fmt: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """Construye la respuesta en streaming para una exportación."""
+    return StreamingResponse(
+        stream_rows(session_factory, stmt, columns, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt.value}"'},
+    )
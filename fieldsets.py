@@ -0,0 +1,81 @@
+"""
+Selección de campos (`fields=`) para los listados del Sistema de Gestión de Cine.
+
+`?fields=id,title` limita tanto la consulta (solo se cargan esas columnas)
+como el JSON de respuesta. Los campos se validan contra el esquema de
+respuesta; `id` se incluye siempre para que el cliente pueda identificar
+cada fila y pedir el detalle.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from pydantic import ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import load_only
+
+Fields = Optional[Tuple[str, ...]]
+
+
+class FieldSet:
+    """Campos seleccionables de un esquema de respuesta respaldado por un modelo."""
+
+    def __init__(self, schema, model):
+        self.schema = schema
+        self.model = model
+        columns = model.__table__.c
+        # Orden del esquema; solo campos que son columnas del modelo
+        self.allowed = tuple(name for name in schema.model_fields if name in columns)
+        self._adapters: Dict[Fields, TypeAdapter] = {None: TypeAdapter(List[schema])}
+
+    def parse(self, fields: Optional[str]) -> Fields:
+        """
+        Valida `fields` (nombres separados por comas) y devuelve los campos
+        en el orden del esquema, o None si no se pidió selección.
+        """
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        if not requested:
+            raise HTTPException(status_code=400, detail="fields must list at least one field")
+        unknown = sorted(requested - set(self.allowed))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(self.allowed)}",
+            )
+        requested.add("id")
+        return tuple(name for name in self.allowed if name in requested)
+
+    def load_options(self, fields: Fields) -> list:
+        """Opciones para `select(model)` que cargan solo las columnas pedidas."""
+        if fields is None:
+            return []
+        return [load_only(*[getattr(self.model, name) for name in fields])]
+
+    def columns(self, selectable, fields: Fields) -> list:
+        """Columnas de `selectable` (tabla o subconsulta) para `select(*columnas)`."""
+        return [selectable.c[name] for name in fields or self.allowed]
+
+    def adapter(self, fields: Fields) -> TypeAdapter:
+        """Serializador de listas con solo `fields` (se crea una vez por combinación)."""
+        adapter = self._adapters.get(fields)
+        if adapter is None:
+            partial = create_model(
+                f"{self.schema.__name__}Fields",
+                __config__=ConfigDict(from_attributes=True),
+                **{name: (self.schema.model_fields[name].annotation, ...) for name in fields},
+            )
+            adapter = self._adapters[fields] = TypeAdapter(List[partial])
+        return adapter
+
+    def dump_json(self, rows: Sequence, fields: Fields) -> bytes:
+        """JSON de `rows` (objetos ORM o filas) con solo los campos pedidos."""
+        adapter = self.adapter(fields)
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def response(self, rows: Sequence, fields: Fields) -> Response:
+        """Respuesta JSON con solo los campos pedidos (sin pasar por `response_model`)."""
+        return Response(content=self.dump_json(rows, fields), media_type="application/json")
+
+
+FIELDS_DESCRIPTION = "Campos a devolver, separados por comas (p. ej. `id,title`); `id` se incluye siempre"
@@ -0,0 +1,130 @@
+"""
+Géneros normalizados de las películas para el Sistema de Gestión de Cine.
+
+`Movie.genre` es texto libre ("Drama, Comedia"); cada nombre separado por
+comas se guarda una vez en `genres` (por su nombre en minúsculas) y se enlaza
+a la película en `movie_genres`. Así `GET /movies/?genre=` usa el índice
+`(genre_id, movie_id)` en lugar de un `LIKE` sobre toda la tabla, y los
+conteos por género salen de una agrupación sobre los enlaces.
+
+Los enlaces se rehacen en cada escritura de películas, en la misma
+transacción; `backfill_movie_genres` los crea para películas existentes.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models import Genre, Movie, MovieGenre
+
+GENRE_BACKFILL_BATCH_SIZE = int(os.getenv("GENRE_BACKFILL_BATCH_SIZE", "5000"))
+
+_UPSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def genre_keys(genre: Optional[str]) -> List[str]:
+    """Géneros de una película ("Drama, Comedia" -> ["drama", "comedia"])."""
+    return list(_split(genre))
+
+
+def _split(genre: Optional[str]) -> Dict[str, str]:
+    """Nombre en minúsculas -> nombre tal como se escribió, sin repetidos."""
+    names = {}
+    for name in (genre or "").split(","):
+        name = name.strip()
+        if name:
+            names.setdefault(name.lower(), name)
+    return names
+
+
+async def _genre_ids(db: AsyncSession, names: Dict[str, str]) -> Dict[str, int]:
+    """Ids de los géneros, creando los que falten (INSERT ... ON CONFLICT DO NOTHING)."""
+    if not names:
+        return {}
+    upsert = _UPSERTS[db.get_bind().dialect.name]
+    await db.execute(
+        upsert(Genre).values([{"slug": slug, "name": name} for slug, name in names.items()])
+        .on_conflict_do_nothing(index_elements=["slug"])
+    )
+    result = await db.execute(select(Genre.slug, Genre.id).where(Genre.slug.in_(list(names))))
+    return dict(result.all())
+
+
+async def set_movie_genres(db: AsyncSession, movies: Iterable[Tuple[int, Optional[str]]]):
+    """Rehace los enlaces de género de las películas `(id, genre)`, en la transacción del llamante."""
+    genres = {movie_id: _split(genre) for movie_id, genre in movies}
+    if not genres:
+        return
+    names: Dict[str, str] = {}
+    for movie_names in genres.values():
+        for slug, name in movie_names.items():
+            names.setdefault(slug, name)
+    ids = await _genre_ids(db, names)
+    await db.execute(delete(MovieGenre).where(MovieGenre.movie_id.in_(list(genres))))
+    links = [
+        {"movie_id": movie_id, "genre_id": ids[slug]}
+        for movie_id, movie_names in genres.items()
+        for slug in movie_names
+    ]
+    if links:
+        await db.execute(insert(MovieGenre), links)
+
+
+async def backfill_movie_genres(
+    db: AsyncSession,
+    batch_size: int = GENRE_BACKFILL_BATCH_SIZE,
+    after_id: int = 0,
+) -> int:
+    """
+    Crea los enlaces de género de las películas con id mayor que `after_id`, por lotes de ids.
+
+    Cada lote tiene su propio commit y rehace los enlaces desde cero, así que
+    puede relanzarse. Devuelve el número de películas procesadas.
+    """
+    total = 0
+    last_id = after_id
+    while True:
+        result = await db.execute(
+            select(Movie.id, Movie.genre).where(Movie.id > last_id).order_by(Movie.id).limit(batch_size)
+            .execution_options(include_deleted=True)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        await set_movie_genres(db, rows)
+        await db.commit()
+        total += len(rows)
+        last_id = rows[-1].id
+    return total
+
+
+def movies_in_genre(genre: str):
+    """SELECT de las películas vivas de un género, en orden de id."""
+    return (
+        select(Movie)
+        .join(MovieGenre, MovieGenre.movie_id == Movie.id)
+        .join(Genre, Genre.id == MovieGenre.genre_id)
+        .where(Genre.slug == genre.strip().lower())
+        # Mismo orden que Movie.id, pero el del índice: sin ordenar todo el género
+        .order_by(MovieGenre.movie_id)
+    )
+
+
+async def genre_counts(db: AsyncSession) -> Dict[str, int]:
+    """Películas vivas por género (nombre en minúsculas)."""
+    result = await db.execute(
+        select(Genre.slug, func.count(MovieGenre.movie_id))
+        .join(MovieGenre, MovieGenre.genre_id == Genre.id)
+        .join(Movie, Movie.id == MovieGenre.movie_id)
+        .where(Movie.deleted_at.is_(None))
+        .group_by(Genre.slug)
+    )
+    return dict(result.all())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script para importar películas u horarios de forma masiva.
+
+Uso:
+    python import_data.py showtimes temporada.csv
+    python import_data.py movies catalogo.ndjson --format ndjson
+"""
+
+import argparse
+import asyncio
+import time
+
+from database import async_session
+from imports import IMPORT_CHUNK_SIZE, ImportFormat, detect_format, import_movies, import_showtimes, iter_records
+
+IMPORTERS = {
+    "movies": import_movies,
+    "showtimes": import_showtimes,
+}
+
+
+async def run_import(kind: str, path: str, fmt: ImportFormat, chunk_size: int) -> bool:
+    """Importa el archivo y muestra el reporte."""
+    started = time.perf_counter()
+    with open(path, encoding="utf-8", newline="") as stream:
+        async with async_session() as session:
+            report = await IMPORTERS[kind](session, iter_records(stream, fmt), chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Insertadas: {report.inserted} filas en {elapsed:.2f}s "
+          f"({report.inserted / elapsed if elapsed else 0:,.0f} filas/s)")
+    if report.failed:
+        print(f"❌ Fallidas: {report.failed}")
+        for error in report.errors:
+            print(f"   fila {error.row}: {error.error}")
+    return report.failed == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importación masiva de películas u horarios")
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=[f.value for f in ImportFormat])
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = ImportFormat(args.format) if args.format else detect_format(args.path)
+    success = asyncio.run(run_import(args.kind, args.path, fmt, args.chunk_size))
+    exit(0 if success else 1)
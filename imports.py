@@ -0,0 +1,337 @@
+"""
+Importación masiva para el Sistema de Gestión de Cine.
+
+Lee archivos CSV o NDJSON en streaming, valida las filas por bloques y las
+inserta con INSERT multi-fila (o COPY en PostgreSQL), devolviendo un
+reporte de errores por fila. Las altas masivas de usuarios siguen el mismo
+esquema, comprobando la unicidad con una consulta por bloque y hasheando
+las contraseñas en un pool de procesos.
+"""
+
+import asyncio
+import csv
+import enum
+import io
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Tuple, Type, Union
+
+from asyncpg.exceptions import UniqueViolationError
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models import Movie, Showtime, User
+from passwords import hash_passwords
+from scheduling import TheaterSchedule, load_theater_schedules
+from schemas import ImportReport, ImportRowError, MovieCreate, ShowtimeCreate, UserCreate
+
+# Filas validadas e insertadas por transacción
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+# Máximo de errores detallados en el reporte (el total siempre se cuenta)
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+# Máximo de usuarios por petición a POST /users/bulk
+USER_BULK_MAX_RECORDS = int(os.getenv("USER_BULK_MAX_RECORDS", "10000"))
+
+
+class ImportFormat(str, enum.Enum):
+    """Formatos de importación soportados."""
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def detect_format(filename: Optional[str]) -> ImportFormat:
+    """Deduce el formato a partir de la extensión del archivo."""
+    if filename and filename.lower().endswith(".csv"):
+        return ImportFormat.csv
+    return ImportFormat.ndjson
+
+
+def open_upload(upload: UploadFile) -> TextIO:
+    """Envuelve el archivo subido para leerlo como texto línea a línea."""
+    return io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+
+
+def iter_records(stream: TextIO, fmt: ImportFormat) -> Iterator[Tuple[int, object]]:
+    """
+    Recorre el archivo de entrada devolviendo (número de fila, registro).
+
+    Las líneas NDJSON inválidas se devuelven como `ValueError` para que
+    aparezcan en el reporte en lugar de abortar la importación.
+    """
+    if fmt == ImportFormat.csv:
+        # La fila 1 es la cabecera; los campos vacíos usan el valor por defecto
+        for row_number, row in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, {key: value for key, value in row.items() if value != ""}
+    else:
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as e:
+                yield row_number, ValueError(f"Invalid JSON: {e}")
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Resume un error de Pydantic en una sola línea."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def _parse_chunk(
+    records: Iterator[Tuple[int, object]], size: int, schema: Type[BaseModel]
+) -> List[Tuple[int, Union[dict, str]]]:
+    """Lee y valida hasta `size` registros: `(fila, datos)` o `(fila, mensaje de error)`."""
+    parsed = []
+    for row_number, record in islice(records, size):
+        if isinstance(record, Exception):
+            parsed.append((row_number, str(record)))
+            continue
+        try:
+            parsed.append((row_number, schema.model_validate(record).model_dump()))
+        except ValidationError as e:
+            parsed.append((row_number, _format_validation_error(e)))
+    return parsed
+
+
+async def _parsed_chunks(
+    records: Iterable[Tuple[int, object]], size: int, schema: Type[BaseModel]
+):
+    """
+    Bloques de `_parse_chunk`. La lectura del archivo y la validación se hacen
+    en un hilo, para no bloquear el bucle de eventos durante importaciones grandes.
+    """
+    records = iter(records)
+    loop = asyncio.get_running_loop()
+    while parsed := await loop.run_in_executor(None, _parse_chunk, records, size, schema):
+        yield parsed
+
+
+async def _insert_rows(session: AsyncSession, model, rows: List[dict]):
+    """
+    Inserta las filas en bloque.
+
+    En PostgreSQL con asyncpg usa COPY; en otros motores, un INSERT
+    multi-fila (executemany con insertmanyvalues).
+    """
+    connection = await session.connection()
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "asyncpg":
+        columns = list(rows[0])
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await session.execute(insert(model.__table__), rows)
+
+
+async def _missing_movie_ids(session: AsyncSession, movie_ids: set) -> set:
+    """Devuelve los ids de película inexistentes con una sola consulta."""
+    result = await session.execute(select(Movie.id).where(Movie.id.in_(movie_ids)))
+    return movie_ids - set(result.scalars().all())
+
+
+async def _drop_overlapping_showtimes(
+    session: AsyncSession,
+    valid: List[Tuple[int, dict]],
+    add_error: Callable[[int, str], None],
+) -> List[Tuple[int, dict]]:
+    """
+    Descarta los horarios del bloque que terminan antes de empezar o se solapan,
+    en su sala, con uno existente o con otro anterior del mismo bloque. Los
+    horarios existentes de las salas del bloque se cargan con una consulta.
+    """
+    ordered = [(n, data) for n, data in valid if data["end_time"] > data["start_time"]]
+    for row_number, data in valid:
+        if data["end_time"] <= data["start_time"]:
+            add_error(row_number, "end_time must be after start_time")
+    if not ordered:
+        return []
+    schedules = await load_theater_schedules(
+        session,
+        list({data["theater"] for _, data in ordered}),
+        min(data["start_time"] for _, data in ordered),
+        max(data["end_time"] for _, data in ordered),
+    )
+    kept = []
+    for row_number, data in ordered:
+        schedule = schedules.setdefault(data["theater"], TheaterSchedule())
+        if schedule.blocking_end(data["start_time"], data["end_time"]) is not None:
+            add_error(row_number, "Showtime overlaps another showtime in the same theater")
+            continue
+        schedule.add(data["start_time"], data["end_time"])
+        kept.append((row_number, data))
+    return kept
+
+
+async def _import(
+    session: AsyncSession,
+    records: Iterable[Tuple[int, object]],
+    schema: Type[BaseModel],
+    model,
+    timestamps: Tuple[str, ...],
+    check_movies: bool = False,
+    check_overlaps: bool = False,
+    chunk_size: Optional[int] = None,
+    prepare: Optional[Callable[[dict], None]] = None,
+) -> ImportReport:
+    """Valida e inserta los registros por bloques."""
+    inserted = 0
+    failed = 0
+    errors: List[ImportRowError] = []
+
+    def add_error(row_number: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append(ImportRowError(row=row_number, error=message))
+
+    async for chunk in _parsed_chunks(records, chunk_size or IMPORT_CHUNK_SIZE, schema):
+        now = datetime.utcnow()
+        valid: List[Tuple[int, dict]] = []
+        for row_number, data in chunk:
+            if isinstance(data, str):
+                add_error(row_number, data)
+                continue
+            for column in timestamps:
+                data[column] = now
+            if prepare is not None:
+                prepare(data)
+            valid.append((row_number, data))
+
+        if check_movies and valid:
+            missing = await _missing_movie_ids(session, {data["movie_id"] for _, data in valid})
+            if missing:
+                for row_number, data in valid:
+                    if data["movie_id"] in missing:
+                        add_error(row_number, "Movie not found")
+                valid = [(n, data) for n, data in valid if data["movie_id"] not in missing]
+
+        if check_overlaps and valid:
+            valid = await _drop_overlapping_showtimes(session, valid, add_error)
+
+        if valid:
+            await _insert_rows(session, model, [data for _, data in valid])
+            await session.commit()
+            inserted += len(valid)
+
+    return ImportReport(inserted=inserted, failed=failed, errors=errors)
+
+
+async def import_movies(session: AsyncSession, records, chunk_size: Optional[int] = None) -> ImportReport:
+    """Importa películas desde registros ya leídos con `iter_records`."""
+    return await _import(session, records, MovieCreate, Movie,
+                         ("created_at", "updated_at"), chunk_size=chunk_size)
+
+
+def _prepare_showtime(data: dict):
+    """Los horarios nuevos empiezan con todos los asientos disponibles."""
+    data["capacity"] = data["available_seats"]
+
+
+async def import_showtimes(session: AsyncSession, records, chunk_size: Optional[int] = None) -> ImportReport:
+    """Importa horarios verificando las películas y los solapamientos con una consulta por bloque."""
+    return await _import(session, records, ShowtimeCreate, Showtime,
+                         ("created_at", "updated_at"), check_movies=True, check_overlaps=True, chunk_size=chunk_size,
+                         prepare=_prepare_showtime)
+
+
+async def _drop_taken_users(
+    session: AsyncSession,
+    valid: List[Tuple[int, dict]],
+    add_error: Callable[[int, str], None],
+) -> List[Tuple[int, dict]]:
+    """Descarta los usuarios cuyo username o email ya existen, con una sola consulta."""
+    usernames = {data["username"] for _, data in valid}
+    emails = {data["email"] for _, data in valid}
+    result = await session.execute(
+        select(User.username, User.email).where(or_(User.username.in_(usernames), User.email.in_(emails)))
+    )
+    rows = result.all()
+    taken_usernames = {row.username for row in rows}
+    taken_emails = {row.email for row in rows}
+    remaining = []
+    for row_number, data in valid:
+        if data["username"] in taken_usernames:
+            add_error(row_number, "Username already registered")
+        elif data["email"] in taken_emails:
+            add_error(row_number, "Email already registered")
+        else:
+            remaining.append((row_number, data))
+    return remaining
+
+
+async def import_users(session: AsyncSession, records, chunk_size: Optional[int] = None) -> ImportReport:
+    """
+    Da de alta usuarios en bloque desde `(posición, registro)`.
+
+    Los duplicados, ya existentes o repetidos dentro de la propia petición,
+    se informan por registro sin hashear su contraseña. Si otro alta ocupa
+    un username o email entre la comprobación y el INSERT, se vuelve a
+    comprobar el bloque y se reintenta sin los conflictos.
+    """
+    inserted = 0
+    failed = 0
+    errors: List[ImportRowError] = []
+    seen_usernames = set()
+    seen_emails = set()
+
+    def add_error(row_number: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append(ImportRowError(row=row_number, error=message))
+
+    async for chunk in _parsed_chunks(records, chunk_size or IMPORT_CHUNK_SIZE, UserCreate):
+        valid: List[Tuple[int, dict]] = []
+        for row_number, data in chunk:
+            if isinstance(data, str):
+                add_error(row_number, data)
+                continue
+            if data["username"] in seen_usernames:
+                add_error(row_number, "Duplicate username in request")
+                continue
+            if data["email"] in seen_emails:
+                add_error(row_number, "Duplicate email in request")
+                continue
+            seen_usernames.add(data["username"])
+            seen_emails.add(data["email"])
+            valid.append((row_number, data))
+        if not valid:
+            continue
+
+        valid = await _drop_taken_users(session, valid, add_error)
+        hashes = await hash_passwords([data.pop("password") for _, data in valid])
+        now = datetime.utcnow()
+        for (_, data), password_hash in zip(valid, hashes):
+            data["password_hash"] = password_hash
+            data["role"] = data["role"].name
+            data["created_at"] = now
+            data["updated_at"] = now
+
+        while valid:
+            try:
+                await _insert_rows(session, User, [data for _, data in valid])
+                await session.commit()
+            # El COPY de asyncpg no pasa por SQLAlchemy: su error llega sin envolver
+            except (IntegrityError, UniqueViolationError):
+                await session.rollback()
+                remaining = await _drop_taken_users(session, valid, add_error)
+                if len(remaining) == len(valid):
+                    raise
+                valid = remaining
+                continue
+            inserted += len(valid)
+            break
+
+    return ImportReport(inserted=inserted, failed=failed, errors=errors)
@@ -0,0 +1,253 @@
+"""
+Trabajos en segundo plano para el Sistema de Gestión de Cine.
+
+Los handlers encolan trabajos con `enqueue` dentro de su propia transacción;
+`JobWorker` los reclama de la tabla `jobs` (con `FOR UPDATE SKIP LOCKED` en
+PostgreSQL, para que varios workers compartan la cola), los ejecuta con
+concurrencia acotada y reintenta los fallos con backoff exponencial.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from metrics import Counter, Gauge, Summary
+from models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Configuración del worker
+JOBS_WORKER_ENABLED = os.getenv("JOBS_WORKER_ENABLED", "true").lower() == "true"
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "4"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "2.0"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "300"))
+# Trabajos en `running` más tiempo que esto se consideran huérfanos (worker caído)
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "600"))
+
+# Métricas
+jobs_enqueued = Counter("jobs_enqueued_total", "Trabajos encolados")
+jobs_finished = Counter("jobs_finished_total", "Ejecuciones de trabajos por resultado")
+queue_depth = Gauge("jobs_queue_depth", "Trabajos pendientes en la cola")
+jobs_running = Gauge("jobs_running", "Trabajos ejecutándose en este worker")
+wait_seconds = Summary("jobs_wait_seconds", "Tiempo entre run_at y el inicio de la ejecución")
+run_seconds = Summary("jobs_run_seconds", "Duración de la ejecución de los trabajos")
+
+JobHandler = Callable[[AsyncSession, dict], Awaitable[None]]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job(name: str):
+    """
+    Registra un handler de trabajos.
+
+    El handler recibe una sesión propia y el payload; si lanza una
+    excepción, el trabajo se reintenta con backoff.
+    """
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(
+    db: AsyncSession,
+    name: str,
+    payload: Optional[dict] = None,
+    delay: float = 0,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> Job:
+    """
+    Encola un trabajo en la transacción actual.
+
+    El trabajo solo será visible para los workers cuando se haga commit,
+    de modo que no se ejecuta si la petición falla.
+    """
+    if name not in _handlers:
+        raise ValueError(f"Unknown job: {name}")
+    db_job = Job(
+        name=name,
+        payload=json.dumps(payload or {}),
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    db.add(db_job)
+    jobs_enqueued.inc(name=name)
+    return db_job
+
+
+def backoff_delay(attempts: int) -> float:
+    """Espera antes del siguiente intento: exponencial, con tope y jitter."""
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class JobWorker:
+    """Ejecuta trabajos de la cola con concurrencia acotada."""
+
+    def __init__(
+        self,
+        session_factory,
+        concurrency: int = JOB_CONCURRENCY,
+        poll_interval: float = JOB_POLL_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: set = set()
+        self._stopping = asyncio.Event()
+
+    async def claim(self, limit: int) -> List[Job]:
+        """Reclama hasta `limit` trabajos listos y los marca como `running`."""
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Job)
+                .where(Job.status == JobStatus.pending, Job.run_at <= now)
+                .order_by(Job.run_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            claimed = result.scalars().all()
+            for db_job in claimed:
+                db_job.status = JobStatus.running
+                db_job.attempts += 1
+                db_job.started_at = now
+            await session.commit()
+        return claimed
+
+    async def _finish(self, db_job: Job, error: Optional[BaseException]):
+        """Guarda el resultado de una ejecución."""
+        values = {"finished_at": datetime.utcnow()}
+        if error is None:
+            values.update(status=JobStatus.done, last_error=None)
+            outcome = "done"
+        elif db_job.attempts < db_job.max_attempts:
+            values.update(
+                status=JobStatus.pending,
+                last_error=repr(error),
+                run_at=datetime.utcnow() + timedelta(seconds=backoff_delay(db_job.attempts)),
+            )
+            outcome = "retry"
+        else:
+            values.update(status=JobStatus.failed, last_error=repr(error))
+            outcome = "failed"
+        async with self.session_factory() as session:
+            await session.execute(update(Job).where(Job.id == db_job.id).values(**values))
+            await session.commit()
+        jobs_finished.inc(name=db_job.name, outcome=outcome)
+
+    async def execute(self, db_job: Job):
+        """Ejecuta un trabajo reclamado y registra el resultado."""
+        wait_seconds.observe((db_job.started_at - db_job.run_at).total_seconds(), name=db_job.name)
+        jobs_running.inc()
+        started = time.perf_counter()
+        error = None
+        try:
+            handler = _handlers.get(db_job.name)
+            if handler is None:
+                raise LookupError(f"No handler registered for job {db_job.name}")
+            async with self.session_factory() as session:
+                await handler(session, json.loads(db_job.payload))
+        except Exception as e:
+            logger.warning("Job %s (%s) failed: %r", db_job.id, db_job.name, e)
+            error = e
+        finally:
+            jobs_running.dec()
+            run_seconds.observe(time.perf_counter() - started, name=db_job.name)
+        await self._finish(db_job, error)
+
+    async def _run_claimed(self, db_job: Job):
+        try:
+            await self.execute(db_job)
+        finally:
+            self._slots.release()
+
+    async def reclaim_stale(self) -> int:
+        """
+        Devuelve a `pending` los trabajos `running` de workers caídos; los que
+        ya agotaron sus intentos pasan a `failed`, como en `_finish`.
+        """
+        now = datetime.utcnow()
+        stale = (Job.status == JobStatus.running, Job.started_at < now - timedelta(seconds=JOB_TIMEOUT))
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(*stale, Job.attempts >= Job.max_attempts)
+                .values(status=JobStatus.failed, finished_at=now, last_error="Job timed out: worker lost")
+                .returning(Job.name)
+            )
+            failed = result.scalars().all()
+            result = await session.execute(update(Job).where(*stale).values(status=JobStatus.pending, run_at=now))
+            await session.commit()
+        for name in failed:
+            jobs_finished.inc(name=name, outcome="failed")
+        return len(failed) + result.rowcount
+
+    async def update_queue_depth(self):
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(func.count()).select_from(Job).where(Job.status == JobStatus.pending)
+            )
+            queue_depth.set(result.scalar())
+
+    async def run_once(self) -> int:
+        """Reclama trabajos para los huecos libres y los lanza. Devuelve cuántos lanzó."""
+        free = 0
+        while not self._slots.locked() and free < self.concurrency:
+            await self._slots.acquire()
+            free += 1
+        if free == 0:
+            return 0
+        claimed = await self.claim(free)
+        for _ in range(free - len(claimed)):
+            self._slots.release()
+        for db_job in claimed:
+            task = asyncio.create_task(self._run_claimed(db_job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(claimed)
+
+    async def run(self):
+        """Bucle del worker hasta llamar a `stop`; espera a los trabajos en curso."""
+        last_maintenance = 0.0
+        while not self._stopping.is_set():
+            try:
+                if time.monotonic() - last_maintenance >= JOB_TIMEOUT / 10:
+                    await self.reclaim_stale()
+                    last_maintenance = time.monotonic()
+                started = await self.run_once()
+                await self.update_queue_depth()
+            except Exception:
+                logger.exception("Job worker iteration failed")
+                started = 0
+            if started == 0:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                # Ceder el control para que los trabajos lanzados avancen
+                await asyncio.sleep(0)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def drain(self):
+        """Ejecuta trabajos listos hasta vaciar la cola (útil en tests y scripts)."""
+        while await self.run_once():
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.update_queue_depth()
+
+    def stop(self):
+        self._stopping.set()
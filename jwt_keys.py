@@ -0,0 +1,201 @@
+"""
+Claves de firma de JWT para el Sistema de Gestión de Cine.
+
+Con `JWT_KEYS_DIR` los tokens se firman con ES256 y llevan la cabecera
+`kid`; cualquier servicio puede verificarlos con las claves públicas que se
+publican en JWKS, sin conocer ningún secreto. El directorio contiene:
+
+- `<kid>.pem`: clave privada EC P-256. Firma la de `kid` mayor en orden
+  lexicográfico (p. ej. nombradas por fecha) salvo que se fije
+  `JWT_SIGNING_KID`.
+- `<kid>.pub.pem`: clave pública retirada que se sigue aceptando hasta que
+  caduquen los tokens que firmó.
+
+El directorio se vuelve a leer cada `JWT_KEYS_RELOAD_SECONDS` (o al ver un
+`kid` desconocido) y las claves ya parseadas se reutilizan mientras su
+fichero no cambie. Los tokens ya verificados se recuerdan por su hash
+durante `JWT_VERIFY_CACHE_SECONDS`.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from jose import jwk
+from jose.backends.base import Key
+
+from metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+JWT_SIGNING_KID = os.getenv("JWT_SIGNING_KID")
+JWT_KEYS_RELOAD_SECONDS = float(os.getenv("JWT_KEYS_RELOAD_SECONDS", "60"))
+JWT_VERIFY_CACHE_SECONDS = float(os.getenv("JWT_VERIFY_CACHE_SECONDS", "30"))
+JWT_VERIFY_CACHE_SIZE = int(os.getenv("JWT_VERIFY_CACHE_SIZE", "10000"))
+
+SIGNING_ALGORITHM = "ES256"
+# Mínimo entre relecturas provocadas por un `kid` desconocido
+UNKNOWN_KID_RELOAD_SECONDS = 1.0
+
+token_verifications = Counter("jwt_verifications_total", "Tokens de acceso verificados por resultado")
+signing_keys_loaded = Gauge("jwt_keys_loaded", "Claves de verificación cargadas")
+
+
+class KeyRegistry:
+    """Claves de firma y verificación cargadas desde un directorio."""
+
+    def __init__(
+        self,
+        directory: str,
+        signing_kid: Optional[str] = None,
+        reload_seconds: float = JWT_KEYS_RELOAD_SECONDS,
+        on_keys_removed=None,
+    ):
+        self.directory = directory
+        self.signing_kid = signing_kid
+        self.reload_seconds = reload_seconds
+        # ruta -> (mtime_ns, kid, clave privada o None, clave pública)
+        self._parsed: Dict[str, Tuple[int, str, Optional[Key], Key]] = {}
+        self._public: Dict[str, Key] = {}
+        self._signing: Optional[Tuple[str, Key]] = None
+        self._loaded_at = 0.0
+        # Se llama al retirar claves, p. ej. para vaciar la caché de verificación
+        self.on_keys_removed = on_keys_removed
+        self.reload()
+
+    def reload(self):
+        """Relee el directorio, parseando solo los ficheros nuevos o modificados."""
+        parsed = {}
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.endswith(".pem"):
+                continue
+            mtime = entry.stat().st_mtime_ns
+            cached = self._parsed.get(entry.path)
+            if cached is not None and cached[0] == mtime:
+                parsed[entry.path] = cached
+                continue
+            with open(entry.path) as f:
+                pem = f.read()
+            if entry.name.endswith(".pub.pem"):
+                kid = entry.name[:-len(".pub.pem")]
+                private, public = None, jwk.construct(pem, SIGNING_ALGORITHM)
+            else:
+                kid = entry.name[:-len(".pem")]
+                private = jwk.construct(pem, SIGNING_ALGORITHM)
+                public = private.public_key()
+            parsed[entry.path] = (mtime, kid, private, public)
+
+        private_keys = {kid: key for _, kid, key, _ in parsed.values() if key is not None}
+        public_keys = {kid: key for _, kid, _, key in parsed.values()}
+        signing_kid = self.signing_kid or max(private_keys, default=None)
+        if signing_kid not in private_keys:
+            raise RuntimeError(f"No private signing key '{signing_kid}' in {self.directory}")
+
+        removed = set(self._public) - set(public_keys)
+        self._parsed = parsed
+        self._public = public_keys
+        self._signing = (signing_kid, private_keys[signing_kid])
+        self._loaded_at = time.monotonic()
+        signing_keys_loaded.set(len(public_keys))
+        if removed:
+            logger.info("JWT keys removed: %s", ", ".join(sorted(removed)))
+            if self.on_keys_removed is not None:
+                self.on_keys_removed()
+
+    def _maybe_reload(self, min_age: float):
+        if time.monotonic() - self._loaded_at < min_age:
+            return
+        try:
+            self.reload()
+        except Exception:
+            # Un fichero a medio escribir no debe tumbar la firma: se
+            # siguen usando las claves anteriores hasta la próxima lectura.
+            logger.exception("Reloading JWT keys failed")
+            self._loaded_at = time.monotonic()
+
+    def signing_key(self) -> Tuple[str, Key]:
+        """`(kid, clave privada)` con la que firmar tokens nuevos."""
+        self._maybe_reload(self.reload_seconds)
+        return self._signing
+
+    def verification_key(self, kid: Optional[str]) -> Optional[Key]:
+        """Clave pública de `kid`, o None si no existe."""
+        self._maybe_reload(self.reload_seconds)
+        key = self._public.get(kid)
+        if key is None and kid is not None:
+            # Otro worker pudo empezar a firmar con una clave recién añadida
+            self._maybe_reload(UNKNOWN_KID_RELOAD_SECONDS)
+            key = self._public.get(kid)
+        return key
+
+    def jwks(self) -> dict:
+        """Claves públicas en formato JWK Set (RFC 7517)."""
+        return {
+            "keys": [
+                {**key.to_dict(), "kid": kid, "use": "sig"}
+                for kid, key in sorted(self._public.items())
+            ]
+        }
+
+
+class VerifiedTokenCache:
+    """
+    Payloads de tokens ya verificados, por hash del token.
+
+    Una entrada nunca sobrevive al `exp` del token. La revocación se sigue
+    comprobando en cada petición, fuera de esta caché.
+    """
+
+    def __init__(self, ttl: float = JWT_VERIFY_CACHE_SECONDS, max_size: int = JWT_VERIFY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[bytes, Tuple[float, dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        if self.ttl <= 0:
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def put(self, token: str, payload: dict):
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        if len(self._entries) >= self.max_size:
+            self._evict(now)
+        self._entries[self._key(token)] = (expires_at, payload)
+
+    def _evict(self, now: float):
+        """Descarta las entradas caducadas y, si no basta, las más antiguas."""
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+        while len(self._entries) >= self.max_size:
+            self._entries.pop(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+key_registry = (
+    KeyRegistry(JWT_KEYS_DIR, JWT_SIGNING_KID, on_keys_removed=verified_tokens.clear)
+    if JWT_KEYS_DIR else None
+)
@@ -0,0 +1,97 @@
+"""
+Carga agrupada por clave primaria (estilo DataLoader) para el Sistema de Gestión de Cine.
+
+Las búsquedas de películas, horarios y usuarios por id que se piden en la
+misma vuelta del bucle de eventos (p. ej. desde varias corrutinas en un
+`asyncio.gather`) se resuelven con una sola consulta `WHERE id IN (...)`
+por modelo, y el resultado se recuerda hasta el final de la petición.
+
+Los cargadores usan la sesión de la petición: como cualquier otra
+consulta, no deben esperarse a la vez que otras operaciones sobre esa
+misma sesión. Las filas borradas lógicamente se excluyen igual que en el
+resto de consultas ORM.
+"""
+
+import asyncio
+from typing import Dict, Generic, Iterable, List, Optional, Type, TypeVar
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from database import get_db
+from metrics import Counter
+from models import Movie, Showtime, User
+
+T = TypeVar("T")
+
+loader_keys = Counter("loader_keys_total", "Claves pedidas a los cargadores por modelo y origen (cache o query)")
+
+
+class Loader(Generic[T]):
+    """Cargador por clave primaria de un modelo, con caché para toda la petición."""
+
+    def __init__(self, session: AsyncSession, model: Type[T]):
+        self.session = session
+        self.model = model
+        self._futures: Dict[int, asyncio.Future] = {}
+        self._pending: List[int] = []
+
+    def load(self, key: int) -> "asyncio.Future[Optional[T]]":
+        """Futuro con la fila de `key`, o None si no existe."""
+        future = self._futures.get(key)
+        if future is not None:
+            loader_keys.inc(model=self.model.__name__, source="cache")
+            return future
+        loop = asyncio.get_running_loop()
+        future = self._futures[key] = loop.create_future()
+        if not self._pending:
+            # Se consulta cuando terminan los pasos ya encolados en esta vuelta
+            loop.call_soon(self._dispatch)
+        self._pending.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[int]) -> List[Optional[T]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, obj: T):
+        """Añade a la caché una fila ya cargada."""
+        if obj.id not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(obj)
+            self._futures[obj.id] = future
+
+    def _dispatch(self):
+        keys, self._pending = self._pending, []
+        asyncio.ensure_future(self._fetch(keys))
+
+    async def _fetch(self, keys: List[int]):
+        loader_keys.inc(len(keys), model=self.model.__name__, source="query")
+        try:
+            result = await self.session.execute(select(self.model).where(self.model.id.in_(keys)))
+            rows = {row.id: row for row in result.scalars()}
+        except Exception as e:
+            for key in keys:
+                # Un fallo no se cachea: el siguiente `load` vuelve a consultar
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(rows.get(key))
+
+
+class Loaders:
+    """Cargadores de una petición, uno por modelo."""
+
+    def __init__(self, session: AsyncSession):
+        self.movies: Loader[Movie] = Loader(session, Movie)
+        self.showtimes: Loader[Showtime] = Loader(session, Showtime)
+        self.users: Loader[User] = Loader(session, User)
+
+
+async def get_loaders(db: AsyncSession = Depends(get_db)) -> Loaders:
+    """Dependencia: cargadores sobre la sesión de la petición (FastAPI la crea una vez por petición)."""
+    return Loaders(db)
@@ -4,10 +4,23 @@ Aplicación principal del Sistema de Gestión de Cine.
 Configura FastAPI con rutas, middlewares y base de datos.
 """
 
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-from routers import users, movies, showtimes, bookings, auth_router
+from fastapi.responses import PlainTextResponse
+from coalescing import SingleFlightMiddleware
+from compression import CompressionMiddleware
+from catalog import CATALOG_SNAPSHOT_ENABLED, CatalogSync
+from database import engine, Base, async_session
+import metrics
+from outbox import OUTBOX_RELAY_SINK, OutboxRelay, sink_from_url
+from jobs import JOBS_WORKER_ENABLED, JobWorker
+from passwords import shutdown_hash_pool
+from tokens import DenylistSync
+import archive  # noqa: F401  (registra el trabajo archive.run)
+import reconciliation  # noqa: F401  (registra el trabajo seats.reconcile)
+import soft_delete  # noqa: F401  (registra el trabajo soft_delete.purge)
+from routers import users, movies, showtimes, bookings, auth_router, analytics, batch
 from routers.showtimes import router as showtimes_router
 from routers.bookings import router as bookings_router
 
@@ -25,6 +38,10 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Agrupar lecturas GET idénticas y simultáneas (SINGLE_FLIGHT_ROUTES). Es el
+# middleware más interno: CORS y compresión se aplican a cada petición.
+app.add_middleware(SingleFlightMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -34,18 +51,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir respuestas (gzip/brotli/zstd según Accept-Encoding)
+app.add_middleware(CompressionMiddleware)
+
 # Incluir routers
 app.include_router(auth_router.router, prefix="/auth", tags=["autenticación"])
 app.include_router(users.router, prefix="/users", tags=["usuarios"])
 app.include_router(movies.router, prefix="/movies", tags=["películas"])
 app.include_router(showtimes_router, prefix="/showtimes", tags=["horarios"])
 app.include_router(bookings_router, prefix="/bookings", tags=["reservas"])
+app.include_router(analytics.router, prefix="/analytics", tags=["analítica"])
+app.include_router(batch.router, prefix="/batch", tags=["batch"])
+
+
+# Procesos en segundo plano: sincronización de tokens revocados y de la
+# instantánea del catálogo (CATALOG_SNAPSHOT_ENABLED), relay del outbox (si se
+# configura OUTBOX_RELAY_SINK) y worker de trabajos (JOBS_WORKER_ENABLED)
+background_services = []
+background_tasks = []
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Evento de inicio: crear tablas."""
+    """Evento de inicio: crear tablas y arrancar los procesos en segundo plano."""
     await create_tables()
+    background_services.append(DenylistSync(async_session))
+    if CATALOG_SNAPSHOT_ENABLED:
+        background_services.append(CatalogSync(async_session))
+    if OUTBOX_RELAY_SINK:
+        background_services.append(OutboxRelay(async_session, sink_from_url(OUTBOX_RELAY_SINK)))
+    if JOBS_WORKER_ENABLED:
+        background_services.append(JobWorker(async_session))
+    for service in background_services:
+        background_tasks.append(asyncio.create_task(service.run()))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Evento de cierre: detener los procesos en segundo plano.
+
+    uvicorn lo ejecuta después de esperar a las peticiones en curso, así que
+    aquí ya no queda ninguna transacción de una petición por confirmar.
+    """
+    for service in background_services:
+        service.stop()
+    await asyncio.gather(*background_tasks)
+    shutdown_hash_pool()
+    await engine.dispose()
 
 
 @app.get("/")
@@ -54,6 +107,12 @@ async def root():
     return {"message": "Gracias ABBA por tanto amor y buena música!"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """Métricas en formato Prometheus."""
+    return metrics.render()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,115 @@
+"""
+Métricas en proceso para el Sistema de Gestión de Cine.
+
+Contadores, gauges y resúmenes mínimos que se exponen en `GET /metrics`
+con el formato de texto de Prometheus.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_registry: List["_Metric"] = []
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in key) + "}"
+
+
+class _Metric:
+    """Base de las métricas registradas."""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        _registry.append(self)
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, key, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels):
+        self._values[_label_key(labels)] += amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        return [("", key, value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Valor que puede subir o bajar."""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        return [("", key, value) for key, value in self._values.items()]
+
+
+class Summary(_Metric):
+    """Suma y número de observaciones (por ejemplo, latencias en segundos)."""
+    type = "summary"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._count: Dict[LabelKey, int] = defaultdict(int)
+        self._sum: Dict[LabelKey, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        self._count[key] += 1
+        self._sum[key] += value
+
+    def count(self, **labels) -> int:
+        return self._count.get(_label_key(labels), 0)
+
+    def samples(self):
+        samples = []
+        for key, count in self._count.items():
+            samples.append(("_count", key, count))
+            samples.append(("_sum", key, self._sum[key]))
+        return samples
+
+
+def render() -> str:
+    """Serializa todas las métricas registradas en formato Prometheus."""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
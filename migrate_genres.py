@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Migración de los géneros normalizados de las películas.
+
+Crea las tablas `genres` y `movie_genres` (y su índice) en una base de datos
+existente y enlaza cada película con los géneros de su texto `genre`, por
+lotes, con un commit por lote. Es idempotente: puede relanzarse si se
+interrumpe.
+
+Uso:
+    python migrate_genres.py [--batch-size 5000]
+"""
+
+import argparse
+import asyncio
+
+from database import async_session, engine
+from genres import GENRE_BACKFILL_BATCH_SIZE, backfill_movie_genres
+from models import Genre, MovieGenre
+
+NEW_TABLES = [Genre.__table__, MovieGenre.__table__]
+
+
+def _create_missing_tables(conn):
+    for table in NEW_TABLES:
+        table.create(conn, checkfirst=True)
+
+
+async def main(batch_size: int) -> bool:
+    """Crea las tablas que falten y enlaza las películas con sus géneros."""
+    try:
+        print("🔧 Migrando géneros de películas...")
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_missing_tables)
+        async with async_session() as session:
+            total = await backfill_movie_genres(session, batch_size)
+        print(f"✅ {total} películas enlazadas con sus géneros!")
+    except Exception as e:
+        print(f"❌ Error migrando géneros: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrar géneros de películas")
+    parser.add_argument("--batch-size", type=int, default=GENRE_BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+    success = asyncio.run(main(args.batch_size))
+    exit(0 if success else 1)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Migración de los contadores de asientos de los horarios.
+
+Añade las columnas `capacity`, `seats_sold` y `updated_at` (y sus índices)
+a una base de datos existente y rellena los contadores desde las reservas,
+por lotes, con un commit por lote. También elimina `showtime_sales`: la
+ocupación por horario sale ahora de los contadores. Es idempotente: puede
+relanzarse si se interrumpe.
+
+Uso:
+    python migrate_seat_counters.py [--batch-size 5000]
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import inspect, text
+
+from database import async_session, engine
+from models import Booking, Showtime
+from seating import SEAT_BACKFILL_BATCH_SIZE, backfill_seat_counters
+
+# Índices de esta migración: el de la columna `updated_at` y el de las reservas
+# por horario, que usa el relleno de los contadores. Los índices parciales de
+# `deleted_at` son de migrate_soft_delete.py.
+NEW_INDEXES = ["ix_showtimes_updated_at", "ix_bookings_showtime_id"]
+
+NEW_COLUMNS = {
+    "capacity": "ALTER TABLE showtimes ADD COLUMN capacity INTEGER",
+    "seats_sold": "ALTER TABLE showtimes ADD COLUMN seats_sold INTEGER NOT NULL DEFAULT 0",
+    "updated_at": "ALTER TABLE showtimes ADD COLUMN updated_at TIMESTAMP",
+}
+
+
+def _add_missing_columns(conn) -> list:
+    existing = {column["name"] for column in inspect(conn).get_columns("showtimes")}
+    added = [name for name in NEW_COLUMNS if name not in existing]
+    for name in added:
+        conn.execute(text(NEW_COLUMNS[name]))
+    indexes = {index.name: index for index in [*Showtime.__table__.indexes, *Booking.__table__.indexes]}
+    for name in NEW_INDEXES:
+        indexes[name].create(conn, checkfirst=True)
+    # Sustituida por Showtime.seats_sold
+    conn.execute(text("DROP TABLE IF EXISTS showtime_sales"))
+    return added
+
+
+async def main(batch_size: int) -> bool:
+    """Añade las columnas que falten y rellena los contadores."""
+    try:
+        print("🔧 Migrando contadores de asientos...")
+        async with engine.begin() as conn:
+            added = await conn.run_sync(_add_missing_columns)
+        print(f"📋 Columnas añadidas: {', '.join(added) or 'ninguna'}")
+        async with async_session() as session:
+            total = await backfill_seat_counters(session, batch_size)
+        print(f"✅ {total} horarios actualizados!")
+    except Exception as e:
+        print(f"❌ Error migrando contadores: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrar contadores de asientos")
+    parser.add_argument("--batch-size", type=int, default=SEAT_BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+    success = asyncio.run(main(args.batch_size))
+    exit(0 if success else 1)
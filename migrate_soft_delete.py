@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Migración del borrado lógico de películas y horarios.
+
+Añade la columna `deleted_at` a `movies`, `showtimes` y `showtimes_archive`
+de una base de datos existente y crea los índices parciales. Es idempotente.
+
+Uso:
+    python migrate_soft_delete.py
+"""
+
+import asyncio
+
+from sqlalchemy import inspect, text
+
+from database import engine
+from models import Movie, Showtime, ShowtimeArchive
+
+TABLES = [Movie, Showtime, ShowtimeArchive]
+
+
+def _add_missing_columns(conn) -> list:
+    inspector = inspect(conn)
+    added = []
+    for model in TABLES:
+        table = model.__tablename__
+        if not inspector.has_table(table):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        if "deleted_at" not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN deleted_at TIMESTAMP"))
+            added.append(table)
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+    return added
+
+
+async def main() -> bool:
+    """Añade `deleted_at` y los índices parciales donde falten."""
+    try:
+        print("🔧 Migrando borrado lógico...")
+        async with engine.begin() as conn:
+            added = await conn.run_sync(_add_missing_columns)
+        print(f"✅ Columna deleted_at añadida en: {', '.join(added) or 'ninguna tabla'}")
+    except Exception as e:
+        print(f"❌ Error migrando borrado lógico: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    exit(0 if success else 1)
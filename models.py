@@ -4,8 +4,8 @@ Modelos de base de datos para el Sistema de Gestión de Cine.
 Define las tablas principales: User, Movie, Showtime, Booking.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Enum, Index, event, text
+from sqlalchemy.orm import Session, relationship, with_loader_criteria
 from datetime import datetime
 import enum
 from database import Base
@@ -32,9 +32,29 @@ class User(Base):
     # Relaciones
     bookings = relationship("Booking", back_populates="user")
 
-class Movie(Base):
+class SoftDeleteMixin:
+    """
+    Borrado lógico: las filas con `deleted_at` no se devuelven en las consultas
+    ORM salvo con `execution_options(include_deleted=True)`.
+    """
+    deleted_at = Column(DateTime)
+
+def _live_indexes(table: str, *columns: str):
+    """Índices parciales sobre las filas no borradas, y otro sobre las borradas para la purga."""
+    live = text("deleted_at IS NULL")
+    deleted = text("deleted_at IS NOT NULL")
+    return (
+        *(
+            Index(f"ix_{table}_live_{column}", column, postgresql_where=live, sqlite_where=live)
+            for column in columns
+        ),
+        Index(f"ix_{table}_deleted_at", "deleted_at", postgresql_where=deleted, sqlite_where=deleted),
+    )
+
+class Movie(SoftDeleteMixin, Base):
     """Modelo para películas."""
     __tablename__ = "movies"
+    __table_args__ = _live_indexes("movies", "id", "title")
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False, index=True)
@@ -47,10 +67,17 @@ class Movie(Base):
 
     # Relaciones
     showtimes = relationship("Showtime", back_populates="movie")
+    # Los enlaces se mantienen desde `genre` (ver `genres.set_movie_genres`)
+    genres = relationship("Genre", secondary="movie_genres", viewonly=True)
 
-class Showtime(Base):
+class Showtime(SoftDeleteMixin, Base):
     """Modelo para horarios de proyección."""
     __tablename__ = "showtimes"
+    __table_args__ = (
+        # Búsqueda de solapamientos por sala
+        Index("ix_showtimes_theater_start_time", "theater", "start_time"),
+        *_live_indexes("showtimes", "id", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     movie_id = Column(Integer, ForeignKey("movies.id"), nullable=False)
@@ -58,8 +85,11 @@ class Showtime(Base):
     start_time = Column(DateTime, nullable=False, index=True)
     end_time = Column(DateTime, nullable=False)
     available_seats = Column(Integer, nullable=False, default=100)
+    capacity = Column(Integer)  # asientos totales; NULL en horarios antiguos
+    seats_sold = Column(Integer, nullable=False, default=0, server_default="0")  # asientos de reservas activas
     price = Column(Integer, nullable=False)  # precio en centavos o unidades
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relaciones
     movie = relationship("Movie", back_populates="showtimes")
@@ -77,12 +107,184 @@ class Booking(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    showtime_id = Column(Integer, ForeignKey("showtimes.id"), nullable=False)
+    showtime_id = Column(Integer, ForeignKey("showtimes.id"), nullable=False, index=True)
     seats_booked = Column(Integer, nullable=False, default=1)
-    booking_time = Column(DateTime, default=datetime.utcnow)
+    booking_time = Column(DateTime, default=datetime.utcnow, index=True)
     status = Column(Enum(BookingStatus), nullable=False, default=BookingStatus.pending)
     total_price = Column(Integer, nullable=False)  # precio total en centavos
 
     # Relaciones
     user = relationship("User", back_populates="bookings")
-    showtime = relationship("Showtime", back_populates="bookings")
\ No newline at end of file
+    showtime = relationship("Showtime", back_populates="bookings")
+
+# Tablas de agregados para analítica, mantenidas de forma incremental
+class MovieSales(Base):
+    """Ventas acumuladas por película."""
+    __tablename__ = "movie_sales"
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    revenue = Column(Integer, nullable=False, default=0)
+    seats_sold = Column(Integer, nullable=False, default=0)
+    bookings_count = Column(Integer, nullable=False, default=0)
+
+class DailySales(Base):
+    """Ventas acumuladas por día de reserva."""
+    __tablename__ = "daily_sales"
+
+    day = Column(Date, primary_key=True)
+    revenue = Column(Integer, nullable=False, default=0)
+    seats_sold = Column(Integer, nullable=False, default=0)
+    bookings_count = Column(Integer, nullable=False, default=0)
+
+class OutboxEvent(Base):
+    """Eventos pendientes de publicar, escritos en la misma transacción que el cambio."""
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Drenado de pendientes y purga de publicados por orden de id
+        Index("ix_outbox_events_published_at_id", "published_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    aggregate_type = Column(String(50), nullable=False)
+    aggregate_id = Column(Integer, nullable=False, index=True)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    published_at = Column(DateTime)
+
+class JobStatus(enum.Enum):
+    """Enumeración para el estado de los trabajos en segundo plano."""
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+class Job(Base):
+    """Trabajo en segundo plano persistido en la cola de la base de datos."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Reclamo de trabajos listos para ejecutarse
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Tablas de archivo: horarios antiguos y sus reservas, movidos por lotes
+# fuera de las tablas vivas para que las consultas habituales no los recorran
+class ShowtimeArchive(Base):
+    """Horarios archivados; conservan el id original."""
+    __tablename__ = "showtimes_archive"
+
+    id = Column(Integer, primary_key=True)
+    movie_id = Column(Integer, nullable=False, index=True)
+    theater = Column(String(100), nullable=False)
+    start_time = Column(DateTime, nullable=False, index=True)
+    end_time = Column(DateTime, nullable=False)
+    available_seats = Column(Integer, nullable=False)
+    capacity = Column(Integer)
+    seats_sold = Column(Integer, nullable=False, default=0)
+    price = Column(Integer, nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class BookingArchive(Base):
+    """Reservas de horarios archivados; conservan el id original."""
+    __tablename__ = "bookings_archive"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    showtime_id = Column(Integer, nullable=False, index=True)
+    seats_booked = Column(Integer, nullable=False)
+    booking_time = Column(DateTime, index=True)
+    status = Column(Enum(BookingStatus), nullable=False)
+    total_price = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+# Tokens de refresco y revocaciones
+class RefreshToken(Base):
+    """
+    Token de refresco, guardado como hash SHA-256.
+
+    Los tokens de una misma sesión comparten `family_id`; al rotar se marca
+    `rotated_at`, y presentar de nuevo un token rotado revoca la familia.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    rotated_at = Column(DateTime)
+    revoked_at = Column(DateTime)
+
+class RevokedToken(Base):
+    """Ids revocados (jti de un token de acceso o familia de refresco) hasta que caducan."""
+    __tablename__ = "revoked_tokens"
+
+    id = Column(String(32), primary_key=True)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# Versión del catálogo de películas, para refrescar las instantáneas en memoria
+class CatalogVersion(Base):
+    """Fila única con la versión del catálogo; cada escritura de películas la incrementa."""
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class CatalogChange(Base):
+    """Películas cambiadas en cada versión; `movie_id` nulo pide recargar el catálogo entero."""
+    __tablename__ = "catalog_changes"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, index=True)
+    movie_id = Column(Integer)
+
+# Géneros normalizados de las películas; `Movie.genre` sigue siendo el texto que se muestra
+class Genre(Base):
+    """Género, identificado por su nombre en minúsculas."""
+    __tablename__ = "genres"
+
+    id = Column(Integer, primary_key=True)
+    slug = Column(String(100), nullable=False, unique=True)
+    name = Column(String(100), nullable=False)  # como se escribió la primera vez
+
+class MovieGenre(Base):
+    """Enlace película-género."""
+    __tablename__ = "movie_genres"
+    __table_args__ = (
+        # Películas de un género en orden de id (GET /movies/?genre=)
+        Index("ix_movie_genres_genre_id_movie_id", "genre_id", "movie_id"),
+    )
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    genre_id = Column(Integer, ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
+
+# Filtro global del borrado lógico, aplicado a todas las consultas ORM
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_soft_deleted(execute_state):
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
@@ -0,0 +1,250 @@
+"""
+Outbox transaccional para el Sistema de Gestión de Cine.
+
+Los endpoints de reservas escriben eventos en `outbox_events` dentro de la
+misma transacción que el cambio; un relay los drena por lotes hacia un
+destino configurable con entrega al menos una vez, en orden de id (y por
+tanto en orden por reserva).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from jobs import job
+from metrics import Counter, Gauge, Summary
+from models import Booking, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Configuración del relay
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "24"))
+OUTBOX_PRUNE_INTERVAL = float(os.getenv("OUTBOX_PRUNE_INTERVAL", "300"))
+# Clave del advisory lock que serializa los relays en PostgreSQL
+OUTBOX_LOCK_ID = 7_300_001
+# Destino: "file:/ruta/eventos.ndjson" o "memory"; vacío desactiva el relay en la app
+OUTBOX_RELAY_SINK = os.getenv("OUTBOX_RELAY_SINK", "")
+
+# Métricas
+events_published = Counter("outbox_events_published_total", "Eventos publicados por el relay")
+publish_failures = Counter("outbox_publish_failures_total", "Lotes que fallaron al publicarse")
+events_pruned = Counter("outbox_events_pruned_total", "Eventos publicados eliminados por la purga")
+batch_duration = Summary("outbox_relay_batch_seconds", "Duración de cada lote del relay")
+outbox_lag = Gauge("outbox_lag_seconds", "Antigüedad del evento pendiente más antiguo")
+
+
+def _booking_payload(booking: Booking) -> dict:
+    """Datos de la reserva incluidos en el evento."""
+    return {
+        "id": booking.id,
+        "user_id": booking.user_id,
+        "showtime_id": booking.showtime_id,
+        "seats_booked": booking.seats_booked,
+        "status": booking.status.value if booking.status is not None else None,
+        "total_price": booking.total_price,
+        "booking_time": booking.booking_time.isoformat() if booking.booking_time else None,
+    }
+
+
+def add_booking_event(db: AsyncSession, event_type: str, booking: Booking):
+    """
+    Añade un evento de reserva a la transacción actual.
+
+    La reserva debe tener id (hacer flush antes si es nueva).
+    """
+    db.add(OutboxEvent(
+        aggregate_type="booking",
+        aggregate_id=booking.id,
+        event_type=event_type,
+        payload=json.dumps(_booking_payload(booking)),
+        created_at=datetime.utcnow(),
+    ))
+
+
+class OutboxSink:
+    """Destino de los eventos. `publish` debe lanzar una excepción si no se entregaron."""
+
+    async def publish(self, events: List[dict]):
+        raise NotImplementedError
+
+
+class FileSink(OutboxSink):
+    """Añade los eventos como NDJSON a un archivo, sincronizando a disco en cada lote."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, events: List[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(event) + "\n" for event in events)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def publish(self, events: List[dict]):
+        await asyncio.get_running_loop().run_in_executor(None, self._write, events)
+
+
+class QueueSink(OutboxSink):
+    """Cola en memoria, útil en tests o como sustituto de un broker."""
+
+    def __init__(self, maxsize: int = 0):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def publish(self, events: List[dict]):
+        for event in events:
+            await self.queue.put(event)
+
+
+def sink_from_url(url: str) -> OutboxSink:
+    """Crea el destino a partir de OUTBOX_RELAY_SINK."""
+    if url.startswith("file:"):
+        return FileSink(url[len("file:"):])
+    if url == "memory":
+        return QueueSink()
+    raise ValueError(f"Unknown outbox sink: {url}")
+
+
+def _event_message(event: OutboxEvent) -> dict:
+    return {
+        "id": event.id,
+        "aggregate_type": event.aggregate_type,
+        "aggregate_id": event.aggregate_id,
+        "event_type": event.event_type,
+        "payload": json.loads(event.payload),
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+class OutboxRelay:
+    """Drena `outbox_events` hacia un `OutboxSink` por lotes."""
+
+    def __init__(
+        self,
+        session_factory,
+        sink: OutboxSink,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+        self._last_prune = 0.0
+
+    async def drain_once(self) -> int:
+        """
+        Publica un lote de eventos pendientes y los marca como publicados.
+
+        Si la publicación falla, los eventos siguen pendientes y se reintentan
+        (al menos una vez). En PostgreSQL un advisory lock garantiza que solo
+        un relay publica a la vez, lo que conserva el orden por reserva aunque
+        haya varios relays en marcha.
+        """
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            if session.get_bind().dialect.name == "postgresql":
+                locked = await session.execute(
+                    select(func.pg_try_advisory_xact_lock(OUTBOX_LOCK_ID))
+                )
+                if not locked.scalar():
+                    return 0
+            result = await session.execute(
+                select(OutboxEvent)
+                .where(OutboxEvent.published_at.is_(None))
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )
+            events = result.scalars().all()
+            if events:
+                try:
+                    await self.sink.publish([_event_message(event) for event in events])
+                except Exception:
+                    publish_failures.inc()
+                    await session.rollback()
+                    raise
+                await session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_([event.id for event in events]))
+                    .values(published_at=datetime.utcnow())
+                )
+            oldest = await session.execute(
+                select(OutboxEvent.created_at)
+                .where(OutboxEvent.published_at.is_(None))
+                .order_by(OutboxEvent.id)
+                .limit(1)
+            )
+            oldest_created_at = oldest.scalar()
+            await session.commit()
+
+        outbox_lag.set(
+            (datetime.utcnow() - oldest_created_at).total_seconds() if oldest_created_at else 0
+        )
+        if events:
+            events_published.inc(len(events))
+            batch_duration.observe(time.perf_counter() - started)
+        return len(events)
+
+    async def run(self):
+        """Bucle del relay hasta llamar a `stop`."""
+        while not self._stopping.is_set():
+            try:
+                published = await self.drain_once()
+                if time.monotonic() - self._last_prune >= OUTBOX_PRUNE_INTERVAL:
+                    async with self.session_factory() as session:
+                        await prune_published(session)
+                    self._last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Outbox relay iteration failed")
+                published = 0
+            if published < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self._stopping.set()
+
+
+async def prune_published(
+    db: AsyncSession,
+    older_than: Optional[timedelta] = None,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+) -> int:
+    """Elimina por lotes los eventos publicados hace más de `older_than`, con un commit por lote."""
+    if older_than is None:
+        older_than = timedelta(hours=OUTBOX_RETENTION_HOURS)
+    cutoff = datetime.utcnow() - older_than
+    total = 0
+    while True:
+        batch = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.published_at < cutoff)
+            .order_by(OutboxEvent.id)
+            .limit(batch_size)
+        )
+        result = await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(batch)))
+        await db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    events_pruned.inc(total)
+    return total
+
+
+@job("outbox.prune")
+async def prune_outbox_job(db: AsyncSession, payload: dict):
+    """Trabajo en segundo plano para purgar el outbox."""
+    older_than = payload.get("older_than_hours")
+    await prune_published(db, timedelta(hours=older_than) if older_than is not None else None)
@@ -0,0 +1,99 @@
+"""
+Perfiles de hashing de contraseñas para el Sistema de Gestión de Cine.
+
+El esquema y sus parámetros (coste de bcrypt, memoria y tiempo de argon2id)
+se configuran por entorno. Los hashes existentes se siguen verificando
+con los parámetros que llevan codificados; `needs_update` indica si un hash
+no coincide con el perfil actual, y el login lo rehace en segundo plano.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from passlib.context import CryptContext
+
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")  # "bcrypt" o "argon2"
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+# Procesos para hashear en bloque (altas masivas); 0 = uno por núcleo
+PASSWORD_HASH_PROCESSES = int(os.getenv("PASSWORD_HASH_PROCESSES", "0")) or os.cpu_count() or 1
+
+# Esquemas que se pueden verificar. argon2 requiere el paquete `argon2-cffi`
+# solo si se usa o si hay hashes argon2 guardados.
+SCHEMES = ("bcrypt", "argon2")
+
+
+def make_password_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    argon2_memory_cost: int = ARGON2_MEMORY_COST,
+    argon2_time_cost: int = ARGON2_TIME_COST,
+    argon2_parallelism: int = ARGON2_PARALLELISM,
+) -> CryptContext:
+    """
+    Contexto que hashea con el perfil indicado y verifica todos los esquemas.
+
+    Los parámetros mínimos y máximos coinciden con los del perfil, de modo
+    que cualquier hash con otro coste (mayor o menor) necesita actualizarse.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown password hash scheme: {scheme}")
+    if scheme == "argon2":
+        try:
+            import argon2  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("The argon2 profile requires the 'argon2-cffi' package") from e
+    return CryptContext(
+        schemes=[scheme, *[s for s in SCHEMES if s != scheme]],
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__time_cost=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = make_password_context()
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def hash_password(password: str) -> str:
+    """Hash con el perfil actual (función de módulo para poder usarla en otro proceso)."""
+    return pwd_context.hash(password)
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hashea muchas contraseñas en paralelo en un pool de procesos.
+
+    Los procesos se crean con `spawn` la primera vez y leen el mismo perfil
+    del entorno.
+    """
+    global _process_pool
+    if not passwords:
+        return []
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(
+        *(loop.run_in_executor(_process_pool, hash_password, password) for password in passwords)
+    ))
+
+
+def shutdown_hash_pool():
+    """Detiene el pool de procesos de hashing, si se llegó a crear."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
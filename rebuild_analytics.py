@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Script para recalcular las tablas de agregados de ventas.
+
+Útil tras crear las tablas por primera vez o para corregir desviaciones.
+"""
+
+import asyncio
+
+from rollups import rebuild_rollups
+from database import async_session
+
+
+async def main():
+    """Recalcula los agregados desde la tabla de reservas."""
+    try:
+        print("📊 Recalculando agregados de ventas...")
+        async with async_session() as session:
+            await rebuild_rollups(session)
+        print("✅ Agregados recalculados!")
+    except Exception as e:
+        print(f"❌ Error recalculando agregados: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    exit(0 if success else 1)
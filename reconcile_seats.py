@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script para reconciliar los asientos disponibles de los horarios.
+
+Compara `available_seats` con `capacity - SUM(seats_booked)` de las reservas
+activas y, con --fix, corrige las desviaciones.
+
+Uso:
+    python reconcile_seats.py [--fix] [--since-minutes 60] [--batch-size 5000]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from database import async_session
+from reconciliation import RECONCILE_BATCH_SIZE, reconcile_seats
+
+
+async def main(args) -> bool:
+    """Ejecuta una pasada de reconciliación y muestra el reporte."""
+    since = None
+    if args.since_minutes is not None:
+        since = datetime.utcnow() - timedelta(minutes=args.since_minutes)
+    try:
+        print("🎟️  Reconciliando asientos...")
+        async with async_session() as session:
+            report = await reconcile_seats(session, fix=args.fix, since=since, batch_size=args.batch_size)
+        for drift in report.drifts:
+            print(
+                f"   Horario {drift.showtime_id}: {drift.available_seats} disponibles, "
+                f"esperados {drift.expected_available_seats} (capacidad {drift.capacity})"
+            )
+        print(
+            f"✅ Revisados: {report.checked}, desviados: {report.drifted}, "
+            f"corregidos: {report.fixed}, sin capacidad inicializada: {report.baselined}"
+        )
+    except Exception as e:
+        print(f"❌ Error reconciliando asientos: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconciliar asientos disponibles")
+    parser.add_argument("--fix", action="store_true", help="Corregir las desviaciones encontradas")
+    parser.add_argument("--since-minutes", type=float, help="Solo horarios cambiados en los últimos N minutos")
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    success = asyncio.run(main(parser.parse_args()))
+    exit(0 if success else 1)
@@ -0,0 +1,172 @@
+"""
+Reconciliación de asientos para el Sistema de Gestión de Cine.
+
+`Showtime.available_seats` y `Showtime.seats_sold` son contadores
+desnormalizados; este módulo los compara con `SUM(seats_booked)` de las
+reservas activas, con una consulta agregada por lote de horarios, y
+opcionalmente corrige la desviación.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from jobs import job
+from metrics import Counter
+from models import Booking, BookingStatus, Showtime
+from schemas import ReconciliationReport, SeatDrift
+from seating import active_seats
+
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "5000"))
+# Máximo de desviaciones detalladas en el reporte
+RECONCILE_MAX_DRIFTS = int(os.getenv("RECONCILE_MAX_DRIFTS", "1000"))
+
+drifts_found = Counter("seat_drifts_found_total", "Horarios con asientos desviados")
+drifts_fixed = Counter("seat_drifts_fixed_total", "Horarios con asientos corregidos")
+
+
+async def _changed_showtime_ids(db: AsyncSession, since: datetime) -> set:
+    """Horarios modificados o con reservas nuevas desde `since`."""
+    result = await db.execute(
+        select(Showtime.id).where(Showtime.updated_at >= since)
+        .union(select(Booking.showtime_id).where(Booking.booking_time >= since))
+    )
+    return set(result.scalars().all())
+
+
+async def reconcile_seats(
+    db: AsyncSession,
+    fix: bool = False,
+    since: Optional[datetime] = None,
+    batch_size: int = RECONCILE_BATCH_SIZE,
+) -> ReconciliationReport:
+    """
+    Recorre los horarios por lotes (paginación por id) y detecta desviaciones.
+
+    Con `since` solo se revisan los horarios cambiados desde esa fecha. Los
+    horarios sin `capacity` (anteriores a la columna) toman como capacidad
+    el estado actual, y con `fix` se guarda para las siguientes pasadas.
+    La corrección se hace con un UPDATE por lote que recalcula el contador
+    en SQL, de modo que no pisa reservas hechas mientras tanto.
+    """
+    checked = 0
+    drifted = 0
+    fixed = 0
+    baselined = 0
+    drifts: List[SeatDrift] = []
+
+    changed = await _changed_showtime_ids(db, since) if since is not None else None
+    changed_ids = sorted(changed) if changed is not None else None
+
+    last_id = 0
+    offset = 0
+    while True:
+        if changed_ids is not None:
+            batch_ids = changed_ids[offset:offset + batch_size]
+            offset += batch_size
+            if not batch_ids:
+                break
+            batch = select(Showtime.id).where(Showtime.id.in_(batch_ids))
+        else:
+            batch = (
+                select(Showtime.id).where(Showtime.id > last_id)
+                .order_by(Showtime.id).limit(batch_size)
+            )
+        batch = batch.subquery()
+
+        result = await db.execute(
+            select(
+                Showtime.id,
+                Showtime.capacity,
+                Showtime.available_seats,
+                Showtime.seats_sold,
+                func.coalesce(func.sum(Booking.seats_booked), 0).label("booked"),
+            )
+            .join(batch, batch.c.id == Showtime.id)
+            .outerjoin(Booking, and_(
+                Booking.showtime_id == Showtime.id,
+                Booking.status != BookingStatus.cancelled,
+            ))
+            .group_by(Showtime.id, Showtime.capacity, Showtime.available_seats, Showtime.seats_sold)
+            .order_by(Showtime.id)
+        )
+        rows = result.all()
+        if not rows:
+            if changed_ids is not None:
+                continue
+            break
+
+        drift_ids = []
+        missing_capacity_ids = []
+        for row in rows:
+            if row.capacity is None:
+                missing_capacity_ids.append(row.id)
+                continue
+            expected = row.capacity - row.booked
+            if row.available_seats != expected or row.seats_sold != row.booked:
+                drift_ids.append(row.id)
+                if len(drifts) < RECONCILE_MAX_DRIFTS:
+                    drifts.append(SeatDrift(
+                        showtime_id=row.id,
+                        capacity=row.capacity,
+                        available_seats=row.available_seats,
+                        expected_available_seats=expected,
+                        seats_sold=row.seats_sold,
+                        expected_seats_sold=row.booked,
+                    ))
+
+        if fix and missing_capacity_ids:
+            await db.execute(
+                update(Showtime)
+                .where(Showtime.id.in_(missing_capacity_ids), Showtime.capacity.is_(None))
+                .values(
+                    capacity=Showtime.available_seats + active_seats(Showtime.id),
+                    seats_sold=active_seats(Showtime.id),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            baselined += len(missing_capacity_ids)
+        if fix and drift_ids:
+            await db.execute(
+                update(Showtime)
+                .where(Showtime.id.in_(drift_ids))
+                .values(
+                    available_seats=Showtime.capacity - active_seats(Showtime.id),
+                    seats_sold=active_seats(Showtime.id),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            fixed += len(drift_ids)
+        if fix:
+            await db.commit()
+
+        checked += len(rows)
+        drifted += len(drift_ids)
+        last_id = rows[-1].id
+
+    drifts_found.inc(drifted)
+    drifts_fixed.inc(fixed)
+    return ReconciliationReport(
+        checked=checked,
+        drifted=drifted,
+        fixed=fixed,
+        baselined=baselined,
+        drifts=drifts,
+    )
+
+
+@job("seats.reconcile")
+async def reconcile_seats_job(db: AsyncSession, payload: dict):
+    """
+    Trabajo en segundo plano de reconciliación.
+
+    Payload: `fix` (bool) y `since_minutes` (pasada incremental; sin él, pasada completa).
+    """
+    since = None
+    if payload.get("since_minutes") is not None:
+        since = datetime.utcnow() - timedelta(minutes=payload["since_minutes"])
+    await reconcile_seats(db, fix=payload.get("fix", False), since=since)
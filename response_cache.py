@@ -0,0 +1,103 @@
+"""
+Caché de respuestas para el Sistema de Gestión de Cine.
+
+Guarda el cuerpo JSON ya serializado de páginas muy pedidas (el catálogo
+de películas) durante `RESPONSE_CACHE_SECONDS`, junto con sus variantes
+comprimidas: cada página se comprime una sola vez por codificación y los
+aciertos se sirven sin serializar ni comprimir. La caché es por proceso;
+las escrituras del propio proceso la vacían y las de otros procesos se
+ven al caducar las entradas.
+"""
+
+import os
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from compression import COMPRESSION_MIN_SIZE, compress, negotiate
+from metrics import Counter
+
+RESPONSE_CACHE_SECONDS = float(os.getenv("RESPONSE_CACHE_SECONDS", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+
+cache_requests = Counter("response_cache_requests_total", "Consultas a la caché de respuestas por resultado")
+
+
+class _Entry:
+    __slots__ = ("expires_at", "variants")
+
+    def __init__(self, expires_at: float, body: bytes):
+        self.expires_at = expires_at
+        # codificación ("identity", "gzip", "br", "zstd") -> cuerpo
+        self.variants: Dict[str, bytes] = {"identity": body}
+
+
+class ResponseCache:
+    """Respuestas JSON por clave, con sus variantes comprimidas."""
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = RESPONSE_CACHE_SECONDS,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.minimum_size = minimum_size
+        self._entries: Dict[Hashable, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, request: Request, key: Hashable) -> Optional[Response]:
+        """Respuesta cacheada para `key` en la codificación que acepta el cliente, o None."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            cache_requests.inc(cache=self.name, result="miss")
+            return None
+        cache_requests.inc(cache=self.name, result="hit")
+        return self._respond(request, entry, "hit")
+
+    def put(self, request: Request, key: Hashable, body: bytes) -> Response:
+        """Guarda un cuerpo JSON ya serializado y devuelve la respuesta para esta petición."""
+        if self.ttl <= 0:
+            return self._respond(request, _Entry(0, body), "bypass")
+        if len(self._entries) >= self.max_entries:
+            self._evict()
+        entry = _Entry(time.monotonic() + self.ttl, body)
+        self._entries[key] = entry
+        return self._respond(request, entry, "miss")
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict(self):
+        """Descarta las entradas caducadas y, si no basta, las más antiguas."""
+        now = time.monotonic()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry.expires_at > now}
+        while len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+
+    def _variant(self, request: Request, entry: _Entry) -> Tuple[str, bytes]:
+        body = entry.variants["identity"]
+        encoding = negotiate(request.headers.get("accept-encoding"))
+        if encoding is None or len(body) < self.minimum_size:
+            return "identity", body
+        variant = entry.variants.get(encoding)
+        if variant is None:
+            variant = entry.variants[encoding] = compress(encoding, body)
+        return encoding, variant
+
+    def _respond(self, request: Request, entry: _Entry, status: str) -> Response:
+        encoding, body = self._variant(request, entry)
+        headers = {"Vary": "Accept-Encoding", "X-Cache": status}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+catalog_cache = ResponseCache("catalog")
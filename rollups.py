@@ -0,0 +1,110 @@
+"""
+Agregados de ventas para el Sistema de Gestión de Cine.
+
+Mantiene de forma incremental las tablas de ingresos por película y ventas
+por día, para que los reportes no tengan que agrupar toda la tabla de
+reservas. La ocupación por horario sale de los contadores de `Showtime`.
+"""
+
+from sqlalchemy import cast, delete, func, insert
+from sqlalchemy import Date as SQLDate
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from archive import with_archived
+from jobs import job
+from models import (
+    Booking,
+    BookingArchive,
+    BookingStatus,
+    DailySales,
+    MovieSales,
+    Showtime,
+    ShowtimeArchive,
+)
+
+_UPSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+async def _increment(db: AsyncSession, model, key: dict, revenue: int, seats: int, count: int):
+    """Suma los valores a la fila del agregado, creándola si no existe (un solo UPSERT)."""
+    upsert = _UPSERTS[db.get_bind().dialect.name]
+    stmt = upsert(model).values(**key, revenue=revenue, seats_sold=seats, bookings_count=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={
+            "revenue": model.revenue + stmt.excluded.revenue,
+            "seats_sold": model.seats_sold + stmt.excluded.seats_sold,
+            "bookings_count": model.bookings_count + stmt.excluded.bookings_count,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_booking_sale(db: AsyncSession, booking: Booking, showtime: Showtime, sign: int = 1):
+    """
+    Aplica una reserva a los agregados dentro de la transacción actual.
+
+    `sign` es 1 al activar una reserva y -1 al cancelarla o eliminarla.
+    """
+    revenue = sign * booking.total_price
+    seats = sign * booking.seats_booked
+    await _increment(db, MovieSales, {"movie_id": showtime.movie_id}, revenue, seats, sign)
+    await _increment(db, DailySales, {"day": booking.booking_time.date()}, revenue, seats, sign)
+
+
+async def rebuild_rollups(db: AsyncSession):
+    """
+    Recalcula todos los agregados desde la tabla de reservas.
+
+    Pensado para el backfill inicial o para corregir desviaciones; se ejecuta
+    en una sola transacción. Los ingresos por película y por día incluyen las
+    reservas archivadas.
+    """
+    def totals(bookings):
+        return (
+            func.coalesce(func.sum(bookings.c.total_price), 0),
+            func.coalesce(func.sum(bookings.c.seats_booked), 0),
+            func.count(bookings.c.id),
+        )
+    columns = ["revenue", "seats_sold", "bookings_count"]
+    bookings = with_archived(Booking, BookingArchive)
+    showtimes = with_archived(Showtime, ShowtimeArchive)
+
+    await db.execute(delete(MovieSales))
+    await db.execute(delete(DailySales))
+
+    await db.execute(insert(MovieSales).from_select(
+        ["movie_id", *columns],
+        select(showtimes.c.movie_id, *totals(bookings))
+        .join(bookings, bookings.c.showtime_id == showtimes.c.id)
+        .where(bookings.c.status != BookingStatus.cancelled)
+        .group_by(showtimes.c.movie_id),
+    ))
+    day = cast(bookings.c.booking_time, SQLDate)
+    if db.get_bind().dialect.name == "sqlite":
+        day = func.date(bookings.c.booking_time)
+    await db.execute(insert(DailySales).from_select(
+        ["day", *columns],
+        select(day, *totals(bookings))
+        .where(bookings.c.status != BookingStatus.cancelled)
+        .group_by(day),
+    ))
+    await db.commit()
+
+
+@job("analytics.rebuild")
+async def rebuild_rollups_job(db: AsyncSession, payload: dict):
+    """Trabajo en segundo plano para recalcular los agregados."""
+    await rebuild_rollups(db)
+
+
+def occupancy_ratio(seats_sold: int, available_seats: int) -> float:
+    """Ocupación como fracción de los asientos totales del horario."""
+    total = seats_sold + available_seats
+    return round(seats_sold / total, 4) if total else 0.0
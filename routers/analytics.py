@@ -0,0 +1,86 @@
+"""
+Router de analítica para el Sistema de Gestión de Cine.
+
+Incluye reportes de ingresos, ocupación y ventas servidos desde tablas de agregados.
+"""
+
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database import get_db
+from models import DailySales, Movie, MovieSales, Showtime, User
+from schemas import DailySalesResponse, MovieRevenue, ShowtimeOccupancy
+from auth import get_current_gerente
+from rollups import occupancy_ratio
+
+router = APIRouter()
+
+@router.get("/movies", response_model=List[MovieRevenue])
+async def revenue_per_movie(
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_gerente)
+):
+    """
+    Obtener ingresos por película, de mayor a menor. Solo gerentes.
+    """
+    result = await db.execute(
+        select(
+            MovieSales.movie_id,
+            Movie.title,
+            MovieSales.revenue,
+            MovieSales.seats_sold,
+            MovieSales.bookings_count,
+        )
+        .join(Movie, Movie.id == MovieSales.movie_id)
+        .order_by(MovieSales.revenue.desc())
+        .limit(limit)
+    )
+    return [row._asdict() for row in result.all()]
+
+@router.get("/showtimes", response_model=List[ShowtimeOccupancy])
+async def occupancy_per_showtime(
+    start: datetime,
+    end: datetime,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_gerente)
+):
+    """
+    Obtener la ocupación de los horarios que empiezan en [start, end). Solo gerentes.
+    """
+    result = await db.execute(
+        select(
+            Showtime.id.label("showtime_id"),
+            Showtime.movie_id,
+            Showtime.theater,
+            Showtime.start_time,
+            Showtime.seats_sold,
+            Showtime.available_seats,
+        )
+        .where(Showtime.start_time >= start, Showtime.start_time < end)
+        .order_by(Showtime.start_time)
+    )
+    return [
+        {**row._asdict(), "occupancy": occupancy_ratio(row.seats_sold, row.available_seats)}
+        for row in result.all()
+    ]
+
+@router.get("/daily", response_model=List[DailySalesResponse])
+async def sales_per_day(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_gerente)
+):
+    """
+    Obtener ventas por día de reserva en [start, end). Solo gerentes.
+    """
+    stmt = select(DailySales).order_by(DailySales.day)
+    if start is not None:
+        stmt = stmt.where(DailySales.day >= start)
+    if end is not None:
+        stmt = stmt.where(DailySales.day < end)
+    result = await db.execute(stmt)
+    return result.scalars().all()
@@ -1,39 +1,144 @@
 """
 Router de autenticación para el Sistema de Gestión de Cine.
 
-Incluye endpoints para login y obtención de tokens.
+Incluye endpoints para login, refresco y revocación de tokens.
 """
 
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
-from auth import authenticate_user, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from schemas import Token
+from sqlalchemy.future import select
+from database import get_db, get_session_factory
+from auth import PasswordHashPoolBusy, authenticate_user, create_access_token, get_token_payload
+from jwt_keys import JWT_KEYS_RELOAD_SECONDS, key_registry
+from models import User
+from schemas import RefreshRequest, Token
+from throttling import login_rejections, login_throttle
+from tokens import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    InvalidRefreshToken,
+    issue_refresh_token,
+    revoke_family,
+    revoke_ids,
+    rotate_refresh_token,
+)
 
 router = APIRouter()
 
+
+def _token_response(username: str, family_id: str, refresh_token: str) -> dict:
+    """Token de acceso de vida corta ligado a la familia de refresco."""
+    access_token = create_access_token(
+        data={"sub": username, "fam": family_id},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": int(ACCESS_TOKEN_EXPIRE_MINUTES * 60),
+    }
+
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
+    request: Request,
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_factory=Depends(get_session_factory),
 ):
     """
     Endpoint para obtener token de acceso.
 
     - **username**: Nombre de usuario
     - **password**: Contraseña
+
+    Demasiados fallos por IP o por usuario devuelven 429 sin verificar la contraseña.
+    Los hashes con parámetros antiguos se actualizan después de responder.
     """
-    user = await authenticate_user(db, form_data.username, form_data.password)
+    ip = request.client.host if request.client else "unknown"
+    retry_after = await login_throttle.check(form_data.username, ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(int(retry_after))},
+        )
+
+    try:
+        user = await authenticate_user(
+            db, form_data.username, form_data.password, background_tasks, session_factory
+        )
+    except PasswordHashPoolBusy:
+        login_rejections.inc(reason="busy")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress",
+            headers={"Retry-After": "1"},
+        )
     if not user:
+        await login_throttle.record_failure(form_data.username, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    await login_throttle.record_success(form_data.username)
+    refresh_token, family_id = await issue_refresh_token(db, user.id)
+    await db.commit()
+    return _token_response(user.username, family_id, refresh_token)
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    body: RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Canjear un token de refresco por un token de acceso nuevo.
+
+    El token de refresco rota en cada uso; presentar uno ya usado revoca
+    la sesión completa (reutilización de un token robado).
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    try:
+        user_id, refresh_token, family_id = await rotate_refresh_token(db, body.refresh_token)
+    except InvalidRefreshToken:
+        raise invalid
+    result = await db.execute(select(User.username).where(User.id == user_id))
+    username = result.scalar()
+    if username is None:
+        raise invalid
+    await db.commit()
+    return _token_response(username, family_id, refresh_token)
+
+@router.post("/logout")
+async def logout(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Revocar el token de acceso actual y su sesión de refresco.
+    """
+    if payload.get("fam"):
+        await revoke_family(db, payload["fam"])
+    if payload.get("jti"):
+        await revoke_ids(db, payload["jti"])
+    await db.commit()
+    return {"message": "Logged out successfully"}
+
+@router.get("/jwks.json")
+async def get_jwks(response: Response):
+    """
+    Claves públicas para verificar los tokens de acceso (JWK Set).
+
+    Vacío si los tokens se firman con un secreto compartido (HS256).
+    """
+    response.headers["Cache-Control"] = f"public, max-age={int(JWT_KEYS_RELOAD_SECONDS)}"
+    if key_registry is None:
+        return {"keys": []}
+    return key_registry.jwks()
@@ -0,0 +1,141 @@
+"""
+Router de peticiones agrupadas para el Sistema de Gestión de Cine.
+
+`POST /batch` recibe varias sub-peticiones (p. ej. las de la pantalla de
+inicio de la app), autentica el token una sola vez y las ejecuta a la vez
+contra las rutas de la propia aplicación, sin volver a pasar por los
+middlewares ni por la búsqueda del usuario en la base de datos.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from auth import get_current_user
+from database import get_db
+from metrics import Counter
+from models import User
+from schemas import BatchItem, BatchItemResponse, BatchRequest, BatchResponse
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+# Sub-peticiones de un mismo lote en ejecución a la vez (cada una con su sesión)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# Cabeceras del lote que se pasan a cada sub-petición
+FORWARDED_HEADERS = (b"authorization", b"accept-language", b"user-agent")
+
+batch_subrequests = Counter("batch_subrequests_total", "Sub-peticiones de POST /batch por código de estado")
+
+router = APIRouter()
+
+
+async def run_subrequest(request: Request, item: BatchItem, user: Optional[User]) -> BatchItemResponse:
+    """Ejecuta una sub-petición contra el router de la aplicación y recoge su respuesta."""
+    target = urlsplit(item.path)
+    if not target.path.startswith("/") or target.path.rstrip("/") == "/batch":
+        return BatchItemResponse(id=item.id, status=400, body={"detail": "Invalid batch path"})
+
+    headers = [(name, value) for name, value in request.scope["headers"] if name in FORWARDED_HEADERS]
+    body = b""
+    if item.body is not None:
+        body = json.dumps(item.body).encode()
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": target.path,
+        "raw_path": target.path.encode(),
+        "query_string": target.query.encode(),
+        "headers": headers,
+        "app": request.app,
+        "batch_user": user,
+    }
+    # Manejadores de excepciones de la app (HTTPException, validación, ...)
+    if "starlette.exception_handlers" in request.scope:
+        scope["starlette.exception_handlers"] = request.scope["starlette.exception_handlers"]
+
+    status = 500
+    chunks = []
+    content_type = ""
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    content_type = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+    except StarletteHTTPException as e:
+        # Rutas inexistentes o métodos no permitidos se resuelven en el router
+        status, chunks, content_type = e.status_code, [json.dumps({"detail": e.detail}).encode()], "application/json"
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", item.method, item.path)
+        status, chunks, content_type = 500, [b'{"detail": "Internal Server Error"}'], "application/json"
+    batch_subrequests.inc(status=status)
+
+    raw = b"".join(chunks)
+    if not raw:
+        payload = None
+    elif content_type.startswith("application/json"):
+        payload = json.loads(raw)
+    else:
+        payload = raw.decode("utf-8", errors="replace")
+    return BatchItemResponse(id=item.id, status=status, body=payload)
+
+
+@router.post("", response_model=BatchResponse)
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ejecutar varias peticiones en una. Acceso público; cada sub-petición
+    aplica sus propios permisos con el usuario del token del lote.
+
+    Las sub-peticiones se ejecutan a la vez y en cualquier orden: no deben
+    depender unas de otras. Cada una devuelve su propio `status` y `body`;
+    un token inválido rechaza el lote entero.
+    """
+    if len(batch_request.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+
+    user = None
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if token and scheme.lower() == "bearer":
+        user = await get_current_user(request, token, db)
+    # La sesión del lote solo sirve para autenticar: cada sub-petición usa la
+    # suya, porque una AsyncSession no admite uso concurrente.
+    await db.close()
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(item: BatchItem) -> BatchItemResponse:
+        async with semaphore:
+            return await run_subrequest(request, item, user)
+
+    return BatchResponse(responses=await asyncio.gather(*(run(item) for item in batch_request.requests)))
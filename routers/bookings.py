@@ -4,34 +4,64 @@ Router para gestión de reservas en el Sistema de Gestión de Cine.
 Incluye operaciones CRUD para reservas con lógica de negocio.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from database import get_db
-from models import Booking, User, Showtime
-from schemas import BookingCreate, BookingResponse, BookingUpdate
-from auth import get_current_cliente, get_current_empleado
+from sqlalchemy.orm.attributes import set_committed_value
+from database import get_db, get_session_factory
+from models import Booking, BookingArchive, BookingStatus, Showtime, User, UserRole
+from schemas import BookingCreate, BookingDetailResponse, BookingResponse, BookingUpdate
+from auth import get_current_cliente, get_current_empleado, get_current_staff
+from archive import with_archived
+from catalog import catalog
+from exports import ExportFormat, export_response
+from fieldsets import FIELDS_DESCRIPTION, FieldSet
+from loaders import Loaders, get_loaders
+from rollups import record_booking_sale
+from outbox import add_booking_event
+from seating import (
+    InvalidTransition,
+    check_transition,
+    delete_booking_row,
+    release_seats,
+    reserve_seats,
+    transition_booking,
+)
 
 router = APIRouter()
 
+_booking_fields = FieldSet(BookingResponse, Booking)
+
+
+async def _booking_showtime(db: AsyncSession, showtime_id: int) -> Optional[Showtime]:
+    """
+    Horario de una reserva, aunque se haya eliminado (él o su película): al
+    cancelar hay que descontar la reserva de los agregados igualmente.
+    """
+    result = await db.execute(
+        select(Showtime).where(Showtime.id == showtime_id).execution_options(include_deleted=True)
+    )
+    return result.scalars().first()
+
 @router.post("/", response_model=BookingResponse)
 async def create_booking(
     booking: BookingCreate,
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     current_user: User = Depends(get_current_cliente)
 ):
     """
     Crear una nueva reserva. Solo clientes pueden reservar.
     """
     # Verificar que el showtime existe
-    result = await db.execute(select(Showtime).where(Showtime.id == booking.showtime_id))
-    showtime = result.scalars().first()
+    showtime = await loaders.showtimes.load(booking.showtime_id)
     if not showtime:
         raise HTTPException(status_code=404, detail="Showtime not found")
 
-    # Verificar asientos disponibles
-    if showtime.available_seats < booking.seats_booked:
+    # Descontar asientos en un UPDATE condicional: evita vender de más con reservas concurrentes
+    if not await reserve_seats(db, showtime.id, booking.seats_booked):
         raise HTTPException(status_code=400, detail="Not enough seats available")
 
     # Calcular precio total
@@ -42,35 +72,111 @@ async def create_booking(
         user_id=current_user.id,
         showtime_id=booking.showtime_id,
         seats_booked=booking.seats_booked,
-        total_price=total_price
+        total_price=total_price,
+        booking_time=datetime.utcnow()
     )
     db.add(db_booking)
 
-    # Actualizar asientos disponibles
-    showtime.available_seats -= booking.seats_booked
+    # Actualizar agregados de ventas
+    await record_booking_sale(db, db_booking, showtime)
+
+    # Publicar el evento en el outbox (necesita el id de la reserva)
+    await db.flush()
+    add_booking_event(db, "booking.created", db_booking)
 
     await db.commit()
-    await db.refresh(db_booking)
     return db_booking
 
 @router.get("/", response_model=List[BookingResponse])
 async def read_bookings(
+    include_archived: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_cliente)
 ):
     """
     Obtener reservas del usuario actual. Clientes ven sus reservas, empleados/gerentes ven todas.
+
+    - **include_archived**: Incluir las reservas de horarios archivados
+    - **fields**: Devolver solo estos campos (ver `fieldsets`)
     """
-    if current_user.role == "cliente":
-        result = await db.execute(select(Booking).where(Booking.user_id == current_user.id))
+    selected = _booking_fields.parse(fields)
+    if include_archived:
+        bookings = with_archived(Booking, BookingArchive)
+        stmt = select(*_booking_fields.columns(bookings, selected)).order_by(bookings.c.id)
+        if current_user.role == "cliente":
+            stmt = stmt.where(bookings.c.user_id == current_user.id)
+        result = await db.execute(stmt)
+        bookings = result.all()
     else:
-        result = await db.execute(select(Booking))
-    bookings = result.scalars().all()
+        stmt = select(Booking).options(*_booking_fields.load_options(selected))
+        if current_user.role == "cliente":
+            stmt = stmt.where(Booking.user_id == current_user.id)
+        result = await db.execute(stmt)
+        bookings = result.scalars().all()
+    if selected is not None:
+        return _booking_fields.response(bookings, selected)
     return bookings
 
+@router.get("/export")
+async def export_bookings(
+    format: ExportFormat = ExportFormat.ndjson,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(get_current_staff)
+):
+    """
+    Exportar reservas en streaming (NDJSON o CSV). Solo empleados y gerentes.
+
+    - **start**: Incluir reservas con `booking_time` >= start
+    - **end**: Incluir reservas con `booking_time` < end
+    """
+    columns = [column.name for column in Booking.__table__.columns]
+    stmt = select(*Booking.__table__.columns).order_by(Booking.id)
+    if start is not None:
+        stmt = stmt.where(Booking.booking_time >= start)
+    if end is not None:
+        stmt = stmt.where(Booking.booking_time < end)
+    return export_response(session_factory, stmt, columns, format, "bookings")
+
+@router.get("/details", response_model=List[BookingDetailResponse])
+async def read_booking_details(
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
+    current_user: User = Depends(get_current_cliente)
+):
+    """
+    Obtener reservas con su horario y su película (p. ej. la pantalla "Mis entradas").
+    Clientes ven sus reservas, empleados/gerentes ven todas.
+
+    Los horarios y las películas se piden a los cargadores todos a la vez:
+    una consulta por modelo en lugar de dos por reserva.
+    """
+    stmt = select(Booking).order_by(Booking.id)
+    if current_user.role == UserRole.cliente:
+        stmt = stmt.where(Booking.user_id == current_user.id)
+    result = await db.execute(stmt)
+    bookings = result.scalars().all()
+
+    showtimes = await loaders.showtimes.load_many([booking.showtime_id for booking in bookings])
+    movies = await loaders.movies.load_many(
+        [showtime.movie_id for showtime in showtimes if showtime is not None and catalog.get(showtime.movie_id) is None]
+    )
+    movies_by_id = {movie.id: movie for movie in movies if movie is not None}
+    return [
+        BookingDetailResponse(
+            **BookingResponse.model_validate(booking).model_dump(),
+            showtime=showtime,
+            movie=(catalog.get(showtime.movie_id) or movies_by_id.get(showtime.movie_id)) if showtime else None,
+        )
+        for booking, showtime in zip(bookings, showtimes)
+    ]
+
 @router.get("/{booking_id}", response_model=BookingResponse)
 async def read_booking(
     booking_id: int,
+    include_archived: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_cliente)
 ):
@@ -79,6 +185,9 @@ async def read_booking(
     """
     result = await db.execute(select(Booking).where(Booking.id == booking_id))
     booking = result.scalars().first()
+    if booking is None and include_archived:
+        result = await db.execute(select(BookingArchive).where(BookingArchive.id == booking_id))
+        booking = result.scalars().first()
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -102,11 +211,34 @@ async def update_booking(
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
 
-    for field, value in booking_update.dict(exclude_unset=True).items():
+    update_data = booking_update.dict(exclude_unset=True)
+
+    # Solo se permite pending -> confirmed -> cancelled
+    new_status = update_data.get("status") or booking.status
+    try:
+        check_transition(booking.status, new_status)
+    except InvalidTransition as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    update_data.pop("status", None)
+    if new_status != booking.status:
+        # El cambio solo se aplica si nadie cambió el estado desde la lectura:
+        # dos cancelaciones simultáneas no devuelven los asientos dos veces
+        if not await transition_booking(db, booking, new_status):
+            raise HTTPException(status_code=409, detail="Booking status changed concurrently")
+        # Cancelar devuelve los asientos y descuenta la reserva de los agregados
+        if new_status == BookingStatus.cancelled:
+            showtime = await _booking_showtime(db, booking.showtime_id)
+            if showtime:
+                await release_seats(db, showtime.id, booking.seats_booked)
+                await record_booking_sale(db, booking, showtime, -1)
+        set_committed_value(booking, "status", new_status)
+
+    for field, value in update_data.items():
         setattr(booking, field, value)
+    add_booking_event(db, "booking.updated", booking)
 
     await db.commit()
-    await db.refresh(booking)
     return booking
 
 @router.delete("/{booking_id}")
@@ -126,12 +258,17 @@ async def delete_booking(
     if current_user.role == "cliente" and booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to cancel this booking")
 
-    # Devolver asientos
-    result_showtime = await db.execute(select(Showtime).where(Showtime.id == booking.showtime_id))
-    showtime = result_showtime.scalars().first()
-    if showtime:
-        showtime.available_seats += booking.seats_booked
+    # El DELETE decide si la reserva seguía activa: si una cancelación
+    # concurrente ganó, ya devolvió los asientos
+    was_active = await delete_booking_row(db, booking.id)
+    if was_active is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    if was_active:
+        showtime = await _booking_showtime(db, booking.showtime_id)
+        if showtime:
+            await release_seats(db, showtime.id, booking.seats_booked)
+            await record_booking_sale(db, booking, showtime, -1)
 
-    await db.delete(booking)
+    add_booking_event(db, "booking.deleted", booking)
     await db.commit()
     return {"message": "Booking cancelled successfully"}
\ No newline at end of file
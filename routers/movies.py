@@ -4,17 +4,35 @@ Router para gestión de películas en el Sistema de Gestión de Cine.
 Incluye operaciones CRUD para películas.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from pydantic import TypeAdapter
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database import get_db
 from models import Movie, User
-from schemas import MovieCreate, MovieResponse, MovieUpdate
-from auth import get_current_empleado
+from schemas import GenreFacet, ImportReport, MovieCreate, MovieResponse, MovieUpdate
+from auth import get_current_empleado, get_current_staff
+from catalog import bump_catalog_version, catalog
+from fieldsets import FIELDS_DESCRIPTION, FieldSet
+from genres import backfill_movie_genres, genre_counts, movies_in_genre, set_movie_genres
+from imports import ImportFormat, detect_format, import_movies, iter_records, open_upload
+from loaders import Loaders, get_loaders
+from response_cache import catalog_cache
+from soft_delete import soft_delete_movie
 
 router = APIRouter()
 
+_movie_fields = FieldSet(MovieResponse, Movie)
+_genre_facets = TypeAdapter(List[GenreFacet])
+
+
+def _catalog_changed(version: int, movies: Dict[int, Optional[Movie]]):
+    """Tras confirmar una escritura: caché vacía y las filas escritas en la instantánea del catálogo."""
+    catalog_cache.clear()
+    catalog.apply_write(version, movies)
+
 
 @router.post("/", response_model=MovieResponse)
 async def create_movie(
@@ -27,30 +45,107 @@ async def create_movie(
     """
     db_movie = Movie(**movie.dict())
     db.add(db_movie)
+    await db.flush()
+    await set_movie_genres(db, [(db_movie.id, db_movie.genre)])
+    version = await bump_catalog_version(db, [db_movie.id])
     await db.commit()
-    await db.refresh(db_movie)
+    _catalog_changed(version, {db_movie.id: db_movie})
     return db_movie
 
 
+@router.post("/import", response_model=ImportReport)
+async def import_movies_file(
+    file: UploadFile = File(...),
+    format: Optional[ImportFormat] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_staff),
+):
+    """
+    Importar películas desde un archivo CSV o NDJSON. Empleados y gerentes pueden importar.
+
+    Las filas inválidas no detienen la importación y se listan en el reporte.
+    """
+    fmt = format or detect_format(file.filename)
+    last_id = (await db.execute(select(func.max(Movie.id)).execution_options(include_deleted=True))).scalar() or 0
+    report = await import_movies(db, iter_records(open_upload(file), fmt))
+    await backfill_movie_genres(db, after_id=last_id)
+    # La importación confirma por bloques: los workers (también este) recargan
+    # el catálogo entero en su siguiente sincronización
+    await bump_catalog_version(db, None)
+    await db.commit()
+    catalog_cache.clear()
+    return report
+
+
 @router.get("/", response_model=List[MovieResponse])
 async def read_movies(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    genre: Optional[str] = Query(None, description="Solo películas de este género (sin distinguir mayúsculas)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Obtener lista de películas. Acceso público.
+
+    Las páginas se sirven desde la caché del catálogo, ya serializadas y
+    comprimidas (ver `response_cache`), y se arman con la instantánea en
+    memoria del catálogo (ver `catalog`) sin consultar la base de datos.
+
+    - **genre**: Filtrar por género (ver `genres`)
+    - **fields**: Devolver solo estos campos (ver `fieldsets`)
+    """
+    selected = _movie_fields.parse(fields)
+    genre = genre.strip().lower() if genre is not None else None
+    key = ("movies", skip, limit, genre, selected)
+    cached = catalog_cache.get(request, key)
+    if cached is not None:
+        return cached
+    snapshot = catalog.snapshot
+    if snapshot is not None:
+        if genre is None:
+            movies = snapshot.page(skip, limit)
+        else:
+            movies = snapshot.by_genre(genre)[max(skip, 0):max(skip, 0) + max(limit, 0)]
+    else:
+        stmt = select(Movie).order_by(Movie.id) if genre is None else movies_in_genre(genre)
+        result = await db.execute(
+            stmt.options(*_movie_fields.load_options(selected)).offset(skip).limit(limit)
+        )
+        movies = result.scalars().all()
+    return catalog_cache.put(request, key, _movie_fields.dump_json(movies, selected))
+
+
+@router.get("/genres", response_model=List[GenreFacet])
+async def read_genre_facets(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Obtener cuántas películas hay de cada género, de más a menos. Acceso público.
+
+    Los conteos salen de la instantánea del catálogo, que los mantiene al
+    aplicar cada cambio, o de una agrupación sobre `movie_genres` cacheada
+    hasta la siguiente escritura.
     """
-    result = await db.execute(select(Movie).offset(skip).limit(limit))
-    movies = result.scalars().all()
-    return movies
+    key = ("genres",)
+    cached = catalog_cache.get(request, key)
+    if cached is not None:
+        return cached
+    snapshot = catalog.snapshot
+    counts = snapshot.genre_counts() if snapshot is not None else await genre_counts(db)
+    facets = [
+        GenreFacet(genre=name, count=count)
+        for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
+    return catalog_cache.put(request, key, _genre_facets.dump_json(facets))
 
 
 @router.get("/{movie_id}", response_model=MovieResponse)
-async def read_movie(movie_id: int, db: AsyncSession = Depends(get_db)):
+async def read_movie(movie_id: int, loaders: Loaders = Depends(get_loaders)):
     """
     Obtener una película por ID. Acceso público.
     """
-    result = await db.execute(select(Movie).where(Movie.id == movie_id))
-    movie = result.scalars().first()
+    # Las películas creadas en otro worker aún pueden no estar en la instantánea
+    movie = catalog.get(movie_id) or await loaders.movies.load(movie_id)
     if movie is None:
         raise HTTPException(status_code=404, detail="Movie not found")
     return movie
@@ -61,21 +156,25 @@ async def update_movie(
     movie_id: int,
     movie_update: MovieUpdate,
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     current_user: User = Depends(get_current_empleado),
 ):
     """
     Actualizar una película. Empleados y gerentes pueden actualizar.
     """
-    result = await db.execute(select(Movie).where(Movie.id == movie_id))
-    movie = result.scalars().first()
+    movie = await loaders.movies.load(movie_id)
     if movie is None:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    for field, value in movie_update.dict(exclude_unset=True).items():
+    changes = movie_update.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(movie, field, value)
 
+    if "genre" in changes:
+        await set_movie_genres(db, [(movie.id, movie.genre)])
+    version = await bump_catalog_version(db, [movie.id])
     await db.commit()
-    await db.refresh(movie)
+    _catalog_changed(version, {movie.id: movie})
     return movie
 
 
@@ -83,16 +182,18 @@ async def update_movie(
 async def delete_movie(
     movie_id: int,
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     current_user: User = Depends(get_current_empleado),
 ):
     """
-    Eliminar una película. Empleados y gerentes pueden eliminar.
+    Eliminar una película y sus horarios (borrado lógico). Empleados y gerentes pueden eliminar.
     """
-    result = await db.execute(select(Movie).where(Movie.id == movie_id))
-    movie = result.scalars().first()
+    movie = await loaders.movies.load(movie_id)
     if movie is None:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    await db.delete(movie)
+    await soft_delete_movie(db, movie)
+    version = await bump_catalog_version(db, [movie.id])
     await db.commit()
+    _catalog_changed(version, {movie.id: None})
     return {"message": "Movie deleted successfully"}
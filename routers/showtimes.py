@@ -4,61 +4,217 @@ Router para gestión de horarios de proyección en el Sistema de Gestión de Cin
 Incluye operaciones CRUD para horarios.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from database import get_db
-from models import Showtime, User
-from schemas import ShowtimeCreate, ShowtimeResponse, ShowtimeUpdate
-from auth import get_current_empleado
+from database import get_db, get_session_factory
+from models import Movie, Showtime, ShowtimeArchive, User
+from schemas import (
+    ImportReport,
+    ScheduleRequest,
+    ScheduleResponse,
+    ShowtimeCreate,
+    ShowtimeResponse,
+    ShowtimeUpdate,
+)
+from auth import get_current_staff
+from archive import with_archived
+from catalog import catalog
+from exports import ExportFormat, export_response
+from fieldsets import FIELDS_DESCRIPTION, FieldSet
+from imports import ImportFormat, detect_format, import_showtimes, iter_records, open_upload
+from loaders import Loaders, get_loaders
+from scheduling import find_conflicting_showtime, generate_schedule, load_theater_schedules
 
 router = APIRouter()
 
+_showtime_fields = FieldSet(ShowtimeResponse, Showtime)
+
+
+async def check_showtime_slot(
+    db: AsyncSession,
+    theater: str,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_id: Optional[int] = None
+):
+    """Verifica que el horario sea válido y no se solape con otro en la misma sala."""
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+    if await find_conflicting_showtime(db, theater, start_time, end_time, exclude_id):
+        raise HTTPException(status_code=400, detail="Showtime overlaps another showtime in the same theater")
+
+
 @router.post("/", response_model=ShowtimeResponse)
 async def create_showtime(
     showtime: ShowtimeCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_empleado)
+    loaders: Loaders = Depends(get_loaders),
+    current_user: User = Depends(get_current_staff)
 ):
     """
     Crear un nuevo horario de proyección. Empleados y gerentes pueden crear.
     """
-    # Verificar que la película existe
-    from models import Movie
-    result = await db.execute(select(Movie).where(Movie.id == showtime.movie_id))
-    if not result.scalars().first():
+    # Verificar que la película existe (en la instantánea del catálogo o en la BD)
+    if catalog.get(showtime.movie_id) is None and await loaders.movies.load(showtime.movie_id) is None:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    db_showtime = Showtime(**showtime.dict())
+    await check_showtime_slot(db, showtime.theater, showtime.start_time, showtime.end_time)
+
+    db_showtime = Showtime(**showtime.dict(), capacity=showtime.available_seats)
     db.add(db_showtime)
     await db.commit()
-    await db.refresh(db_showtime)
     return db_showtime
 
+@router.post("/import", response_model=ImportReport)
+async def import_showtimes_file(
+    file: UploadFile = File(...),
+    format: Optional[ImportFormat] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_staff)
+):
+    """
+    Importar horarios desde un archivo CSV o NDJSON. Empleados y gerentes pueden importar.
+
+    Las películas se verifican con una sola consulta por bloque y las filas
+    inválidas se listan en el reporte sin detener la importación.
+    """
+    fmt = format or detect_format(file.filename)
+    return await import_showtimes(db, iter_records(open_upload(file), fmt))
+
+@router.post("/schedule", response_model=ScheduleResponse)
+async def schedule_showtimes(
+    request: ScheduleRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_staff)
+):
+    """
+    Generar automáticamente los horarios de varias salas. Empleados y gerentes pueden programar.
+
+    Rota las películas indicadas en cada sala desde la apertura hasta el cierre,
+    dejando `cleaning_minutes` entre funciones y respetando los horarios
+    existentes. Con `dry_run` solo se devuelve la propuesta sin guardarla.
+    """
+    if not request.movie_ids or not request.theaters:
+        raise HTTPException(status_code=400, detail="movie_ids and theaters are required")
+
+    result = await db.execute(
+        select(Movie.id, Movie.duration).where(Movie.id.in_(request.movie_ids))
+    )
+    durations = dict(result.all())
+    if len(durations) != len(set(request.movie_ids)):
+        raise HTTPException(status_code=404, detail="Movie not found")
+    if any(duration <= 0 for duration in durations.values()):
+        raise HTTPException(status_code=400, detail="Movie duration must be positive")
+
+    window_start = datetime.combine(request.start_date, request.opening_time)
+    window_end = datetime.combine(request.start_date, request.closing_time) + timedelta(days=request.days)
+    existing = await load_theater_schedules(db, request.theaters, window_start, window_end)
+
+    generated = generate_schedule(
+        [(movie_id, durations[movie_id]) for movie_id in request.movie_ids],
+        request.theaters,
+        request.start_date,
+        request.days,
+        request.opening_time,
+        request.closing_time,
+        request.cleaning_minutes,
+        existing,
+    )
+    now = datetime.utcnow()
+    rows = [
+        {
+            "movie_id": movie_id,
+            "theater": theater,
+            "start_time": start_time,
+            "end_time": end_time,
+            "available_seats": request.available_seats,
+            "capacity": request.available_seats,
+            "price": request.price,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for movie_id, theater, start_time, end_time in generated
+    ]
+    if rows and not request.dry_run:
+        await db.execute(insert(Showtime.__table__), rows)
+        await db.commit()
+
+    return {"created": 0 if request.dry_run else len(rows), "showtimes": rows}
+
 @router.get("/", response_model=List[ShowtimeResponse])
 async def read_showtimes(
     skip: int = 0,
     limit: int = 100,
+    include_archived: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Obtener lista de horarios de proyección. Acceso público.
+
+    - **include_archived**: Incluir los horarios antiguos movidos al archivo
+    - **fields**: Devolver solo estos campos (ver `fieldsets`)
     """
-    result = await db.execute(select(Showtime).offset(skip).limit(limit))
-    showtimes = result.scalars().all()
+    selected = _showtime_fields.parse(fields)
+    if include_archived:
+        showtimes = with_archived(Showtime, ShowtimeArchive)
+        result = await db.execute(
+            select(*_showtime_fields.columns(showtimes, selected)).where(showtimes.c.deleted_at.is_(None))
+            .order_by(showtimes.c.id).offset(skip).limit(limit)
+        )
+        showtimes = result.all()
+    else:
+        result = await db.execute(
+            select(Showtime).options(*_showtime_fields.load_options(selected))
+            .order_by(Showtime.id).offset(skip).limit(limit)
+        )
+        showtimes = result.scalars().all()
+    if selected is not None:
+        return _showtime_fields.response(showtimes, selected)
     return showtimes
 
+@router.get("/export")
+async def export_showtimes(
+    format: ExportFormat = ExportFormat.ndjson,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(get_current_staff)
+):
+    """
+    Exportar horarios en streaming (NDJSON o CSV). Solo empleados y gerentes.
+
+    - **start**: Incluir horarios con `start_time` >= start
+    - **end**: Incluir horarios con `start_time` < end
+    """
+    columns = [column.name for column in Showtime.__table__.columns]
+    stmt = select(*Showtime.__table__.columns).where(Showtime.deleted_at.is_(None)).order_by(Showtime.id)
+    if start is not None:
+        stmt = stmt.where(Showtime.start_time >= start)
+    if end is not None:
+        stmt = stmt.where(Showtime.start_time < end)
+    return export_response(session_factory, stmt, columns, format, "showtimes")
+
 @router.get("/{showtime_id}", response_model=ShowtimeResponse)
 async def read_showtime(
     showtime_id: int,
-    db: AsyncSession = Depends(get_db)
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """
     Obtener un horario por ID. Acceso público.
     """
-    result = await db.execute(select(Showtime).where(Showtime.id == showtime_id))
-    showtime = result.scalars().first()
+    showtime = await loaders.showtimes.load(showtime_id)
+    if showtime is None and include_archived:
+        result = await db.execute(select(ShowtimeArchive).where(
+            ShowtimeArchive.id == showtime_id, ShowtimeArchive.deleted_at.is_(None)
+        ))
+        showtime = result.scalars().first()
     if showtime is None:
         raise HTTPException(status_code=404, detail="Showtime not found")
     return showtime
@@ -68,37 +224,66 @@ async def update_showtime(
     showtime_id: int,
     showtime_update: ShowtimeUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_empleado)
+    loaders: Loaders = Depends(get_loaders),
+    current_user: User = Depends(get_current_staff)
 ):
     """
     Actualizar un horario. Empleados y gerentes pueden actualizar.
     """
-    result = await db.execute(select(Showtime).where(Showtime.id == showtime_id))
-    showtime = result.scalars().first()
+    showtime = await loaders.showtimes.load(showtime_id)
     if showtime is None:
         raise HTTPException(status_code=404, detail="Showtime not found")
 
-    for field, value in showtime_update.dict(exclude_unset=True).items():
-        setattr(showtime, field, value)
+    update_data = showtime_update.dict(exclude_unset=True)
+    if update_data.keys() & {"theater", "start_time", "end_time"}:
+        await check_showtime_slot(
+            db,
+            update_data.get("theater", showtime.theater),
+            update_data.get("start_time", showtime.start_time),
+            update_data.get("end_time", showtime.end_time),
+            exclude_id=showtime.id
+        )
+
+    # Capacidad y asientos disponibles se ajustan en SQL para que
+    # available_seats + seats_sold == capacity aun con reservas concurrentes
+    capacity = update_data.pop("capacity", None)
+    available_seats = update_data.pop("available_seats", None)
+    stmt = update(Showtime).where(Showtime.id == showtime.id)
+    if capacity is not None:
+        stmt = stmt.where(Showtime.seats_sold <= capacity)
+        update_data.update(capacity=capacity, available_seats=capacity - Showtime.seats_sold)
+    elif available_seats is not None:
+        update_data.update(capacity=available_seats + Showtime.seats_sold, available_seats=available_seats)
+    if not update_data:
+        return showtime
+
+    # Un UPDATE ... RETURNING con todos los cambios: devuelve la fila al día sin otro SELECT
+    update_data["updated_at"] = datetime.utcnow()
+    result = await db.execute(
+        stmt.values(**update_data).returning(Showtime)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    showtime = result.scalars().first()
+    if showtime is None:
+        raise HTTPException(status_code=400, detail="Capacity is lower than the seats already sold")
 
     await db.commit()
-    await db.refresh(showtime)
     return showtime
 
 @router.delete("/{showtime_id}")
 async def delete_showtime(
     showtime_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_empleado)
+    loaders: Loaders = Depends(get_loaders),
+    current_user: User = Depends(get_current_staff)
 ):
     """
-    Eliminar un horario. Empleados y gerentes pueden eliminar.
+    Eliminar un horario (borrado lógico; sus reservas se conservan). Empleados y gerentes pueden eliminar.
     """
-    result = await db.execute(select(Showtime).where(Showtime.id == showtime_id))
-    showtime = result.scalars().first()
+    showtime = await loaders.showtimes.load(showtime_id)
     if showtime is None:
         raise HTTPException(status_code=404, detail="Showtime not found")
 
-    await db.delete(showtime)
+    showtime.deleted_at = datetime.utcnow()
     await db.commit()
     return {"message": "Showtime deleted successfully"}
\ No newline at end of file
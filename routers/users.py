@@ -4,17 +4,44 @@ Router para gestión de usuarios en el Sistema de Gestión de Cine.
 Incluye operaciones CRUD con control de acceso basado en roles.
 """
 
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database import get_db
 from models import User
-from schemas import UserCreate, UserResponse, UserUpdate
-from auth import get_current_gerente_optional, get_password_hash
+from schemas import ImportReport, UserCreate, UserResponse, UserUpdate
+from auth import get_current_gerente, get_current_gerente_optional, get_password_hash
+from fieldsets import FIELDS_DESCRIPTION, FieldSet
+from imports import USER_BULK_MAX_RECORDS, import_users
+from loaders import Loaders, get_loaders
 
 router = APIRouter()
 
+_user_fields = FieldSet(UserResponse, User)
+
+
+# Cómo nombran los motores la columna en una violación de unicidad:
+# SQLite "users.email", PostgreSQL "ix_users_email" y "Key (email)=..."
+_UNIQUE_COLUMN_MARKERS = {
+    column: (f"users.{column}", f"ix_users_{column}", f"users_{column}_key", f"key ({column})")
+    for column in ("username", "email")
+}
+
+
+def _raise_duplicate_user(error: IntegrityError):
+    """Traduce la violación de un índice único de `users` al error 400 de la API."""
+    message = str(error.orig).lower()
+    if any(marker in message for marker in _UNIQUE_COLUMN_MARKERS["username"]):
+        raise HTTPException(status_code=400, detail="Username already registered")
+    if any(marker in message for marker in _UNIQUE_COLUMN_MARKERS["email"]):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    raise error
+
+
 @router.post("/", response_model=UserResponse)
 async def create_user(
     user: UserCreate,
@@ -30,64 +57,79 @@ async def create_user(
     - **password**: Contraseña
     - **role**: Rol del usuario (cliente, empleado, gerente)
     """
-    # Verificar si ya existen usuarios en la base de datos
-    result = await db.execute(select(User).limit(1))
-    user_exists = result.scalars().first() is not None
-
     # TEMPORALMENTE DESACTIVADO: Validación de autenticación para crear usuarios
-    # if user_exists:
+    # result = await db.execute(select(User.id).limit(1))
+    # if result.first() is not None:
     #     # Si existen usuarios, verificar autenticación como gerente
     #     if not current_user or current_user.role != "gerente":
     #         raise HTTPException(status_code=403, detail="Not authorized to create users")
 
-    # Verificar si el username ya existe
-    result = await db.execute(select(User).where(User.username == user.username))
-    if result.scalars().first():
-        raise HTTPException(status_code=400, detail="Username already registered")
-
-    # Verificar si el email ya existe
-    result = await db.execute(select(User).where(User.email == user.email))
-    if result.scalars().first():
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Crear el usuario
-    hashed_password = get_password_hash(user.password)
+    # La unicidad de username y email la garantizan los índices únicos: un
+    # solo INSERT, sin consultas previas que dos altas simultáneas podrían pasar
     db_user = User(
         username=user.username,
         email=user.email,
-        password_hash=hashed_password,
+        password_hash=get_password_hash(user.password),
         role=user.role
     )
     db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        _raise_duplicate_user(e)
     return db_user
 
+@router.post("/bulk", response_model=ImportReport)
+async def create_users_bulk(
+    users: List[dict] = Body(..., description="Registros con el formato de UserCreate"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_gerente),
+):
+    """
+    Dar de alta muchos usuarios en una petición. Solo gerentes.
+
+    Cada registro tiene el formato de `UserCreate`. Los registros inválidos
+    o con username/email ya registrados no detienen el alta y se listan en
+    el reporte con su posición en la lista (desde 0).
+    """
+    if len(users) > USER_BULK_MAX_RECORDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {USER_BULK_MAX_RECORDS} users per request",
+        )
+    return await import_users(db, enumerate(users))
+
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     # current_user: User = Depends(get_current_gerente)
 ):
     """
     Obtener lista de usuarios. Solo gerentes pueden ver todos los usuarios.
+
+    - **fields**: Devolver solo estos campos (ver `fieldsets`)
     """
-    result = await db.execute(select(User).offset(skip).limit(limit))
+    selected = _user_fields.parse(fields)
+    result = await db.execute(select(User).options(*_user_fields.load_options(selected)).offset(skip).limit(limit))
     users = result.scalars().all()
+    if selected is not None:
+        return _user_fields.response(users, selected)
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     # current_user: User = Depends(get_current_gerente)
 ):
     """
     Obtener un usuario por ID. Solo gerentes pueden ver usuarios.
     """
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
+    user = await loaders.users.load(user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -102,33 +144,39 @@ async def update_user(
     """
     Actualizar un usuario. Solo gerentes pueden actualizar usuarios.
     """
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
+    changes = user_update.model_dump(exclude_unset=True)
+    if "password" in changes:
+        changes["password_hash"] = get_password_hash(changes.pop("password"))
+    if not changes:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalars().first()
+    else:
+        # Un UPDATE ... RETURNING; un username o email ya usados violan el índice único
+        changes["updated_at"] = datetime.utcnow()
+        try:
+            result = await db.execute(
+                update(User).where(User.id == user_id).values(**changes).returning(User)
+            )
+            user = result.scalars().first()
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            _raise_duplicate_user(e)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-
-    # Actualizar campos
-    for field, value in user_update.dict(exclude_unset=True).items():
-        if field == "password":
-            setattr(user, "password_hash", get_password_hash(value))
-        else:
-            setattr(user, field, value)
-
-    await db.commit()
-    await db.refresh(user)
     return user
 
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     # current_user: User = Depends(get_current_gerente)
 ):
     """
     Eliminar un usuario. Solo gerentes pueden eliminar usuarios.
     """
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
+    user = await loaders.users.load(user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
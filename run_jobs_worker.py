@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Script para ejecutar un worker de trabajos en segundo plano como proceso independiente.
+
+Varios workers pueden compartir la misma cola en PostgreSQL.
+"""
+
+import asyncio
+import signal
+
+from database import async_session
+from jobs import JobWorker
+# Importar los módulos que registran handlers de trabajos
+import archive  # noqa: F401
+import outbox  # noqa: F401
+import reconciliation  # noqa: F401
+import rollups  # noqa: F401
+import soft_delete  # noqa: F401
+import tokens  # noqa: F401
+
+
+async def main():
+    """Ejecuta trabajos hasta recibir SIGINT/SIGTERM."""
+    worker = JobWorker(async_session)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    print("⚙️  Worker de trabajos en marcha...")
+    await worker.run()
+    print("✅ Worker detenido")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
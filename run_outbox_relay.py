@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Script para ejecutar el relay del outbox como proceso independiente.
+
+Uso:
+    OUTBOX_RELAY_SINK=file:/var/lib/cinema/events.ndjson python run_outbox_relay.py
+"""
+
+import asyncio
+import signal
+
+from database import async_session
+from outbox import OUTBOX_RELAY_SINK, OutboxRelay, sink_from_url
+
+
+async def main():
+    """Drena el outbox hasta recibir SIGINT/SIGTERM."""
+    relay = OutboxRelay(async_session, sink_from_url(OUTBOX_RELAY_SINK or "file:events.ndjson"))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, relay.stop)
+    print("📤 Relay del outbox en marcha...")
+    await relay.run()
+    print("✅ Relay detenido")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
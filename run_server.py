@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Script para ejecutar la API en producción.
+
+Arranca uvicorn con un worker por núcleo, uvloop y httptools, keep-alive
+más largo que el del balanceador y cierre ordenado: al recibir SIGTERM se
+deja de aceptar conexiones y se esperan las peticiones en curso (p. ej. una
+reserva a punto de confirmar) hasta `SERVER_GRACEFUL_TIMEOUT_SECONDS`.
+
+El pool de conexiones de cada worker sale de un presupuesto global
+(`DB_CONNECTION_BUDGET`), de modo que añadir workers no agota las
+conexiones de la base de datos. Los workers se reciclan tras
+`WORKER_MAX_REQUESTS` peticiones para acotar el crecimiento de memoria.
+
+Uso:
+    python run_server.py
+    WEB_CONCURRENCY=8 DB_CONNECTION_BUDGET=80 python run_server.py --port 8000
+"""
+
+import argparse
+import os
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))  # 0 = un worker por núcleo
+# Conexiones a la BD para todos los workers juntos; 0 = pool por defecto de SQLAlchemy
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "0"))
+# Mayor que el idle timeout del balanceador (60 s en ALB/nginx) para no cortar conexiones reutilizadas
+SERVER_KEEP_ALIVE_SECONDS = int(os.getenv("SERVER_KEEP_ALIVE_SECONDS", "75"))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+SERVER_GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "10000"))  # 0 = sin reciclado
+
+
+def available_cores() -> int:
+    """Núcleos que puede usar el proceso (respeta cgroups/afinidad)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(requested: int = WEB_CONCURRENCY) -> int:
+    return requested if requested > 0 else available_cores()
+
+
+def pool_settings(budget: int, workers: int) -> dict:
+    """
+    Variables de pool por worker para no superar `budget` conexiones en total.
+
+    Tres cuartas partes fijas (`DB_POOL_SIZE`) y el resto como desborde
+    (`DB_MAX_OVERFLOW`), que se cierra cuando baja la carga.
+    """
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(f"DB_CONNECTION_BUDGET={budget} is too small for {workers} workers")
+    overflow = per_worker // 4
+    return {"DB_POOL_SIZE": str(per_worker - overflow), "DB_MAX_OVERFLOW": str(overflow)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="0 = un worker por núcleo")
+    parser.add_argument("--db-connection-budget", type=int, default=DB_CONNECTION_BUDGET)
+    parser.add_argument("--max-requests", type=int, default=WORKER_MAX_REQUESTS)
+    parser.add_argument("--access-log", action="store_true", help="Registrar cada petición")
+    args = parser.parse_args()
+
+    workers = worker_count(args.workers)
+    # Los workers heredan el entorno: database.py lee aquí el tamaño del pool
+    if args.db_connection_budget:
+        os.environ.update(pool_settings(args.db_connection_budget, workers))
+    os.environ.setdefault("SQL_ECHO", "false")
+
+    import uvicorn
+
+    print(
+        f"🚀 {workers} workers en {args.host}:{args.port} "
+        f"(pool por worker: {os.getenv('DB_POOL_SIZE', 'por defecto')}+{os.getenv('DB_MAX_OVERFLOW', '-')})"
+    )
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=SERVER_KEEP_ALIVE_SECONDS,
+        backlog=SERVER_BACKLOG,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        # Con varios workers, uvicorn sustituye al que sale por límite de peticiones
+        limit_max_requests=args.max_requests or None,
+        proxy_headers=True,
+        access_log=args.access_log,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Programación de horarios para el Sistema de Gestión de Cine.
+
+Genera la cartelera de varias salas a partir de la duración de las
+películas, el horario de apertura y el tiempo de limpieza, y detecta
+solapamientos por sala sin comparar todos los horarios entre sí.
+"""
+
+from bisect import bisect_left, insort
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models import Showtime
+
+# Los inicios generados se redondean a múltiplos de estos minutos
+SCHEDULE_SLOT_MINUTES = 5
+# Clase de los advisory locks por sala en PostgreSQL (la otra clave es el hash de la sala)
+THEATER_LOCK_CLASS = 7_300_002
+
+
+class TheaterSchedule:
+    """
+    Intervalos ocupados de una sala, ordenados por hora de inicio.
+
+    Como los intervalos de una misma sala no se solapan, basta con mirar el
+    último que empieza antes del fin del intervalo consultado (búsqueda
+    binaria, O(log n)).
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]] = ()):
+        self.intervals: List[Tuple[datetime, datetime]] = sorted(intervals)
+
+    def blocking_end(self, start: datetime, end: datetime) -> Optional[datetime]:
+        """Devuelve el fin del intervalo que choca con [start, end), o None."""
+        i = bisect_left(self.intervals, (end,))
+        if i > 0 and self.intervals[i - 1][1] > start:
+            return self.intervals[i - 1][1]
+        return None
+
+    def add(self, start: datetime, end: datetime):
+        """Registra un intervalo ocupado."""
+        insort(self.intervals, (start, end))
+
+
+def find_overlaps(showtimes: Iterable[Tuple[str, datetime, datetime]]) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Devuelve los horarios que se solapan con otro anterior de la misma sala.
+
+    Barrido ordenado por (sala, inicio) que recuerda el mayor fin visto: O(n log n).
+    """
+    overlaps = []
+    current_theater = None
+    max_end = None
+    for theater, start, end in sorted(showtimes):
+        if theater != current_theater:
+            current_theater, max_end = theater, end
+            continue
+        if start < max_end:
+            overlaps.append((theater, start, end))
+        max_end = max(max_end, end)
+    return overlaps
+
+
+def _round_up(moment: datetime) -> datetime:
+    """Redondea hacia arriba al siguiente múltiplo de SCHEDULE_SLOT_MINUTES."""
+    remainder = (moment.minute % SCHEDULE_SLOT_MINUTES) * 60 + moment.second
+    if remainder == 0 and moment.microsecond == 0:
+        return moment
+    return moment.replace(second=0, microsecond=0) + timedelta(
+        minutes=SCHEDULE_SLOT_MINUTES - moment.minute % SCHEDULE_SLOT_MINUTES
+    )
+
+
+def generate_schedule(
+    movies: Sequence[Tuple[int, int]],
+    theaters: Sequence[str],
+    start_date: date,
+    days: int,
+    opening_time: time,
+    closing_time: time,
+    cleaning_minutes: int,
+    existing: Optional[Dict[str, TheaterSchedule]] = None,
+) -> List[Tuple[int, str, datetime, datetime]]:
+    """
+    Genera horarios (movie_id, sala, inicio, fin) para cada sala y día.
+
+    Las películas se rotan por sala y día para repartir la cartelera. Cada
+    función empieza tras la anterior más el tiempo de limpieza y se saltan
+    los huecos ocupados por horarios existentes. Si `closing_time` es menor
+    o igual que `opening_time`, el cierre cae al día siguiente.
+
+    Las duraciones deben ser positivas y la limpieza no negativa: si no, el
+    cursor no avanzaría.
+    """
+    if cleaning_minutes < 0:
+        raise ValueError("cleaning_minutes must not be negative")
+    if any(duration <= 0 for _, duration in movies):
+        raise ValueError("movie durations must be positive")
+    existing = existing or {}
+    buffer = timedelta(minutes=cleaning_minutes)
+    durations = [(movie_id, timedelta(minutes=duration)) for movie_id, duration in movies]
+    generated = []
+
+    for t, theater in enumerate(theaters):
+        schedule = existing.setdefault(theater, TheaterSchedule())
+        for d in range(days):
+            day = start_date + timedelta(days=d)
+            cursor = datetime.combine(day, opening_time)
+            closing = datetime.combine(day, closing_time)
+            if closing <= cursor:
+                closing += timedelta(days=1)
+
+            k = t + d
+            while True:
+                movie_id, duration = durations[k % len(durations)]
+                end = cursor + duration
+                if end > closing:
+                    break
+                blocking_end = schedule.blocking_end(cursor, end)
+                if blocking_end is not None:
+                    next_cursor = _round_up(blocking_end + buffer)
+                else:
+                    schedule.add(cursor, end)
+                    generated.append((movie_id, theater, cursor, end))
+                    next_cursor = _round_up(end + buffer)
+                    k += 1
+                if next_cursor <= cursor:
+                    raise ValueError("schedule cursor must advance")
+                cursor = next_cursor
+
+    return generated
+
+
+async def lock_theaters(db: AsyncSession, theaters: Iterable[str]):
+    """
+    Bloquea las salas hasta el fin de la transacción, para que comprobar
+    solapamientos e insertar no se intercale con otra petición sobre la misma sala.
+
+    En PostgreSQL usa `pg_advisory_xact_lock`, en orden para no provocar
+    interbloqueos; SQLite ya serializa las escrituras.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for theater in sorted(set(theaters)):
+        await db.execute(select(func.pg_advisory_xact_lock(THEATER_LOCK_CLASS, func.hashtext(theater))))
+
+
+async def load_theater_schedules(
+    db: AsyncSession, theaters: Sequence[str], start: datetime, end: datetime
+) -> Dict[str, TheaterSchedule]:
+    """Bloquea las salas y carga sus horarios existentes en la ventana dada con una consulta."""
+    await lock_theaters(db, theaters)
+    result = await db.execute(
+        select(Showtime.theater, Showtime.start_time, Showtime.end_time).where(
+            Showtime.theater.in_(theaters),
+            Showtime.start_time < end,
+            Showtime.end_time > start,
+        )
+    )
+    intervals: Dict[str, list] = {}
+    for theater, start_time, end_time in result.all():
+        intervals.setdefault(theater, []).append((start_time, end_time))
+    return {theater: TheaterSchedule(items) for theater, items in intervals.items()}
+
+
+async def find_conflicting_showtime(
+    db: AsyncSession,
+    theater: str,
+    start: datetime,
+    end: datetime,
+    exclude_id: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Bloquea la sala y devuelve el id de un horario que se solapa con [start, end), o None.
+
+    Comprueba el solapamiento en SQL (`start_time < end AND end_time > start`)
+    sobre el índice (theater, start_time), sin suponer que los horarios ya
+    guardados no se solapan entre sí.
+    """
+    await lock_theaters(db, [theater])
+    stmt = (
+        select(Showtime.id)
+        .where(Showtime.theater == theater, Showtime.start_time < end, Showtime.end_time > start)
+        .order_by(Showtime.start_time)
+        .limit(1)
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(Showtime.id != exclude_id)
+    return (await db.execute(stmt)).scalar()
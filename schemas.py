@@ -4,9 +4,9 @@ Esquemas Pydantic para validación de datos en el Sistema de Gestión de Cine.
 Define modelos para requests, responses y validaciones.
 """
 
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from datetime import date, datetime, time
+from typing import Any, List, Literal, Optional
 from models import UserRole, BookingStatus
 
 # Esquemas para User
@@ -58,6 +58,10 @@ class MovieResponse(MovieBase):
     class Config:
         from_attributes = True
 
+class GenreFacet(BaseModel):
+    genre: str  # nombre en minúsculas, el valor de ?genre=
+    count: int
+
 # Esquemas para Showtime
 class ShowtimeBase(BaseModel):
     movie_id: int
@@ -76,15 +80,34 @@ class ShowtimeUpdate(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     available_seats: Optional[int] = None
+    capacity: Optional[int] = None
     price: Optional[int] = None
 
 class ShowtimeResponse(ShowtimeBase):
     id: int
+    capacity: Optional[int] = None
+    seats_sold: int = 0
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class ScheduleRequest(BaseModel):
+    movie_ids: List[int] = Field(max_length=100)
+    theaters: List[str] = Field(max_length=50)
+    start_date: date
+    days: int = Field(7, ge=1, le=90)
+    opening_time: time = time(10, 0)
+    closing_time: time = time(23, 30)
+    cleaning_minutes: int = Field(20, ge=0, le=24 * 60)
+    available_seats: int = Field(100, ge=1, le=10000)
+    price: int = Field(ge=1, le=10_000_000)  # precio en centavos
+    dry_run: bool = False
+
+class ScheduleResponse(BaseModel):
+    created: int
+    showtimes: List[ShowtimeBase]
+
 # Esquemas para Booking
 class BookingBase(BaseModel):
     user_id: int
@@ -106,6 +129,86 @@ class BookingResponse(BookingBase):
     class Config:
         from_attributes = True
 
+class BookingDetailResponse(BookingResponse):
+    showtime: Optional[ShowtimeResponse] = None  # None si el horario se eliminó
+    movie: Optional[MovieResponse] = None
+
+# Esquemas para analítica
+class MovieRevenue(BaseModel):
+    movie_id: int
+    title: str
+    revenue: int
+    seats_sold: int
+    bookings_count: int
+
+class ShowtimeOccupancy(BaseModel):
+    showtime_id: int
+    movie_id: int
+    theater: str
+    start_time: datetime
+    seats_sold: int
+    available_seats: int
+    occupancy: float
+
+class DailySalesResponse(BaseModel):
+    day: date
+    revenue: int
+    seats_sold: int
+    bookings_count: int
+
+    class Config:
+        from_attributes = True
+
+# Esquemas para reconciliación de asientos
+class SeatDrift(BaseModel):
+    showtime_id: int
+    capacity: int
+    available_seats: int
+    expected_available_seats: int
+    seats_sold: int
+    expected_seats_sold: int
+
+class ReconciliationReport(BaseModel):
+    checked: int
+    drifted: int
+    fixed: int
+    baselined: int
+    drifts: List[SeatDrift]
+
+# Esquemas para archivado
+class ArchiveReport(BaseModel):
+    cutoff: datetime
+    showtimes: int
+    bookings: int
+
+# Esquemas para importación masiva
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
+
+# Esquemas para peticiones agrupadas (POST /batch)
+class BatchItem(BaseModel):
+    id: Optional[str] = None  # se devuelve tal cual para casar respuestas
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str  # ruta con query string, p. ej. "/movies/?limit=10"
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+class BatchItemResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Any = None
+
+class BatchResponse(BaseModel):
+    responses: List[BatchItemResponse]
+
 # Esquemas para autenticación
 class UserLogin(BaseModel):
     username: str
@@ -114,6 +217,11 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # segundos de vida del token de acceso
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     username: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Contadores de asientos para el Sistema de Gestión de Cine.
+
+`Showtime.available_seats` y `Showtime.seats_sold` se ajustan con UPDATE
+atómicos en SQL (nunca leyendo y escribiendo desde Python), de modo que dos
+reservas concurrentes no pueden vender el mismo asiento. Se cumple
+`available_seats + seats_sold == capacity`, donde `seats_sold` cuenta las
+reservas activas (pendientes y confirmadas).
+"""
+
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models import Booking, BookingStatus, Showtime
+
+SEAT_BACKFILL_BATCH_SIZE = int(os.getenv("SEAT_BACKFILL_BATCH_SIZE", "5000"))
+
+# Transiciones de estado permitidas: pending -> confirmed -> cancelled
+BOOKING_TRANSITIONS = {
+    BookingStatus.pending: {BookingStatus.confirmed, BookingStatus.cancelled},
+    BookingStatus.confirmed: {BookingStatus.cancelled},
+    BookingStatus.cancelled: set(),
+}
+
+
+class InvalidTransition(ValueError):
+    """Cambio de estado de reserva no permitido."""
+
+
+def check_transition(current: BookingStatus, new: BookingStatus):
+    """Lanza `InvalidTransition` si la reserva no puede pasar de `current` a `new`."""
+    if new != current and new not in BOOKING_TRANSITIONS[current]:
+        raise InvalidTransition(f"Cannot change booking status from {current.value} to {new.value}")
+
+
+async def transition_booking(db: AsyncSession, booking: Booking, new: BookingStatus) -> bool:
+    """
+    Cambia el estado de la reserva solo si sigue en el que se leyó
+    (`UPDATE ... WHERE status = :leído`).
+
+    Devuelve False si otra transacción la cambió antes: quien pierde no debe
+    devolver asientos ni tocar los agregados.
+    """
+    result = await db.execute(
+        update(Booking)
+        .where(Booking.id == booking.id, Booking.status == booking.status)
+        .values(status=new)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+async def delete_booking_row(db: AsyncSession, booking_id: int) -> Optional[bool]:
+    """
+    Borra la reserva con un DELETE ... RETURNING.
+
+    Devuelve True si estaba activa (hay que devolver sus asientos), False si
+    ya estaba cancelada y None si otra transacción la borró antes.
+    """
+    result = await db.execute(
+        delete(Booking)
+        .where(Booking.id == booking_id, Booking.status != BookingStatus.cancelled)
+        .returning(Booking.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.first() is not None:
+        return True
+    result = await db.execute(
+        delete(Booking).where(Booking.id == booking_id).returning(Booking.id)
+        .execution_options(synchronize_session=False)
+    )
+    return False if result.first() is not None else None
+
+
+def active_seats(showtime_id):
+    """Subconsulta correlacionada con los asientos de las reservas activas."""
+    return (
+        select(func.coalesce(func.sum(Booking.seats_booked), 0))
+        .where(Booking.showtime_id == showtime_id, Booking.status != BookingStatus.cancelled)
+        .scalar_subquery()
+    )
+
+
+async def reserve_seats(db: AsyncSession, showtime_id: int, seats: int) -> bool:
+    """
+    Descuenta `seats` asientos si quedan suficientes, en un solo UPDATE condicional.
+
+    Devuelve False si no había asientos (o el horario no existe).
+    """
+    result = await db.execute(
+        update(Showtime)
+        .where(Showtime.id == showtime_id, Showtime.available_seats >= seats)
+        .values(
+            available_seats=Showtime.available_seats - seats,
+            seats_sold=Showtime.seats_sold + seats,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+async def release_seats(db: AsyncSession, showtime_id: int, seats: int):
+    """Devuelve `seats` asientos al horario (cancelación o eliminación de una reserva activa)."""
+    await db.execute(
+        update(Showtime)
+        .where(Showtime.id == showtime_id)
+        .values(
+            available_seats=Showtime.available_seats + seats,
+            seats_sold=Showtime.seats_sold - seats,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def backfill_seat_counters(db: AsyncSession, batch_size: int = SEAT_BACKFILL_BATCH_SIZE) -> int:
+    """
+    Rellena `seats_sold` (y `capacity` si es NULL) desde las reservas, por lotes de ids.
+
+    Cada lote es un UPDATE con subconsultas correlacionadas y su propio commit,
+    para no bloquear la tabla entera. Devuelve el número de horarios procesados.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(Showtime.id).where(Showtime.id > last_id).order_by(Showtime.id).limit(batch_size)
+            .execution_options(include_deleted=True)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            break
+        sold = active_seats(Showtime.id)
+        await db.execute(
+            update(Showtime)
+            .where(Showtime.id.in_(ids))
+            .values(
+                seats_sold=sold,
+                capacity=func.coalesce(Showtime.capacity, Showtime.available_seats + sold),
+                updated_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        total += len(ids)
+        last_id = ids[-1]
+    return total
@@ -0,0 +1,105 @@
+"""
+Borrado lógico para el Sistema de Gestión de Cine.
+
+Los endpoints de borrado de películas y horarios marcan `deleted_at` en lugar
+de borrar la fila (las reservas siguen apuntando a ella). La purga elimina
+definitivamente, por lotes, las filas borradas hace más de
+SOFT_DELETE_RETENTION_DAYS que ya no tienen nada que las referencie.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, exists, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from jobs import job
+from metrics import Counter
+from models import Booking, Movie, MovieGenre, MovieSales, Showtime, ShowtimeArchive
+
+SOFT_DELETE_RETENTION_DAYS = float(os.getenv("SOFT_DELETE_RETENTION_DAYS", "30"))
+SOFT_DELETE_PURGE_BATCH_SIZE = int(os.getenv("SOFT_DELETE_PURGE_BATCH_SIZE", "1000"))
+
+rows_purged = Counter("soft_deleted_rows_purged_total", "Filas borradas lógicamente eliminadas por la purga")
+
+
+async def soft_delete_movie(db: AsyncSession, movie: Movie):
+    """Marca la película y sus horarios como borrados, en la transacción actual."""
+    now = datetime.utcnow()
+    movie.deleted_at = now
+    await db.execute(
+        update(Showtime)
+        .where(Showtime.movie_id == movie.id, Showtime.deleted_at.is_(None))
+        .values(deleted_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _purge_batches(db: AsyncSession, model, stmt, dependents) -> int:
+    """Borra por lotes las filas de `model` cuyos ids devuelve `stmt`, con un commit por lote."""
+    total = 0
+    while True:
+        result = await db.execute(stmt.execution_options(include_deleted=True))
+        ids = result.scalars().all()
+        if not ids:
+            break
+        for column in dependents:
+            await db.execute(delete(column.class_).where(column.in_(ids)))
+        await db.execute(delete(model).where(model.id.in_(ids)))
+        await db.commit()
+        total += len(ids)
+    return total
+
+
+async def purge_deleted(
+    db: AsyncSession,
+    older_than: Optional[timedelta] = None,
+    batch_size: int = SOFT_DELETE_PURGE_BATCH_SIZE,
+) -> dict:
+    """
+    Elimina los horarios y películas borrados hace más de `older_than`.
+
+    Se conservan los horarios con reservas y las películas con horarios
+    (vivos, borrados o archivados), para no dejar referencias huérfanas.
+    """
+    if older_than is None:
+        older_than = timedelta(days=SOFT_DELETE_RETENTION_DAYS)
+    cutoff = datetime.utcnow() - older_than
+
+    showtimes = await _purge_batches(
+        db,
+        Showtime,
+        select(Showtime.id)
+        .where(
+            Showtime.deleted_at < cutoff,
+            ~exists().where(Booking.showtime_id == Showtime.id),
+        )
+        .order_by(Showtime.id)
+        .limit(batch_size),
+        [],
+    )
+    movies = await _purge_batches(
+        db,
+        Movie,
+        select(Movie.id)
+        .where(
+            Movie.deleted_at < cutoff,
+            ~exists().where(Showtime.movie_id == Movie.id),
+            ~exists().where(ShowtimeArchive.movie_id == Movie.id),
+        )
+        .order_by(Movie.id)
+        .limit(batch_size),
+        [MovieSales.movie_id, MovieGenre.movie_id],
+    )
+    rows_purged.inc(showtimes, table="showtimes")
+    rows_purged.inc(movies, table="movies")
+    return {"showtimes": showtimes, "movies": movies}
+
+
+@job("soft_delete.purge")
+async def purge_deleted_job(db: AsyncSession, payload: dict):
+    """Trabajo en segundo plano de purga. Payload: `older_than_days` (opcional)."""
+    days = payload.get("older_than_days")
+    await purge_deleted(db, timedelta(days=days) if days is not None else None)
@@ -5,17 +5,19 @@ Proporciona fixtures para la aplicación FastAPI, cliente HTTP y base de datos d
 """
 
 import asyncio
+from contextlib import contextmanager
 from typing import AsyncGenerator
 import uuid
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from database import Base, get_db
+from database import Base, get_db, get_session_factory
 from main import app
 
 
@@ -43,6 +45,13 @@ async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def override_get_session_factory():
+    """
+    Override para get_session_factory que usa la BD de test.
+    """
+    return test_async_session
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """
@@ -60,6 +69,7 @@ def test_app():
     """
     # Override la dependencia de BD
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
 
     # Crear tablas en la BD de test
     import asyncio
@@ -117,9 +127,150 @@ async def cleanup_session(session):
         pass
 
 
+@pytest.fixture(scope="session")
+def session_factory(test_app):
+    """
+    Fixture que proporciona la fábrica de sesiones de la BD de test.
+    """
+    return test_async_session
+
+
 @pytest.fixture(scope="function")
 def unique_id():
     """
     Fixture que proporciona un ID único para cada test.
     """
-    return str(uuid.uuid4())[:8]
\ No newline at end of file
+    return str(uuid.uuid4())[:8]
+
+@pytest.fixture(scope="function")
+def gerente_headers(client, db_session, unique_id):
+    """
+    Fixture que crea un gerente y devuelve las cabeceras con su token.
+    """
+    from auth import get_password_hash
+    from models import User, UserRole
+
+    user = User(
+        username=f"gerente_{unique_id}",
+        email=f"gerente_{unique_id}@example.com",
+        password_hash=get_password_hash("gerentepass"),
+        role=UserRole.gerente
+    )
+    db_session.add(user)
+    asyncio.run(db_session.commit())
+    response = client.post(
+        "/auth/token",
+        data={"username": user.username, "password": "gerentepass"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="function")
+def cliente_headers(client, db_session, unique_id):
+    """
+    Fixture que crea un cliente y devuelve las cabeceras con su token.
+    """
+    from auth import get_password_hash
+    from models import User, UserRole
+
+    user = User(
+        username=f"cliente_token_{unique_id}",
+        email=f"cliente_token_{unique_id}@example.com",
+        password_hash=get_password_hash("clientepass"),
+        role=UserRole.cliente
+    )
+    db_session.add(user)
+    asyncio.run(db_session.commit())
+    response = client.post(
+        "/auth/token",
+        data={"username": user.username, "password": "clientepass"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="function")
+def cliente_user(test_app, db_session, unique_id):
+    """
+    Fixture que crea un cliente y lo usa como usuario autenticado en los
+    endpoints protegidos por `get_current_cliente`.
+    """
+    from auth import get_current_cliente
+    from models import User, UserRole
+
+    user = User(
+        username=f"cliente_{unique_id}",
+        email=f"cliente_{unique_id}@example.com",
+        password_hash="not-used",
+        role=UserRole.cliente
+    )
+    db_session.add(user)
+    asyncio.run(db_session.commit())
+    test_app.dependency_overrides[get_current_cliente] = lambda: user
+    yield user
+    test_app.dependency_overrides.pop(get_current_cliente, None)
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """
+    Vacía la caché del catálogo: muchos tests insertan películas directamente en la BD.
+    """
+    from response_cache import catalog_cache
+
+    catalog_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_catalog_snapshot():
+    """
+    Sin instantánea del catálogo (como sin arrancar la app): los tests que la
+    usan la cargan explícitamente.
+    """
+    from catalog import catalog
+
+    catalog.clear()
+    yield
+    catalog.clear()
+
+
+def _capture(select_only: bool):
+    @contextmanager
+    def capture():
+        engine = test_engine.sync_engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if not select_only or statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        def record_commit(conn):
+            statements.append("COMMIT")
+
+        event.listen(engine, "before_cursor_execute", record)
+        if not select_only:
+            event.listen(engine, "commit", record_commit)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+            if not select_only:
+                event.remove(engine, "commit", record_commit)
+
+    return capture
+
+
+@pytest.fixture
+def captured_selects():
+    """
+    Context manager que recoge las sentencias SELECT ejecutadas contra la BD de test.
+    """
+    return _capture(select_only=True)
+
+
+@pytest.fixture
+def captured_statements():
+    """
+    Context manager que recoge todas las sentencias ejecutadas contra la BD de
+    test, con un "COMMIT" por cada commit.
+    """
+    return _capture(select_only=False)
@@ -0,0 +1,106 @@
+"""
+Tests para los reportes de analítica y sus agregados incrementales.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.future import select
+
+from models import Movie, MovieSales, Showtime
+from rollups import rebuild_rollups
+
+
+@pytest.fixture
+def analytics_showtime(db_session, unique_id):
+    """
+    Fixture que crea un horario de 50 asientos a 1000 por asiento.
+    """
+    movie = Movie(title=f"Analytics Movie {unique_id}", duration=120)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+
+    start_time = datetime(2032, 5, 1, 20, 0)
+    showtime = Showtime(
+        movie_id=movie.id,
+        theater=f"Analytics Theater {unique_id}",
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        available_seats=50,
+        price=1000
+    )
+    db_session.add(showtime)
+    asyncio.run(db_session.commit())
+    return showtime
+
+
+def get_sales(db_session, model, key, value):
+    result = asyncio.run(db_session.execute(
+        select(model.revenue, model.seats_sold, model.bookings_count).where(key == value)
+    ))
+    return tuple(result.first())
+
+
+class TestAnalytics:
+    """Tests para analítica de ventas."""
+
+    def test_analytics_requires_gerente(self, client: TestClient):
+        """
+        Test acceder a analítica sin token.
+        """
+        response = client.get("/analytics/daily")
+        assert response.status_code == 401
+
+    def test_rollups_follow_booking_lifecycle(
+        self, client: TestClient, db_session, gerente_headers, cliente_user, analytics_showtime
+    ):
+        """
+        Test agregados al crear, cancelar y eliminar reservas.
+        """
+        showtime = analytics_showtime
+        first = client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 2}).json()
+        second = client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 3}).json()
+
+        response = client.get(
+            "/analytics/showtimes",
+            params={"start": "2032-05-01T00:00:00", "end": "2032-05-02T00:00:00"},
+            headers=gerente_headers
+        )
+        assert response.status_code == 200
+        [row] = [r for r in response.json() if r["showtime_id"] == showtime.id]
+        assert row["seats_sold"] == 5
+        assert row["available_seats"] == 45
+        assert row["occupancy"] == 0.1
+
+        response = client.get("/analytics/movies", headers=gerente_headers)
+        [movie] = [m for m in response.json() if m["movie_id"] == showtime.movie_id]
+        assert (movie["revenue"], movie["seats_sold"], movie["bookings_count"]) == (5000, 5, 2)
+
+        # Cancelar devuelve la reserva de los agregados; reactivar la suma de nuevo
+        client.put(f"/bookings/{first['id']}", json={"status": "cancelled"}, headers=gerente_headers)
+        assert get_sales(db_session, MovieSales, MovieSales.movie_id, showtime.movie_id) == (3000, 3, 1)
+
+        client.delete(f"/bookings/{second['id']}")
+        assert get_sales(db_session, MovieSales, MovieSales.movie_id, showtime.movie_id) == (0, 0, 0)
+
+        response = client.get("/analytics/daily", headers=gerente_headers)
+        assert response.status_code == 200
+        assert all(day["bookings_count"] >= 0 for day in response.json())
+
+    def test_rebuild_rollups_matches_incremental(
+        self, client: TestClient, db_session, cliente_user, analytics_showtime
+    ):
+        """
+        Test recalcular agregados desde cero.
+        """
+        showtime = analytics_showtime
+        for seats in (1, 4):
+            client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": seats})
+        incremental = get_sales(db_session, MovieSales, MovieSales.movie_id, showtime.movie_id)
+
+        asyncio.run(rebuild_rollups(db_session))
+
+        assert incremental == (5000, 5, 2)
+        assert get_sales(db_session, MovieSales, MovieSales.movie_id, showtime.movie_id) == incremental
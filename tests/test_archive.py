@@ -0,0 +1,115 @@
+"""
+Tests para el archivado de horarios y reservas antiguos.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.future import select
+
+from archive import archive_old_data
+from models import Booking, BookingArchive, Movie, MovieSales, Showtime, ShowtimeArchive
+from rollups import rebuild_rollups
+
+
+@pytest.fixture
+def archive_showtimes(db_session, unique_id):
+    """
+    Fixture que crea un horario de hace dos años y otro futuro.
+    """
+    movie = Movie(title=f"Archive Movie {unique_id}", duration=100)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+
+    showtimes = []
+    for start_time in (datetime.utcnow() - timedelta(days=730), datetime.utcnow() + timedelta(days=3)):
+        showtime = Showtime(
+            movie_id=movie.id,
+            theater=f"Archive Theater {unique_id}",
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=2),
+            available_seats=20,
+            capacity=20,
+            price=700
+        )
+        db_session.add(showtime)
+        showtimes.append(showtime)
+    asyncio.run(db_session.commit())
+    return showtimes
+
+
+def run(session_factory, fn):
+    async def wrapper():
+        async with session_factory() as session:
+            return await fn(session)
+    return asyncio.run(wrapper())
+
+
+class TestArchive:
+    """Tests para el archivado."""
+
+    def test_archive_moves_old_showtimes_with_bookings(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, archive_showtimes
+    ):
+        """
+        Test archivar mueve horarios antiguos y sus reservas, y la lectura puede incluirlos.
+        """
+        old, upcoming = archive_showtimes
+        old_booking = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": old.id, "seats_booked": 2}
+        ).json()
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": upcoming.id, "seats_booked": 1})
+
+        report = run(session_factory, lambda s: archive_old_data(s, timedelta(days=365), batch_size=1))
+        assert report.showtimes >= 1
+        assert report.bookings >= 1
+
+        async def locations(session):
+            live = await session.execute(select(Showtime.id).where(Showtime.id.in_([old.id, upcoming.id])))
+            archived = await session.execute(select(ShowtimeArchive.id).where(ShowtimeArchive.id == old.id))
+            booking = await session.execute(select(Booking.id).where(Booking.id == old_booking["id"]))
+            archived_booking = await session.execute(
+                select(BookingArchive.status).where(BookingArchive.id == old_booking["id"])
+            )
+            return (
+                live.scalars().all(), archived.scalars().all(),
+                booking.scalars().all(), archived_booking.scalars().all(),
+            )
+        live, archived, booking, archived_booking = run(session_factory, locations)
+        assert live == [upcoming.id]
+        assert archived == [old.id]
+        assert booking == []
+        assert [status.value for status in archived_booking] == ["pending"]
+
+        assert client.get(f"/showtimes/{old.id}").status_code == 404
+        response = client.get(f"/showtimes/{old.id}", params={"include_archived": True})
+        assert response.status_code == 200
+        assert response.json()["seats_sold"] == 2
+
+        response = client.get("/showtimes/", params={"include_archived": True, "limit": 100000})
+        assert old.id in [s["id"] for s in response.json()]
+
+        response = client.get(f"/bookings/{old_booking['id']}", params={"include_archived": True})
+        assert response.status_code == 200
+        response = client.get("/bookings/", params={"include_archived": True})
+        assert old_booking["id"] in [b["id"] for b in response.json()]
+
+    def test_rebuild_rollups_keeps_archived_revenue(
+        self, client: TestClient, session_factory, cliente_user, archive_showtimes
+    ):
+        """
+        Test recalcular agregados tras archivar conserva los ingresos de la película.
+        """
+        old, upcoming = archive_showtimes
+        for showtime in (old, upcoming):
+            client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 1})
+
+        run(session_factory, lambda s: archive_old_data(s, timedelta(days=365)))
+        run(session_factory, rebuild_rollups)
+
+        async def revenue(session):
+            result = await session.execute(select(MovieSales.revenue).where(MovieSales.movie_id == old.movie_id))
+            return result.scalar()
+        assert run(session_factory, revenue) == 1400
@@ -0,0 +1,84 @@
+"""
+Tests para el endpoint de peticiones agrupadas (POST /batch).
+"""
+
+from fastapi.testclient import TestClient
+
+import auth
+from routers import batch
+
+
+class TestBatch:
+    """Tests para POST /batch."""
+
+    def test_public_subrequests(self, client: TestClient):
+        """
+        Test cada sub-petición devuelve su estado y cuerpo, con su id.
+        """
+        response = client.post("/batch", json={"requests": [
+            {"id": "movies", "path": "/movies/?limit=5&fields=title"},
+            {"id": "showtimes", "path": "/showtimes/?limit=5"},
+            {"id": "missing", "path": "/movies/999999"},
+            {"id": "unknown", "path": "/nope"},
+            {"id": "nested", "method": "POST", "path": "/batch"},
+            {"id": "invalid", "path": "/movies/?limit=abc"},
+        ]})
+        assert response.status_code == 200
+        results = {item["id"]: item for item in response.json()["responses"]}
+        assert results["movies"]["status"] == 200
+        assert all(set(row) == {"id", "title"} for row in results["movies"]["body"])
+        assert results["showtimes"]["status"] == 200
+        assert isinstance(results["showtimes"]["body"], list)
+        assert results["missing"] == {"id": "missing", "status": 404, "body": {"detail": "Movie not found"}}
+        assert results["unknown"]["status"] == 404
+        assert results["nested"]["status"] == 400
+        assert results["invalid"]["status"] == 422
+
+    def test_authenticates_once(self, client: TestClient, gerente_headers, monkeypatch):
+        """
+        Test el usuario del token se busca una vez para todo el lote.
+        """
+        lookups = []
+        get_user = auth.get_user
+
+        async def counting_get_user(db, username):
+            lookups.append(username)
+            return await get_user(db, username)
+        monkeypatch.setattr(auth, "get_user", counting_get_user)
+        # La BD de test es una sola conexión compartida: una escritura no puede
+        # intercalarse con otras transacciones
+        monkeypatch.setattr(batch, "BATCH_CONCURRENCY", 1)
+
+        response = client.post("/batch", headers=gerente_headers, json={"requests": [
+            {"path": "/analytics/movies"},
+            {"path": "/analytics/daily"},
+            {"method": "POST", "path": "/movies/", "body": {"title": "Batch movie", "duration": 90}},
+        ]})
+        assert response.status_code == 200
+        assert [item["status"] for item in response.json()["responses"]] == [200, 200, 200]
+        assert response.json()["responses"][2]["body"]["title"] == "Batch movie"
+        assert len(lookups) == 1
+
+    def test_subrequests_without_token_are_rejected(self, client: TestClient):
+        """
+        Test sin token las rutas protegidas responden 401 dentro del lote.
+        """
+        response = client.post("/batch", json={"requests": [{"path": "/analytics/movies"}]})
+        assert response.json()["responses"][0]["status"] == 401
+
+    def test_invalid_token_rejects_batch(self, client: TestClient):
+        """
+        Test un token inválido rechaza el lote entero.
+        """
+        response = client.post(
+            "/batch", headers={"Authorization": "Bearer invalid"}, json={"requests": [{"path": "/movies/"}]}
+        )
+        assert response.status_code == 401
+
+    def test_request_limit(self, client: TestClient, monkeypatch):
+        """
+        Test más sub-peticiones que BATCH_MAX_REQUESTS devuelve 413.
+        """
+        monkeypatch.setattr(batch, "BATCH_MAX_REQUESTS", 2)
+        response = client.post("/batch", json={"requests": [{"path": "/movies/"}] * 3})
+        assert response.status_code == 413
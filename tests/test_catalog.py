@@ -0,0 +1,167 @@
+"""
+Tests para la instantánea en memoria del catálogo de películas.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from catalog import (
+    CatalogMovie, CatalogSnapshot, bump_catalog_version, catalog, catalog_refreshes, current_version, refresh_snapshot,
+)
+from database import Base
+from models import Movie
+
+
+def movie(movie_id: int, genre=None, release_date=None) -> CatalogMovie:
+    return CatalogMovie(movie_id, f"Movie {movie_id}", None, 100, genre, release_date, None, None)
+
+
+def load_catalog(session_factory):
+    async def run():
+        async with session_factory() as session:
+            await catalog.refresh(session)
+    asyncio.run(run())
+
+
+class TestCatalogSnapshot:
+    """Tests para los índices de CatalogSnapshot."""
+
+    def test_indexes(self):
+        """
+        Test búsqueda por id, páginas en orden de id, géneros y fechas de estreno.
+        """
+        day = datetime(2026, 3, 1)
+        snapshot = CatalogSnapshot(7, {
+            3: movie(3, "Drama, Comedia", day),
+            1: movie(1, "drama", day - timedelta(days=10)),
+            2: movie(2, None, datetime(2026, 3, 5, 12, tzinfo=timezone.utc)),
+        })
+        assert len(snapshot) == 3
+        assert snapshot.get(2).id == 2 and snapshot.get(9) is None
+        assert [m.id for m in snapshot.page(0, 2)] == [1, 2]
+        assert [m.id for m in snapshot.page(2, 10)] == [3]
+        assert [m.id for m in snapshot.by_genre(" DRAMA ")] == [1, 3]
+        assert snapshot.genre_counts() == {"drama": 2, "comedia": 1}
+        assert [m.id for m in snapshot.released_between(day, day + timedelta(days=30))] == [3, 2]
+        assert [m.id for m in snapshot.released_between(end=day)] == [1]
+
+    def test_apply_builds_a_new_snapshot(self):
+        """
+        Test aplicar cambios no modifica la instantánea que están usando los lectores.
+        """
+        old = CatalogSnapshot(1, {1: movie(1, "Drama"), 2: movie(2, "Drama")})
+        new = old.apply(2, {2: None, 5: movie(5, "Terror")})
+        assert [m.id for m in old.page(0, 10)] == [1, 2]
+        assert [m.id for m in new.page(0, 10)] == [1, 5]
+        assert [m.id for m in new.by_genre("terror")] == [5]
+        assert new.version == 2
+
+
+class TestCatalogReads:
+    """Tests para las lecturas servidas desde la instantánea."""
+
+    def test_reads_without_database(self, client: TestClient, db_session, session_factory, unique_id, captured_selects):
+        """
+        Test con la instantánea cargada el catálogo no consulta la base de datos.
+        """
+        db_movie = Movie(title=f"Snapshot movie {unique_id}", duration=95, genre="Drama")
+        db_session.add(db_movie)
+        asyncio.run(db_session.commit())
+        load_catalog(session_factory)
+
+        with captured_selects() as statements:
+            listing = client.get("/movies/", params={"limit": 1000})
+            detail = client.get(f"/movies/{db_movie.id}")
+            narrow = client.get("/movies/", params={"limit": 1000, "fields": "title"})
+        assert statements == []
+        assert db_movie.id in [row["id"] for row in listing.json()]
+        assert detail.json()["title"] == db_movie.title
+        assert {"id": db_movie.id, "title": db_movie.title} in narrow.json()
+
+    def test_writes_refresh_incrementally(self, client: TestClient, gerente_headers, session_factory, captured_selects):
+        """
+        Test crear, actualizar y eliminar películas aplica las filas escritas a la instantánea sin releerlas.
+        """
+        load_catalog(session_factory)
+        other_worker = catalog.snapshot
+        local = catalog_refreshes.value(kind="local")
+
+        with captured_selects() as statements:
+            created = client.post("/movies/", headers=gerente_headers, json={"title": "Fresh", "duration": 90}).json()
+            assert catalog.get(created["id"]).title == "Fresh"
+            client.put(f"/movies/{created['id']}", headers=gerente_headers, json={"title": "Fresher"})
+            assert client.get(f"/movies/{created['id']}").json()["title"] == "Fresher"
+        assert not [s for s in statements if "catalog_" in s]
+        client.delete(f"/movies/{created['id']}", headers=gerente_headers)
+        assert catalog.get(created["id"]) is None
+        assert catalog_refreshes.value(kind="local") == local + 3
+        assert catalog.snapshot.version == other_worker.version + 3
+
+        # Otro worker se pone al día con la versión, los cambios y las películas cambiadas
+        async def catch_up():
+            async with session_factory() as session:
+                return await refresh_snapshot(session, other_worker)
+
+        before = catalog_refreshes.value(kind="full")
+        snapshot = asyncio.run(catch_up())
+        assert catalog_refreshes.value(kind="full") == before
+        assert snapshot.version == catalog.snapshot.version
+        assert snapshot.get(created["id"]) is None
+        assert len(snapshot) == len(catalog.snapshot)
+
+    def test_create_showtime_validates_against_snapshot(self, client: TestClient, gerente_headers, session_factory):
+        """
+        Test crear un horario valida la película con la instantánea y, si no está, con la BD.
+        """
+        load_catalog(session_factory)
+        movie_id = client.post("/movies/", headers=gerente_headers, json={"title": "Shown", "duration": 90}).json()["id"]
+        start = datetime.now() + timedelta(days=400)
+        payload = {
+            "movie_id": movie_id, "theater": f"Sala snapshot {movie_id}", "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=2)).isoformat(), "available_seats": 50, "price": 800,
+        }
+        assert client.post("/showtimes/", headers=gerente_headers, json=payload).status_code == 200
+        payload["movie_id"] = 999999
+        assert client.post("/showtimes/", headers=gerente_headers, json=payload).status_code == 404
+
+
+class TestCatalogVersion:
+    """Tests para bump_catalog_version."""
+
+    def test_first_writes_on_empty_table(self, tmp_path):
+        """
+        Test las primeras escrituras concurrentes crean la fila de versión sin chocar por la clave.
+        """
+        async def run():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/catalog.db")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            statements = []
+            event.listen(
+                engine.sync_engine, "before_cursor_execute",
+                lambda conn, cursor, statement, *args: statements.append(statement),
+            )
+            factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+            async def write():
+                async with factory() as session:
+                    version = await bump_catalog_version(session, [1])
+                    await session.commit()
+                    return version
+
+            versions = await asyncio.gather(write(), write())
+            async with factory() as session:
+                current = await current_version(session)
+            await engine.dispose()
+            return versions, current, [s for s in statements if "catalog_version" in s and not s.startswith("SELECT")]
+
+        versions, current, writes = asyncio.run(run())
+        assert sorted(versions) == [1, 2]
+        assert current == 2
+        # Sin la fila, un UPDATE seguido de INSERT chocaría en PostgreSQL: una sola sentencia por escritura
+        assert len(writes) == 2 and all("ON CONFLICT" in s for s in writes)
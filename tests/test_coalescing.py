@@ -0,0 +1,85 @@
+"""
+Tests para la agrupación de lecturas GET idénticas (single-flight).
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from coalescing import SingleFlightMiddleware, single_flight_requests
+from compression import CompressionMiddleware
+
+
+def make_app(routes):
+    """App mínima que cuenta las ejecuciones y tarda lo bastante para que se solapen."""
+    app = FastAPI()
+    calls = []
+
+    @app.get("/movies/{movie_id}")
+    async def read_movie(movie_id: int):
+        calls.append(movie_id)
+        await asyncio.sleep(0.05)
+        return {"id": movie_id, "description": "x" * 2000}
+
+    @app.post("/movies/{movie_id}")
+    async def update_movie(movie_id: int):
+        calls.append(movie_id)
+        await asyncio.sleep(0.05)
+        return {"id": movie_id}
+
+    app.add_middleware(SingleFlightMiddleware, routes=routes)
+    app.add_middleware(CompressionMiddleware)
+    return app, calls
+
+
+async def fire(app, requests):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        return await asyncio.gather(*(ac.request(method, url, headers=headers) for method, url, headers in requests))
+
+
+class TestSingleFlight:
+    """Tests para SingleFlightMiddleware."""
+
+    def test_identical_reads_share_one_execution(self):
+        """
+        Test diez GET iguales y simultáneos ejecutan el handler una vez y reciben lo mismo.
+        """
+        app, calls = make_app(["/movies/{movie_id:int}"])
+        followers = single_flight_requests.value(route="/movies/{movie_id:int}", role="follower")
+        responses = asyncio.run(fire(app, [("GET", "/movies/1", {"Accept-Encoding": "gzip"})] * 10))
+        assert calls == [1]
+        assert all(response.status_code == 200 for response in responses)
+        assert all(response.json() == responses[0].json() for response in responses)
+        # Cada respuesta se comprime por separado, sin cabeceras duplicadas
+        assert all(response.headers["content-encoding"] == "gzip" for response in responses)
+        assert all(response.headers["vary"] == "Accept-Encoding" for response in responses)
+        assert single_flight_requests.value(route="/movies/{movie_id:int}", role="follower") == followers + 9
+
+    def test_different_requests_are_not_shared(self):
+        """
+        Test distinta ruta, token o método no se agrupan.
+        """
+        app, calls = make_app(["/movies/{movie_id:int}"])
+        asyncio.run(fire(app, [
+            ("GET", "/movies/1", {}),
+            ("GET", "/movies/2", {}),
+            ("GET", "/movies/1", {"Authorization": "Bearer a"}),
+            ("GET", "/movies/1", {"Authorization": "Bearer b"}),
+            ("POST", "/movies/1", {}),
+            ("POST", "/movies/1", {}),
+        ]))
+        assert sorted(calls) == [1, 1, 1, 1, 1, 2]
+
+    def test_unconfigured_route_and_sequential_reads(self):
+        """
+        Test sin la ruta configurada cada petición se ejecuta; y no actúa como caché.
+        """
+        app, calls = make_app([])
+        asyncio.run(fire(app, [("GET", "/movies/1", {})] * 3))
+        assert calls == [1, 1, 1]
+
+        app, calls = make_app(["/movies/{movie_id:int}"])
+        asyncio.run(fire(app, [("GET", "/movies/1", {})]))
+        asyncio.run(fire(app, [("GET", "/movies/1", {})]))
+        assert calls == [1, 1]
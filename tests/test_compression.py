@@ -0,0 +1,119 @@
+"""
+Tests para la compresión de respuestas y la caché del catálogo.
+"""
+
+import asyncio
+import gzip
+
+from fastapi.testclient import TestClient
+
+from compression import negotiate
+from models import Movie
+
+
+def create_movies(db_session, unique_id, count: int = 30):
+    for i in range(count):
+        db_session.add(Movie(
+            title=f"Compressed movie {i} {unique_id}",
+            description="Una película con una descripción larga y repetitiva " * 3,
+            duration=120,
+            genre="Drama",
+        ))
+    asyncio.run(db_session.commit())
+
+
+class TestNegotiation:
+    """Tests para la negociación de Accept-Encoding."""
+
+    def test_negotiate(self):
+        """
+        Test pesos q, exclusiones y comodín.
+        """
+        assert negotiate(None) is None
+        assert negotiate("") is None
+        assert negotiate("identity") is None
+        assert negotiate("gzip") == "gzip"
+        assert negotiate("gzip;q=0") is None
+        assert negotiate("deflate, gzip;q=0.5") == "gzip"
+        assert negotiate("*") is not None
+        assert negotiate("*, gzip;q=0") in ("br", "zstd", None)
+        assert negotiate("unknown") is None
+
+
+class TestCompression:
+    """Tests para el middleware de compresión."""
+
+    def test_large_response_is_compressed(self, client: TestClient, db_session, unique_id):
+        """
+        Test un listado grande se comprime con gzip y se descomprime igual.
+        """
+        create_movies(db_session, unique_id)
+        plain = client.get("/movies/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+
+        response = client.get("/movies/", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == plain.json()
+        assert int(response.headers["content-length"]) < len(plain.content)
+
+    def test_small_response_is_not_compressed(self, client: TestClient):
+        """
+        Test las respuestas por debajo del umbral no se comprimen.
+        """
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_export_is_compressed(self, client: TestClient, gerente_headers):
+        """
+        Test las exportaciones en streaming se comprimen por trozos.
+        """
+        response = client.get(
+            "/showtimes/export", params={"format": "csv"},
+            headers={**gerente_headers, "Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.startswith("id,")
+
+
+class TestCatalogCache:
+    """Tests para la caché del catálogo precomprimida."""
+
+    def test_cache_hit_and_invalidation(self, client: TestClient, db_session, unique_id, gerente_headers):
+        """
+        Test la segunda petición sale de la caché y una escritura la invalida.
+        """
+        create_movies(db_session, unique_id)
+        first = client.get("/movies/", params={"limit": 500}, headers={"Accept-Encoding": "gzip"})
+        assert first.headers["x-cache"] == "miss"
+
+        second = client.get("/movies/", params={"limit": 500}, headers={"Accept-Encoding": "gzip"})
+        assert second.headers["x-cache"] == "hit"
+        assert second.headers["content-encoding"] == "gzip"
+        assert second.json() == first.json()
+
+        # Otra codificación de la misma página reutiliza el cuerpo serializado
+        identity = client.get("/movies/", params={"limit": 500}, headers={"Accept-Encoding": "identity"})
+        assert identity.headers["x-cache"] == "hit"
+        assert "content-encoding" not in identity.headers
+        assert identity.json() == first.json()
+
+        response = client.post("/movies/", json={"title": f"New {unique_id}", "duration": 90}, headers=gerente_headers)
+        assert response.status_code == 200
+        third = client.get("/movies/", params={"limit": 500}, headers={"Accept-Encoding": "gzip"})
+        assert third.headers["x-cache"] == "miss"
+        assert any(movie["title"] == f"New {unique_id}" for movie in third.json())
+
+    def test_cached_body_is_precompressed(self, client: TestClient, db_session, unique_id):
+        """
+        Test el cuerpo guardado es gzip válido y no se vuelve a comprimir.
+        """
+        create_movies(db_session, unique_id)
+        client.get("/movies/", headers={"Accept-Encoding": "gzip"})
+        with client.stream("GET", "/movies/", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+        assert gzip.decompress(raw).startswith(b"[")
@@ -0,0 +1,95 @@
+"""
+Tests para la exportación en streaming de reservas y horarios.
+"""
+
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models import Movie, Showtime, Booking
+
+
+@pytest.fixture
+def export_data(db_session, unique_id):
+    """
+    Fixture que crea un horario con reservas repartidas en el tiempo.
+    """
+    movie = Movie(title=f"Export Movie {unique_id}", duration=90)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+
+    start_time = datetime(2030, 1, 1, 20, 0)
+    showtime = Showtime(
+        movie_id=movie.id,
+        theater=f"Export Theater {unique_id}",
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        price=10
+    )
+    db_session.add(showtime)
+    asyncio.run(db_session.commit())
+
+    bookings = []
+    for day in range(3):
+        booking = Booking(
+            user_id=1,
+            showtime_id=showtime.id,
+            seats_booked=1,
+            total_price=10,
+            booking_time=datetime(2029, 12, 1 + day, 12, 0)
+        )
+        db_session.add(booking)
+        bookings.append(booking)
+    asyncio.run(db_session.commit())
+    return showtime, bookings
+
+
+class TestExports:
+    """Tests para exportaciones en streaming."""
+
+    def test_export_requires_auth(self, client: TestClient):
+        """
+        Test exportar sin token.
+        """
+        response = client.get("/bookings/export")
+        assert response.status_code == 401
+
+    def test_export_bookings_ndjson(self, client: TestClient, gerente_headers, export_data):
+        """
+        Test exportar reservas en NDJSON con filtro de fechas.
+        """
+        showtime, bookings = export_data
+        response = client.get(
+            "/bookings/export",
+            params={"start": "2029-12-02T00:00:00", "end": "2029-12-04T00:00:00"},
+            headers=gerente_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [b.id for b in bookings[1:]]
+        assert rows[0]["status"] == "pending"
+        assert rows[0]["booking_time"] == "2029-12-02T12:00:00"
+
+    def test_export_showtimes_csv(self, client: TestClient, gerente_headers, export_data):
+        """
+        Test exportar horarios en CSV.
+        """
+        showtime, _ = export_data
+        response = client.get(
+            "/showtimes/export",
+            params={"format": "csv", "start": "2030-01-01T00:00:00", "end": "2030-01-02T00:00:00"},
+            headers=gerente_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert showtime.id in [int(row["id"]) for row in rows]
+        assert rows[0]["start_time"] == "2030-01-01T20:00:00"
@@ -0,0 +1,87 @@
+"""
+Tests para la selección de campos (`fields=`) en los listados.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from models import Movie, Showtime
+
+
+def create_showtime(db_session, unique_id):
+    movie = Movie(title=f"Fields movie {unique_id}", description="Descripción", duration=100, genre="Drama")
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+    start = datetime.now() + timedelta(days=1)
+    showtime = Showtime(
+        movie_id=movie.id, theater=f"Sala {unique_id}", start_time=start,
+        end_time=start + timedelta(hours=2), available_seats=80, price=950,
+    )
+    db_session.add(showtime)
+    asyncio.run(db_session.commit())
+    return movie, showtime
+
+
+class TestFieldSets:
+    """Tests para `fields=` en los listados."""
+
+    def test_movies_fields_narrow_payload_and_query(self, client: TestClient, db_session, unique_id, captured_selects):
+        """
+        Test solo se devuelven y se consultan los campos pedidos, más `id`.
+        """
+        movie, _ = create_showtime(db_session, unique_id)
+        with captured_selects() as statements:
+            response = client.get("/movies/", params={"fields": "title", "limit": 1000})
+        assert response.status_code == 200
+        rows = response.json()
+        assert all(set(row) == {"id", "title"} for row in rows)
+        assert {"id": movie.id, "title": movie.title} in rows
+
+        query = next(s for s in statements if "FROM movies" in s)
+        assert "movies.title" in query
+        assert "movies.description" not in query
+
+    def test_movies_fields_cached_separately(self, client: TestClient, db_session, unique_id):
+        """
+        Test la caché del catálogo distingue las páginas por campos.
+        """
+        create_showtime(db_session, unique_id)
+        full = client.get("/movies/")
+        narrow = client.get("/movies/", params={"fields": "id"})
+        assert "description" in full.json()[0]
+        assert set(narrow.json()[0]) == {"id"}
+        assert narrow.headers["x-cache"] == "miss"
+
+    def test_showtimes_fields(self, client: TestClient, db_session, unique_id):
+        """
+        Test horarios con campos seleccionados, también incluyendo el archivo.
+        """
+        _, showtime = create_showtime(db_session, unique_id)
+        for params in ({"fields": "theater,price"}, {"fields": "theater,price", "include_archived": True}):
+            response = client.get("/showtimes/", params={**params, "limit": 1000})
+            assert response.status_code == 200
+            rows = {row["id"]: row for row in response.json()}
+            assert rows[showtime.id] == {"id": showtime.id, "theater": showtime.theater, "price": 950}
+
+    def test_users_fields(self, client: TestClient, gerente_headers, captured_selects):
+        """
+        Test usuarios sin columnas que no se piden.
+        """
+        with captured_selects() as statements:
+            response = client.get("/users/", params={"fields": "username,role"})
+        assert response.status_code == 200
+        assert all(set(row) == {"id", "username", "role"} for row in response.json())
+        query = next(s for s in statements if "FROM users" in s)
+        assert "users.email" not in query
+
+    def test_unknown_field_rejected(self, client: TestClient):
+        """
+        Test un campo que no está en el esquema (o no es público) devuelve 400.
+        """
+        for path in ("/movies/", "/showtimes/", "/users/"):
+            response = client.get(path, params={"fields": "id,hashed_password"})
+            assert response.status_code == 400
+            assert "hashed_password" in response.json()["detail"]
+        assert client.get("/movies/", params={"fields": " , "}).status_code == 400
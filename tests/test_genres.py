@@ -0,0 +1,115 @@
+"""
+Tests para los géneros normalizados y el filtro por género del catálogo.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from catalog import catalog
+from genres import backfill_movie_genres, movies_in_genre
+from models import Genre, Movie, MovieGenre
+
+
+def load_catalog(session_factory):
+    async def run():
+        async with session_factory() as session:
+            await catalog.refresh(session)
+    asyncio.run(run())
+
+
+def facets(client: TestClient) -> dict:
+    return {row["genre"]: row["count"] for row in client.get("/movies/genres").json()}
+
+
+class TestGenreBackfill:
+    """Tests para backfill_movie_genres."""
+
+    def test_backfill_splits_and_links(self, db_session, session_factory, unique_id):
+        """
+        Test el backfill separa el texto por comas, reutiliza géneros y puede relanzarse.
+        """
+        movies = [
+            Movie(title=f"Backfill {i} {unique_id}", duration=90, genre=genre)
+            for i, genre in enumerate([f"Noir{unique_id}, Drama", f" noir{unique_id} ", None])
+        ]
+        db_session.add_all(movies)
+        asyncio.run(db_session.commit())
+        after_id = movies[0].id - 1
+
+        async def run():
+            async with session_factory() as session:
+                first = await backfill_movie_genres(session, batch_size=2, after_id=after_id)
+                second = await backfill_movie_genres(session, batch_size=2, after_id=after_id)
+                result = await session.execute(
+                    select(MovieGenre.movie_id, Genre.slug, Genre.name)
+                    .join(Genre, Genre.id == MovieGenre.genre_id)
+                    .where(MovieGenre.movie_id.in_([movie.id for movie in movies]))
+                    .order_by(MovieGenre.movie_id, Genre.slug)
+                )
+                return first, second, result.all()
+
+        first, second, links = asyncio.run(run())
+        assert first == second == 3
+        slug = f"noir{unique_id}".lower()
+        assert [(movie_id, s) for movie_id, s, _ in links] == [
+            (movies[0].id, "drama"), (movies[0].id, slug), (movies[1].id, slug),
+        ]
+        assert {name for _, s, name in links if s == slug} == {f"Noir{unique_id}"}
+
+
+class TestGenreFilter:
+    """Tests para GET /movies/?genre= y GET /movies/genres."""
+
+    def test_filter_and_facets_follow_writes(self, client: TestClient, gerente_headers, unique_id):
+        """
+        Test crear, actualizar y eliminar películas mantiene el filtro y los conteos por género.
+        """
+        western, heist = f"western{unique_id}", f"heist{unique_id}"
+        created = [
+            client.post("/movies/", headers=gerente_headers, json={"title": title, "duration": 90, "genre": genre}).json()
+            for title, genre in [("A", f"Western{unique_id}"), ("B", f"Western{unique_id}, Heist{unique_id}")]
+        ]
+        listing = client.get("/movies/", params={"genre": f"WESTERN{unique_id}", "fields": "title"})
+        assert listing.json() == [{"id": movie["id"], "title": movie["title"]} for movie in created]
+        assert facets(client)[western] == 2 and facets(client)[heist] == 1
+
+        client.put(f"/movies/{created[0]['id']}", headers=gerente_headers, json={"genre": f"Heist{unique_id}"})
+        client.delete(f"/movies/{created[1]['id']}", headers=gerente_headers)
+        assert [row["id"] for row in client.get("/movies/", params={"genre": heist}).json()] == [created[0]["id"]]
+        assert client.get("/movies/", params={"genre": western}).json() == []
+        assert western not in facets(client) and facets(client)[heist] == 1
+
+    def test_snapshot_matches_database(self, client: TestClient, gerente_headers, session_factory, unique_id, captured_selects):
+        """
+        Test con la instantánea cargada el filtro y los conteos coinciden con la BD, sin consultarla.
+        """
+        genre = f"Musical{unique_id}"
+        for title in ["C", "D", "E"]:
+            client.post("/movies/", headers=gerente_headers, json={"title": title, "duration": 90, "genre": genre})
+        from_database = client.get("/movies/", params={"genre": genre, "skip": 1, "limit": 5}).json()
+        database_facets = facets(client)
+
+        load_catalog(session_factory)
+        with captured_selects() as statements:
+            from_snapshot = client.get("/movies/", params={"genre": genre, "skip": 1, "limit": 5}).json()
+            snapshot_facets = facets(client)
+        assert statements == []
+        assert from_snapshot == from_database and len(from_snapshot) == 2
+        # Otros tests crean películas sin enlaces (sin backfill): solo se compara el género de este
+        assert snapshot_facets[genre.lower()] == database_facets[genre.lower()] == 3
+
+    def test_filter_uses_genre_index(self, db_session):
+        """
+        Test la consulta por género recorre el índice (genre_id, movie_id), no la tabla de películas.
+        """
+        stmt = movies_in_genre("drama").limit(10)
+        compiled = stmt.compile(db_session.bind, compile_kwargs={"literal_binds": True})
+
+        async def plan():
+            result = await db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+            return " ".join(row[-1] for row in result)
+
+        assert "ix_movie_genres_genre_id_movie_id" in asyncio.run(plan())
@@ -0,0 +1,132 @@
+"""
+Tests para la importación masiva de películas y horarios.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from imports import import_movies
+from models import Movie, Showtime
+
+
+@pytest.fixture
+def import_movie(db_session, unique_id):
+    """
+    Fixture que crea una película para importar horarios.
+    """
+    movie = Movie(title=f"Import Movie {unique_id}", duration=100)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+    return movie
+
+
+def count_showtimes(db_session, theater):
+    result = asyncio.run(db_session.execute(
+        select(func.count()).select_from(Showtime).where(Showtime.theater == theater)
+    ))
+    return result.scalar()
+
+
+class TestImports:
+    """Tests para importación masiva."""
+
+    def test_import_movies_csv(self, client: TestClient, gerente_headers, unique_id):
+        """
+        Test importar películas desde CSV.
+        """
+        content = (
+            "title,description,duration,genre\n"
+            f"CSV Movie A {unique_id},,90,CSV{unique_id}\n"
+            f"CSV Movie B {unique_id},Una sinopsis,110,\n"
+        )
+        response = client.post(
+            "/movies/import",
+            files={"file": ("movies.csv", content, "text/csv")},
+            headers=gerente_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"inserted": 2, "failed": 0, "errors": []}
+        by_genre = client.get("/movies/", params={"genre": f"csv{unique_id}", "fields": "title"}).json()
+        assert [row["title"] for row in by_genre] == [f"CSV Movie A {unique_id}"]
+
+    def test_import_requires_staff(self, client: TestClient, cliente_headers):
+        """
+        Test un cliente no puede importar películas ni horarios.
+        """
+        for path in ["/movies/import", "/showtimes/import"]:
+            response = client.post(path, files={"file": ("data.csv", "title,duration\nX,90\n", "text/csv")},
+                                   headers=cliente_headers)
+            assert response.status_code == 403
+
+    def test_import_showtimes_ndjson_reports_errors(self, client: TestClient, gerente_headers, db_session, import_movie, unique_id):
+        """
+        Test importar horarios en NDJSON con filas inválidas.
+        """
+        theater = f"Import Theater {unique_id}"
+        valid = {
+            "movie_id": import_movie.id,
+            "theater": theater,
+            "start_time": "2030-02-01T18:00:00",
+            "end_time": "2030-02-01T20:00:00",
+            "price": 900
+        }
+        lines = [
+            json.dumps(valid),
+            json.dumps({**valid, "movie_id": 999999}),
+            json.dumps({**valid, "price": "gratis"}),
+            "{not json",
+            json.dumps({**valid, "start_time": "2030-02-01T21:00:00", "end_time": "2030-02-01T23:00:00"}),
+            json.dumps({**valid, "start_time": "2030-02-01T19:00:00", "end_time": "2030-02-01T20:30:00"}),
+            json.dumps({**valid, "start_time": "2030-02-02T12:00:00", "end_time": "2030-02-02T10:00:00"}),
+        ]
+        response = client.post(
+            "/showtimes/import",
+            files={"file": ("showtimes.ndjson", "\n".join(lines), "application/x-ndjson")},
+            headers=gerente_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["inserted"] == 2
+        assert data["failed"] == 5
+        errors = {error["row"]: error["error"] for error in data["errors"]}
+        assert errors[2] == "Movie not found"
+        assert errors[3].startswith("price")
+        assert errors[4].startswith("Invalid JSON")
+        assert errors[6] == "Showtime overlaps another showtime in the same theater"
+        assert errors[7] == "end_time must be after start_time"
+        assert count_showtimes(db_session, theater) == 2
+
+        # Un segundo archivo no puede solaparse con lo ya importado
+        response = client.post(
+            "/showtimes/import",
+            files={"file": ("showtimes.ndjson", json.dumps(valid), "application/x-ndjson")},
+            headers=gerente_headers
+        )
+        assert response.json()["errors"] == [{"row": 1, "error": "Showtime overlaps another showtime in the same theater"}]
+
+    def test_import_parses_off_the_event_loop(self, session_factory, unique_id):
+        """
+        Test la lectura y validación de los bloques no se ejecuta en el hilo del bucle de eventos.
+        """
+        threads = set()
+
+        def records():
+            for i in range(5):
+                threads.add(threading.current_thread())
+                yield i + 1, {"title": f"Threaded {i} {unique_id}", "duration": 90}
+
+        async def run():
+            async with session_factory() as session:
+                return await import_movies(session, records(), chunk_size=2)
+
+        report = asyncio.run(run())
+        assert report.inserted == 5
+        assert threads and threading.main_thread() not in threads
@@ -0,0 +1,146 @@
+"""
+Tests para la cola de trabajos en segundo plano.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from jobs import JobWorker, enqueue, job, jobs_finished
+from models import Job, JobStatus
+
+calls = []
+attempts_by_key = {}
+running = {"now": 0, "max": 0}
+
+
+@job("test.record")
+async def record_job(db, payload):
+    calls.append(payload["key"])
+
+
+@job("test.flaky")
+async def flaky_job(db, payload):
+    attempts_by_key[payload["key"]] = attempts_by_key.get(payload["key"], 0) + 1
+    if attempts_by_key[payload["key"]] < payload["succeed_on"]:
+        raise RuntimeError("temporary failure")
+
+
+@job("test.slow")
+async def slow_job(db, payload):
+    running["now"] += 1
+    running["max"] = max(running["max"], running["now"])
+    await asyncio.sleep(0.01)
+    running["now"] -= 1
+
+
+def enqueue_jobs(session_factory, name, payloads, **kwargs):
+    async def run():
+        async with session_factory() as session:
+            jobs = [enqueue(session, name, payload, **kwargs) for payload in payloads]
+            await session.commit()
+            return [j.id for j in jobs]
+    return asyncio.run(run())
+
+
+def get_job(session_factory, job_id):
+    async def run():
+        async with session_factory() as session:
+            return (await session.execute(select(Job).where(Job.id == job_id))).scalars().first()
+    return asyncio.run(run())
+
+
+def make_due(session_factory, job_id):
+    async def run():
+        async with session_factory() as session:
+            await session.execute(update(Job).where(Job.id == job_id).values(run_at=datetime.utcnow()))
+            await session.commit()
+    asyncio.run(run())
+
+
+class TestJobs:
+    """Tests para la cola de trabajos."""
+
+    def test_enqueue_unknown_job(self, session_factory):
+        """
+        Test encolar un trabajo sin handler registrado.
+        """
+        with pytest.raises(ValueError):
+            enqueue_jobs(session_factory, "test.unknown", [{}])
+
+    def test_worker_runs_enqueued_job(self, session_factory, unique_id):
+        """
+        Test ejecutar un trabajo encolado.
+        """
+        [job_id] = enqueue_jobs(session_factory, "test.record", [{"key": unique_id}])
+
+        asyncio.run(JobWorker(session_factory).drain())
+
+        assert unique_id in calls
+        db_job = get_job(session_factory, job_id)
+        assert db_job.status == JobStatus.done
+        assert db_job.attempts == 1
+
+    def test_worker_retries_with_backoff(self, session_factory, unique_id):
+        """
+        Test reintentar un trabajo fallido y marcarlo como fallido al agotar intentos.
+        """
+        [retried, exhausted] = enqueue_jobs(
+            session_factory, "test.flaky",
+            [{"key": f"r{unique_id}", "succeed_on": 2}, {"key": f"e{unique_id}", "succeed_on": 9}],
+            max_attempts=2
+        )
+        worker = JobWorker(session_factory)
+        asyncio.run(worker.drain())
+
+        db_job = get_job(session_factory, retried)
+        assert db_job.status == JobStatus.pending
+        assert db_job.run_at > datetime.utcnow()
+        assert "temporary failure" in db_job.last_error
+
+        for job_id in (retried, exhausted):
+            make_due(session_factory, job_id)
+        asyncio.run(worker.drain())
+
+        assert get_job(session_factory, retried).status == JobStatus.done
+        assert get_job(session_factory, exhausted).status == JobStatus.failed
+        assert jobs_finished.value(name="test.flaky", outcome="failed") >= 1
+
+    def test_worker_bounds_concurrency(self, session_factory, unique_id):
+        """
+        Test limitar los trabajos ejecutándose a la vez.
+        """
+        enqueue_jobs(session_factory, "test.slow", [{} for _ in range(6)])
+
+        asyncio.run(JobWorker(session_factory, concurrency=2).drain())
+
+        assert running["max"] == 2
+
+    def test_reclaim_stale_fails_exhausted_jobs(self, session_factory, unique_id):
+        """
+        Test los trabajos huérfanos vuelven a la cola salvo los que agotaron sus intentos.
+        """
+        [requeued, exhausted] = enqueue_jobs(
+            session_factory, "test.record", [{"key": f"q{unique_id}"}, {"key": f"x{unique_id}"}], max_attempts=2
+        )
+
+        async def orphan():
+            async with session_factory() as session:
+                for job_id, attempts in [(requeued, 1), (exhausted, 2)]:
+                    await session.execute(update(Job).where(Job.id == job_id).values(
+                        status=JobStatus.running, attempts=attempts, started_at=datetime.utcnow() - timedelta(days=1)
+                    ))
+                await session.commit()
+        asyncio.run(orphan())
+        failed = jobs_finished.value(name="test.record", outcome="failed")
+
+        assert asyncio.run(JobWorker(session_factory).reclaim_stale()) >= 2
+
+        assert get_job(session_factory, requeued).status == JobStatus.pending
+        db_job = get_job(session_factory, exhausted)
+        assert db_job.status == JobStatus.failed
+        assert db_job.finished_at is not None and "timed out" in db_job.last_error
+        assert jobs_finished.value(name="test.record", outcome="failed") == failed + 1
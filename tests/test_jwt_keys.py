@@ -0,0 +1,155 @@
+"""
+Tests para la firma asimétrica de tokens y la rotación de claves.
+"""
+
+import os
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+
+import auth
+import jwt_keys
+from jwt_keys import KeyRegistry, VerifiedTokenCache
+from routers import auth_router
+
+
+def write_key(directory, kid: str, public_only: bool = False):
+    """Genera una clave EC P-256 y la guarda como `<kid>.pem` o `<kid>.pub.pem`."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    if public_only:
+        pem = key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        path = directory / f"{kid}.pub.pem"
+    else:
+        pem = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        path = directory / f"{kid}.pem"
+    path.write_bytes(pem)
+    return path
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """
+    Fixture que activa la firma ES256 con un directorio de claves temporal.
+    """
+    write_key(tmp_path, "2026-01")
+    registry = KeyRegistry(str(tmp_path), reload_seconds=3600)
+    cache = VerifiedTokenCache(ttl=30)
+    registry.on_keys_removed = cache.clear
+    monkeypatch.setattr(auth, "key_registry", registry)
+    monkeypatch.setattr(auth, "verified_tokens", cache)
+    monkeypatch.setattr(auth_router, "key_registry", registry)
+    return registry
+
+
+class TestKeyRegistry:
+    """Tests para el registro de claves."""
+
+    def test_tokens_are_signed_with_kid(self, registry):
+        """
+        Test los tokens se firman con ES256 y la clave más reciente.
+        """
+        token = auth.create_access_token({"sub": "alice"})
+        header = jwt.get_unverified_header(token)
+        assert header["alg"] == "ES256"
+        assert header["kid"] == "2026-01"
+        assert auth.decode_access_token(token)["sub"] == "alice"
+
+        # Un token HS256 firmado con el secreto ya no es válido
+        legacy = jwt.encode({"sub": "alice"}, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+        with pytest.raises(JWTError):
+            auth.decode_access_token(legacy)
+
+    def test_rotation(self, registry, tmp_path):
+        """
+        Test rotar claves: la nueva firma y la retirada sigue verificando hasta borrarla.
+        """
+        old_token = auth.create_access_token({"sub": "alice"})
+        write_key(tmp_path, "2026-02")
+        registry.reload()
+
+        new_token = auth.create_access_token({"sub": "bob"})
+        assert jwt.get_unverified_header(new_token)["kid"] == "2026-02"
+        assert auth.decode_access_token(old_token)["sub"] == "alice"
+
+        # Retirar la clave antigua: se quita el fichero y los tokens que firmó dejan de valer
+        os.remove(tmp_path / "2026-01.pem")
+        registry.reload()
+        with pytest.raises(JWTError):
+            auth.decode_access_token(old_token)
+        assert auth.decode_access_token(new_token)["sub"] == "bob"
+
+    def test_unknown_kid_triggers_reload(self, registry, tmp_path, monkeypatch):
+        """
+        Test un `kid` desconocido relee el directorio (clave añadida por otro worker).
+        """
+        monkeypatch.setattr(jwt_keys, "UNKNOWN_KID_RELOAD_SECONDS", 0)
+        other = KeyRegistry(str(tmp_path))
+        write_key(tmp_path, "2026-03")
+        other.reload()
+        kid, key = other.signing_key()
+        token = jwt.encode({"sub": "carol"}, key, algorithm="ES256", headers={"kid": kid})
+
+        assert auth.decode_access_token(token)["sub"] == "carol"
+
+    def test_public_only_keys_and_jwks(self, client: TestClient, registry, tmp_path):
+        """
+        Test JWKS publica las claves públicas, incluidas las retiradas.
+        """
+        write_key(tmp_path, "2025-12", public_only=True)
+        registry.reload()
+        assert registry.signing_key()[0] == "2026-01"
+
+        response = client.get("/auth/jwks.json")
+        assert response.status_code == 200
+        keys = {key["kid"]: key for key in response.json()["keys"]}
+        assert set(keys) == {"2025-12", "2026-01"}
+        assert keys["2026-01"]["kty"] == "EC"
+        assert keys["2026-01"]["alg"] == "ES256"
+        assert "d" not in keys["2026-01"]
+
+    def test_login_with_asymmetric_keys(self, client: TestClient, registry, gerente_headers):
+        """
+        Test el flujo completo de login y acceso funciona con ES256.
+        """
+        token = gerente_headers["Authorization"].split()[1]
+        assert jwt.get_unverified_header(token)["kid"] == "2026-01"
+        response = client.get("/analytics/daily", headers=gerente_headers)
+        assert response.status_code == 200
+
+
+class TestVerifiedTokenCache:
+    """Tests para la caché de verificación."""
+
+    def test_cached_verification(self, registry, monkeypatch):
+        """
+        Test un token ya verificado no repite la verificación criptográfica.
+        """
+        token = auth.create_access_token({"sub": "alice"})
+        auth.decode_access_token(token)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("token verified twice")
+        monkeypatch.setattr(auth.jwt, "decode", fail)
+        assert auth.decode_access_token(token)["sub"] == "alice"
+
+    def test_entries_expire(self):
+        """
+        Test las entradas no sobreviven al TTL ni al `exp` del token.
+        """
+        cache = VerifiedTokenCache(ttl=30, max_size=2)
+        cache.put("a", {"sub": "a", "exp": time.time() - 1})
+        assert cache.get("a") is None
+        cache.put("b", {"sub": "b", "exp": time.time() + 60})
+        cache.put("c", {"sub": "c", "exp": time.time() + 60})
+        cache.put("d", {"sub": "d", "exp": time.time() + 60})
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("d")["sub"] == "d"
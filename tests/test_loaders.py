@@ -0,0 +1,124 @@
+"""
+Tests para los cargadores agrupados por clave primaria.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.future import select
+
+from loaders import Loaders
+from models import Booking, Movie, Showtime
+
+
+def create_movies(db_session, unique_id, count: int = 5):
+    movies = [Movie(title=f"Loader movie {i} {unique_id}", duration=90) for i in range(count)]
+    db_session.add_all(movies)
+    asyncio.run(db_session.commit())
+    return movies
+
+
+class TestLoaders:
+    """Tests para Loader/Loaders."""
+
+    def test_same_tick_loads_share_one_query(self, db_session, session_factory, unique_id, captured_selects):
+        """
+        Test las búsquedas de una misma vuelta del bucle se resuelven con un solo IN.
+        """
+        movies = create_movies(db_session, unique_id)
+        ids = [movie.id for movie in movies]
+
+        async def one_by_one():
+            async with session_factory() as session:
+                for movie_id in ids:
+                    (await session.execute(select(Movie).where(Movie.id == movie_id))).scalars().first()
+
+        async def batched():
+            async with session_factory() as session:
+                loaders = Loaders(session)
+                return await asyncio.gather(
+                    *(loaders.movies.load(movie_id) for movie_id in ids),
+                    loaders.movies.load(ids[0]),
+                    loaders.movies.load(999999),
+                )
+
+        with captured_selects() as naive:
+            asyncio.run(one_by_one())
+        with captured_selects() as statements:
+            results = asyncio.run(batched())
+        assert len(naive) == len(ids)
+        assert len(statements) == 1
+        assert " IN (" in statements[0]
+        assert [movie.title for movie in results[:len(ids)]] == [movie.title for movie in movies]
+        assert results[len(ids)] is results[0]
+        assert results[-1] is None
+
+    def test_results_are_cached_for_the_request(self, db_session, session_factory, unique_id, captured_selects):
+        """
+        Test una clave ya cargada (o precargada) no vuelve a consultarse.
+        """
+        movies = create_movies(db_session, unique_id, 2)
+
+        async def run():
+            async with session_factory() as session:
+                loaders = Loaders(session)
+                first = await loaders.movies.load(movies[0].id)
+                primed = (await session.execute(select(Movie).where(Movie.id == movies[1].id))).scalars().one()
+                loaders.movies.prime(primed)
+                with captured_selects() as statements:
+                    again = await loaders.movies.load(movies[0].id)
+                    second = await loaders.movies.load_many([movies[1].id])
+                return first, again, second, primed, statements
+
+        first, again, second, primed, statements = asyncio.run(run())
+        assert again is first
+        assert second == [primed]
+        assert statements == []
+
+    def test_soft_deleted_rows_are_not_loaded(self, client: TestClient, db_session, unique_id):
+        """
+        Test los cargadores respetan el borrado lógico, como las consultas que sustituyen.
+        """
+        movie = create_movies(db_session, unique_id, 1)[0]
+        assert client.get(f"/movies/{movie.id}").status_code == 200
+        movie.deleted_at = datetime.utcnow()
+        asyncio.run(db_session.commit())
+        assert client.get(f"/movies/{movie.id}").status_code == 404
+
+    def test_booking_details_batch_showtimes_and_movies(
+        self, client: TestClient, db_session, cliente_user, unique_id, captured_selects
+    ):
+        """
+        Test las reservas con horario y película cuestan una consulta por modelo, no dos por reserva.
+        """
+        movies = create_movies(db_session, unique_id, 2)
+        start = datetime(2031, 1, 1)
+        showtimes = [
+            Showtime(
+                movie_id=movie.id, theater=f"Sala loaders {unique_id}", start_time=start + timedelta(hours=3 * i),
+                end_time=start + timedelta(hours=3 * i + 2), available_seats=50, capacity=50, price=500,
+            )
+            for i, movie in enumerate([movies[0], movies[0], movies[1]])
+        ]
+        db_session.add_all(showtimes)
+        asyncio.run(db_session.commit())
+        bookings = [
+            Booking(user_id=cliente_user.id, showtime_id=showtime.id, seats_booked=1, total_price=500)
+            for showtime in [*showtimes, showtimes[0]]
+        ]
+        db_session.add_all(bookings)
+        showtimes[2].deleted_at = datetime.utcnow()
+        asyncio.run(db_session.commit())
+
+        with captured_selects() as statements:
+            response = client.get("/bookings/details")
+        assert response.status_code == 200
+        details = response.json()
+        assert [detail["id"] for detail in details] == [booking.id for booking in bookings]
+        assert [detail["movie"]["id"] for detail in details[:2]] == [movies[0].id, movies[0].id]
+        assert details[3]["showtime"]["id"] == showtimes[0].id
+        # El horario eliminado no se carga, ni su película
+        assert details[2]["showtime"] is None and details[2]["movie"] is None
+        assert len(statements) == 3
+        assert all(" IN (" in statement for statement in statements[1:])
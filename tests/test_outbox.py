@@ -0,0 +1,133 @@
+"""
+Tests para el outbox transaccional de reservas y su relay.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from models import Movie, OutboxEvent, Showtime
+from outbox import OutboxRelay, OutboxSink, QueueSink, prune_published
+
+
+class FailingSink(OutboxSink):
+    async def publish(self, events):
+        raise ConnectionError("broker down")
+
+
+@pytest.fixture
+def outbox_showtime(db_session, unique_id):
+    """
+    Fixture que crea un horario para reservas con eventos.
+    """
+    movie = Movie(title=f"Outbox Movie {unique_id}", duration=120)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+    start_time = datetime(2033, 1, 1, 20, 0)
+    showtime = Showtime(
+        movie_id=movie.id,
+        theater=f"Outbox Theater {unique_id}",
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        price=700
+    )
+    db_session.add(showtime)
+    asyncio.run(db_session.commit())
+    return showtime
+
+
+def drain(relay):
+    async def run():
+        total = 0
+        while published := await relay.drain_once():
+            total += published
+        return total
+    return asyncio.run(run())
+
+
+def pending_count(session_factory):
+    async def count():
+        async with session_factory() as session:
+            result = await session.execute(
+                select(func.count()).select_from(OutboxEvent).where(OutboxEvent.published_at.is_(None))
+            )
+            return result.scalar()
+    return asyncio.run(count())
+
+
+class TestOutbox:
+    """Tests para el outbox de reservas."""
+
+    def test_booking_lifecycle_events_in_order(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, outbox_showtime
+    ):
+        """
+        Test eventos de crear, actualizar y eliminar una reserva, en orden.
+        """
+        booking = client.post(
+            "/bookings/",
+            json={"user_id": cliente_user.id, "showtime_id": outbox_showtime.id, "seats_booked": 2}
+        ).json()
+        client.put(f"/bookings/{booking['id']}", json={"status": "confirmed"}, headers=gerente_headers)
+        client.delete(f"/bookings/{booking['id']}")
+
+        sink = QueueSink()
+        drain(OutboxRelay(session_factory, sink, batch_size=2))
+
+        events = []
+        while not sink.queue.empty():
+            event = sink.queue.get_nowait()
+            if event["aggregate_type"] == "booking" and event["aggregate_id"] == booking["id"]:
+                events.append(event)
+        assert [e["event_type"] for e in events] == ["booking.created", "booking.updated", "booking.deleted"]
+        assert events[1]["payload"]["status"] == "confirmed"
+        assert events[0]["payload"]["total_price"] == 1400
+        assert pending_count(session_factory) == 0
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert "outbox_events_published_total" in response.text
+
+    def test_failed_publish_keeps_events_pending(
+        self, client: TestClient, session_factory, cliente_user, outbox_showtime
+    ):
+        """
+        Test que un fallo del destino no pierda eventos.
+        """
+        client.post(
+            "/bookings/",
+            json={"user_id": cliente_user.id, "showtime_id": outbox_showtime.id, "seats_booked": 1}
+        )
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(OutboxRelay(session_factory, FailingSink()).drain_once())
+        assert pending_count(session_factory) >= 1
+
+        drain(OutboxRelay(session_factory, QueueSink()))
+        assert pending_count(session_factory) == 0
+
+    def test_prune_published_in_batches(self, client: TestClient, session_factory, cliente_user, outbox_showtime):
+        """
+        Test purgar eventos publicados por lotes.
+        """
+        for _ in range(3):
+            client.post(
+                "/bookings/",
+                json={"user_id": cliente_user.id, "showtime_id": outbox_showtime.id, "seats_booked": 1}
+            )
+        drain(OutboxRelay(session_factory, QueueSink()))
+
+        async def prune():
+            async with session_factory() as session:
+                return await prune_published(session, timedelta(0), batch_size=2)
+        pruned = asyncio.run(prune())
+
+        assert pruned >= 3
+        async def remaining():
+            async with session_factory() as session:
+                return (await session.execute(select(func.count()).select_from(OutboxEvent))).scalar()
+        assert asyncio.run(remaining()) == 0
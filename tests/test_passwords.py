@@ -0,0 +1,88 @@
+"""
+Tests para los perfiles de hashing y el rehash tras el login.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.future import select
+
+from auth import password_rehashes
+from models import User, UserRole
+from passwords import make_password_context, pwd_context
+
+
+def create_user(db_session, unique_id, password_hash: str) -> User:
+    user = User(
+        username=f"hash_user_{unique_id}",
+        email=f"hash_user_{unique_id}@example.com",
+        password_hash=password_hash,
+        role=UserRole.empleado
+    )
+    db_session.add(user)
+    asyncio.run(db_session.commit())
+    return user
+
+
+def stored_hash(session_factory, user_id: int) -> str:
+    async def load():
+        async with session_factory() as session:
+            result = await session.execute(select(User.password_hash).where(User.id == user_id))
+            return result.scalar()
+    return asyncio.run(load())
+
+
+class TestPasswordProfiles:
+    """Tests para la migración de hashes de contraseña."""
+
+    def test_outdated_hash_is_rehashed_after_login(self, client: TestClient, db_session, session_factory, unique_id):
+        """
+        Test un hash con otro coste se rehace tras un login correcto.
+        """
+        old_hash = make_password_context(bcrypt_rounds=4).hash("oldpass")
+        assert pwd_context.needs_update(old_hash)
+        user = create_user(db_session, unique_id, old_hash)
+        rehashes_before = password_rehashes.value()
+
+        response = client.post("/auth/token", data={"username": user.username, "password": "oldpass"})
+        assert response.status_code == 200
+
+        new_hash = stored_hash(session_factory, user.id)
+        assert new_hash != old_hash
+        assert not pwd_context.needs_update(new_hash)
+        assert pwd_context.verify("oldpass", new_hash)
+        assert password_rehashes.value() == rehashes_before + 1
+
+        # El login sigue funcionando con el hash nuevo
+        response = client.post("/auth/token", data={"username": user.username, "password": "oldpass"})
+        assert response.status_code == 200
+
+    def test_current_hash_is_kept(self, client: TestClient, db_session, session_factory, unique_id):
+        """
+        Test un hash con el perfil actual no se toca.
+        """
+        current_hash = pwd_context.hash("currentpass")
+        user = create_user(db_session, unique_id, current_hash)
+
+        response = client.post("/auth/token", data={"username": user.username, "password": "currentpass"})
+        assert response.status_code == 200
+        assert stored_hash(session_factory, user.id) == current_hash
+
+    def test_failed_login_does_not_rehash(self, client: TestClient, db_session, session_factory, unique_id):
+        """
+        Test un login fallido no rehace el hash.
+        """
+        old_hash = make_password_context(bcrypt_rounds=4).hash("oldpass")
+        user = create_user(db_session, unique_id, old_hash)
+
+        response = client.post("/auth/token", data={"username": user.username, "password": "wrong"})
+        assert response.status_code == 401
+        assert stored_hash(session_factory, user.id) == old_hash
+
+    def test_unknown_scheme(self):
+        """
+        Test un esquema desconocido.
+        """
+        with pytest.raises(ValueError):
+            make_password_context("md5")
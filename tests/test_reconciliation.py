@@ -0,0 +1,140 @@
+"""
+Tests para la reconciliación de asientos disponibles.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from models import Movie, Showtime
+from reconciliation import reconcile_seats
+
+
+@pytest.fixture
+def reconcile_showtime(db_session, unique_id):
+    """
+    Fixture que crea un horario de 40 asientos con su capacidad registrada.
+    """
+    movie = Movie(title=f"Reconcile Movie {unique_id}", duration=100)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+
+    start_time = datetime(2033, 2, 1, 18, 0)
+    showtime = Showtime(
+        movie_id=movie.id,
+        theater=f"Reconcile Theater {unique_id}",
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        available_seats=40,
+        capacity=40,
+        price=900
+    )
+    db_session.add(showtime)
+    asyncio.run(db_session.commit())
+    return showtime
+
+
+def get_seats(session_factory, showtime_id):
+    async def run():
+        async with session_factory() as session:
+            result = await session.execute(
+                select(Showtime.available_seats, Showtime.capacity).where(Showtime.id == showtime_id)
+            )
+            return tuple(result.first())
+    return asyncio.run(run())
+
+
+def reconcile(session_factory, **kwargs):
+    async def run():
+        async with session_factory() as session:
+            return await reconcile_seats(session, **kwargs)
+    return asyncio.run(run())
+
+
+class TestReconciliation:
+    """Tests para la reconciliación de asientos."""
+
+    def test_detects_and_fixes_drift(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, reconcile_showtime
+    ):
+        """
+        Test detectar y corregir un contador de asientos desviado.
+        """
+        showtime = reconcile_showtime
+        booking = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 4}
+        ).json()
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 2})
+        client.put(f"/bookings/{booking['id']}", json={"status": "cancelled"}, headers=gerente_headers)
+        assert get_seats(session_factory, showtime.id) == (38, 40)
+
+        report = reconcile(session_factory, batch_size=2)
+        assert showtime.id not in [d.showtime_id for d in report.drifts]
+
+        async def corrupt():
+            async with session_factory() as session:
+                await session.execute(update(Showtime).where(Showtime.id == showtime.id).values(available_seats=34))
+                await session.commit()
+        asyncio.run(corrupt())
+
+        report = reconcile(session_factory, batch_size=2)
+        [drift] = [d for d in report.drifts if d.showtime_id == showtime.id]
+        assert drift.available_seats == 34
+        assert drift.expected_available_seats == 38
+        assert drift.seats_sold == drift.expected_seats_sold == 2
+        assert report.fixed == 0
+        assert get_seats(session_factory, showtime.id) == (34, 40)
+
+        report = reconcile(session_factory, fix=True, batch_size=2)
+        assert report.fixed >= 1
+        assert get_seats(session_factory, showtime.id) == (38, 40)
+
+        report = reconcile(session_factory, batch_size=2)
+        assert showtime.id not in [d.showtime_id for d in report.drifts]
+
+    def test_incremental_only_checks_recent_changes(self, session_factory, reconcile_showtime):
+        """
+        Test la pasada incremental ignora horarios sin cambios recientes.
+        """
+        showtime = reconcile_showtime
+
+        async def corrupt():
+            async with session_factory() as session:
+                await session.execute(
+                    update(Showtime).where(Showtime.id == showtime.id)
+                    .values(available_seats=10, updated_at=datetime(2000, 1, 1))
+                )
+                await session.commit()
+        asyncio.run(corrupt())
+
+        report = reconcile(session_factory, since=datetime.utcnow() - timedelta(minutes=5))
+        assert showtime.id not in [d.showtime_id for d in report.drifts]
+
+        report = reconcile(session_factory, fix=True, since=datetime(1999, 1, 1))
+        assert showtime.id in [d.showtime_id for d in report.drifts]
+        assert get_seats(session_factory, showtime.id) == (40, 40)
+
+    def test_baselines_missing_capacity(self, client: TestClient, session_factory, cliente_user, reconcile_showtime):
+        """
+        Test horarios antiguos sin capacidad la toman del estado actual.
+        """
+        showtime = reconcile_showtime
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 5})
+
+        async def drop_capacity():
+            async with session_factory() as session:
+                await session.execute(update(Showtime).where(Showtime.id == showtime.id).values(capacity=None))
+                await session.commit()
+        asyncio.run(drop_capacity())
+
+        report = reconcile(session_factory)
+        assert showtime.id not in [d.showtime_id for d in report.drifts]
+        assert get_seats(session_factory, showtime.id) == (35, None)
+
+        report = reconcile(session_factory, fix=True)
+        assert report.baselined >= 1
+        assert get_seats(session_factory, showtime.id) == (35, 40)
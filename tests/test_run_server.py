@@ -0,0 +1,35 @@
+"""
+Tests para la configuración del servidor de producción.
+"""
+
+import pytest
+
+from run_server import pool_settings, worker_count
+
+
+class TestRunServer:
+    """Tests para el reparto de workers y conexiones."""
+
+    def test_pool_settings_respect_budget(self):
+        """
+        Test el pool de todos los workers juntos no supera el presupuesto.
+        """
+        for budget, workers in [(80, 8), (100, 3), (20, 16), (7, 7)]:
+            settings = pool_settings(budget, workers)
+            per_worker = int(settings["DB_POOL_SIZE"]) + int(settings["DB_MAX_OVERFLOW"])
+            assert int(settings["DB_POOL_SIZE"]) >= 1
+            assert per_worker * workers <= budget
+
+    def test_pool_settings_budget_too_small(self):
+        """
+        Test un presupuesto menor que el número de workers.
+        """
+        with pytest.raises(ValueError):
+            pool_settings(4, 8)
+
+    def test_worker_count(self):
+        """
+        Test WEB_CONCURRENCY explícito o un worker por núcleo.
+        """
+        assert worker_count(3) == 3
+        assert worker_count(0) >= 1
@@ -0,0 +1,234 @@
+"""
+Tests para la programación automática y la detección de solapamientos.
+"""
+
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models import Movie, Showtime
+from scheduling import TheaterSchedule, find_overlaps, generate_schedule
+
+
+@pytest.fixture
+def schedule_movie(db_session, unique_id):
+    """
+    Fixture que crea una película de 100 minutos con un horario existente.
+    """
+    movie = Movie(title=f"Schedule Movie {unique_id}", duration=100)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+
+    start_time = datetime(2031, 3, 1, 18, 0)
+    showtime = Showtime(
+        movie_id=movie.id,
+        theater=f"Schedule Theater {unique_id}",
+        start_time=start_time,
+        end_time=start_time + timedelta(minutes=100),
+        price=800
+    )
+    db_session.add(showtime)
+    asyncio.run(db_session.commit())
+    return movie, showtime
+
+
+class TestSchedulingEngine:
+    """Tests para el motor de programación."""
+
+    def test_theater_schedule_blocking_end(self):
+        """
+        Test detectar choques con intervalos ocupados.
+        """
+        base = datetime(2031, 1, 1, 10, 0)
+        schedule = TheaterSchedule([(base, base + timedelta(hours=2))])
+
+        assert schedule.blocking_end(base + timedelta(hours=1), base + timedelta(hours=3)) == base + timedelta(hours=2)
+        assert schedule.blocking_end(base - timedelta(hours=1), base + timedelta(minutes=1)) == base + timedelta(hours=2)
+        assert schedule.blocking_end(base + timedelta(hours=2), base + timedelta(hours=4)) is None
+        assert schedule.blocking_end(base - timedelta(hours=2), base) is None
+
+    def test_find_overlaps(self):
+        """
+        Test barrido de solapamientos por sala.
+        """
+        base = datetime(2031, 1, 1, 10, 0)
+        showtimes = [
+            ("Sala 1", base, base + timedelta(hours=3)),
+            ("Sala 1", base + timedelta(hours=1), base + timedelta(hours=2)),
+            ("Sala 1", base + timedelta(hours=2, minutes=30), base + timedelta(hours=4)),
+            ("Sala 2", base + timedelta(hours=1), base + timedelta(hours=2)),
+        ]
+
+        overlaps = find_overlaps(showtimes)
+
+        assert overlaps == [showtimes[1], showtimes[2]]
+
+    def test_generate_schedule_respects_buffers_and_existing(self):
+        """
+        Test generar horarios sin solapamientos y con tiempo de limpieza.
+        """
+        start = date(2031, 1, 1)
+        existing = {"Sala 1": TheaterSchedule([(datetime(2031, 1, 1, 14, 0), datetime(2031, 1, 1, 16, 0))])}
+
+        generated = generate_schedule(
+            [(1, 90), (2, 120)], ["Sala 1", "Sala 2"], start, 2,
+            time(10, 0), time(23, 0), 15, existing
+        )
+
+        assert find_overlaps((t, s, e) for _, t, s, e in generated) == []
+        sala_1 = sorted((s, e) for _, t, s, e in generated if t == "Sala 1" and s.date() == start)
+        assert sala_1[0] == (datetime(2031, 1, 1, 10, 0), datetime(2031, 1, 1, 11, 30))
+        assert sala_1[1] == (datetime(2031, 1, 1, 11, 45), datetime(2031, 1, 1, 13, 45))
+        assert sala_1[2][0] == datetime(2031, 1, 1, 16, 15)
+        assert all(e <= datetime(2031, 1, 2, 23, 0) for _, _, _, e in generated)
+
+    def test_generate_schedule_rejects_non_advancing_inputs(self):
+        """
+        Test limpieza negativa o duración cero se rechazan en lugar de no terminar nunca.
+        """
+        with pytest.raises(ValueError):
+            generate_schedule([(1, 90)], ["Sala 1"], date(2031, 1, 1), 1, time(10, 0), time(23, 0), -120)
+        with pytest.raises(ValueError):
+            generate_schedule([(1, 0)], ["Sala 1"], date(2031, 1, 1), 1, time(10, 0), time(23, 0), 0)
+
+
+class TestShowtimeOverlaps:
+    """Tests para los endpoints de horarios con solapamientos."""
+
+    def test_create_showtime_overlap_rejected(self, client: TestClient, gerente_headers, schedule_movie):
+        """
+        Test crear un horario solapado en la misma sala.
+        """
+        movie, showtime = schedule_movie
+        data = {
+            "movie_id": movie.id,
+            "theater": showtime.theater,
+            "start_time": (showtime.start_time + timedelta(minutes=30)).isoformat(),
+            "end_time": (showtime.end_time + timedelta(minutes=30)).isoformat(),
+            "price": 800
+        }
+
+        response = client.post("/showtimes/", json=data, headers=gerente_headers)
+        assert response.status_code == 400
+        assert "overlaps" in response.json()["detail"]
+
+        data["start_time"] = showtime.end_time.isoformat()
+        data["end_time"] = (showtime.end_time + timedelta(minutes=100)).isoformat()
+        response = client.post("/showtimes/", json=data, headers=gerente_headers)
+        assert response.status_code == 200
+
+    def test_overlap_with_earlier_long_showtime(self, client: TestClient, gerente_headers, db_session, schedule_movie):
+        """
+        Test un horario largo que empieza antes que otro más corto sigue bloqueando su franja.
+        """
+        movie, showtime = schedule_movie
+        # Filas solapadas de antes de la validación: 10:00-17:00 y 11:00-12:00
+        day = showtime.start_time.replace(hour=10)
+        db_session.add_all([
+            Showtime(movie_id=movie.id, theater=showtime.theater, start_time=start, end_time=end, price=800)
+            for start, end in [(day, day + timedelta(hours=7)), (day + timedelta(hours=1), day + timedelta(hours=2))]
+        ])
+        asyncio.run(db_session.commit())
+
+        data = {
+            "movie_id": movie.id, "theater": showtime.theater, "price": 800,
+            "start_time": (day + timedelta(hours=3)).isoformat(), "end_time": (day + timedelta(hours=4)).isoformat(),
+        }
+        response = client.post("/showtimes/", json=data, headers=gerente_headers)
+        assert response.status_code == 400
+
+    def test_showtime_writes_require_staff(self, client: TestClient, cliente_headers, schedule_movie):
+        """
+        Test un cliente no puede crear, actualizar ni eliminar horarios.
+        """
+        movie, showtime = schedule_movie
+        data = {
+            "movie_id": movie.id, "theater": f"{showtime.theater} cliente", "price": 800,
+            "start_time": showtime.start_time.isoformat(), "end_time": showtime.end_time.isoformat(),
+        }
+        assert client.post("/showtimes/", json=data, headers=cliente_headers).status_code == 403
+        assert client.put(f"/showtimes/{showtime.id}", json={"price": 1}, headers=cliente_headers).status_code == 403
+        assert client.delete(f"/showtimes/{showtime.id}", headers=cliente_headers).status_code == 403
+
+    def test_update_showtime_overlap_rejected(self, client: TestClient, gerente_headers, schedule_movie):
+        """
+        Test mover un horario encima de otro de la misma sala.
+        """
+        movie, showtime = schedule_movie
+        data = {
+            "movie_id": movie.id,
+            "theater": showtime.theater,
+            "start_time": (showtime.start_time - timedelta(hours=3)).isoformat(),
+            "end_time": (showtime.start_time - timedelta(hours=1)).isoformat(),
+            "price": 800
+        }
+        created = client.post("/showtimes/", json=data, headers=gerente_headers).json()
+
+        response = client.put(
+            f"/showtimes/{created['id']}",
+            json={"end_time": (showtime.start_time + timedelta(minutes=1)).isoformat()},
+            headers=gerente_headers
+        )
+        assert response.status_code == 400
+
+        response = client.put(
+            f"/showtimes/{created['id']}", json={"price": 900}, headers=gerente_headers
+        )
+        assert response.status_code == 200
+
+    def test_schedule_showtimes(self, client: TestClient, gerente_headers, schedule_movie):
+        """
+        Test programar automáticamente una sala alrededor de un horario existente.
+        """
+        movie, showtime = schedule_movie
+        request = {
+            "movie_ids": [movie.id],
+            "theaters": [showtime.theater],
+            "start_date": "2031-03-01",
+            "days": 1,
+            "opening_time": "14:00:00",
+            "closing_time": "22:00:00",
+            "cleaning_minutes": 20,
+            "price": 800,
+            "dry_run": True
+        }
+
+        response = client.post("/showtimes/schedule", json=request, headers=gerente_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 0
+        starts = [item["start_time"] for item in data["showtimes"]]
+        assert starts == ["2031-03-01T14:00:00", "2031-03-01T16:00:00", "2031-03-01T20:00:00"]
+
+        request["dry_run"] = False
+        response = client.post("/showtimes/schedule", json=request, headers=gerente_headers)
+        assert response.json()["created"] == 3
+
+        response = client.post("/showtimes/schedule", json=request, headers=gerente_headers)
+        assert response.json()["created"] == 0
+
+    def test_schedule_validates_request(self, client: TestClient, gerente_headers, cliente_headers, db_session, unique_id):
+        """
+        Test la programación valida los parámetros, las duraciones y el rol.
+        """
+        movie = Movie(title=f"Zero Movie {unique_id}", duration=0)
+        db_session.add(movie)
+        asyncio.run(db_session.commit())
+        request = {
+            "movie_ids": [movie.id], "theaters": [f"Sala zero {unique_id}"], "start_date": "2031-04-01",
+            "days": 1, "cleaning_minutes": 0, "price": 800, "dry_run": True,
+        }
+
+        response = client.post("/showtimes/schedule", json=request, headers=gerente_headers)
+        assert response.status_code == 400
+        invalid = [
+            ("cleaning_minutes", -5), ("days", 0), ("days", 10000), ("available_seats", 0), ("price", 0),
+            ("movie_ids", [movie.id] * 101), ("theaters", [f"Sala {i}" for i in range(51)]),
+        ]
+        for field, value in invalid:
+            response = client.post("/showtimes/schedule", json={**request, field: value}, headers=gerente_headers)
+            assert response.status_code == 422, field
+        response = client.post("/showtimes/schedule", json=request, headers=cliente_headers)
+        assert response.status_code == 403
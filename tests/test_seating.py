@@ -0,0 +1,196 @@
+"""
+Tests para los contadores de asientos y los estados de las reservas.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from models import Booking, BookingStatus, Movie, Showtime
+from routers import bookings
+from seating import backfill_seat_counters, delete_booking_row, transition_booking
+
+
+@pytest.fixture
+def seating_showtime(db_session, unique_id):
+    """
+    Fixture que crea un horario de 10 asientos con su capacidad registrada.
+    """
+    movie = Movie(title=f"Seating Movie {unique_id}", duration=90)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+
+    start_time = datetime(2033, 6, 1, 16, 0)
+    showtime = Showtime(
+        movie_id=movie.id,
+        theater=f"Seating Theater {unique_id}",
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        available_seats=10,
+        capacity=10,
+        price=500
+    )
+    db_session.add(showtime)
+    asyncio.run(db_session.commit())
+    return showtime
+
+
+def get_counters(session_factory, showtime_id):
+    async def run():
+        async with session_factory() as session:
+            result = await session.execute(
+                select(Showtime.available_seats, Showtime.seats_sold, Showtime.capacity)
+                .where(Showtime.id == showtime_id)
+            )
+            return tuple(result.first())
+    return asyncio.run(run())
+
+
+class TestSeating:
+    """Tests para contadores de asientos."""
+
+    def test_booking_lifecycle_updates_counters(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, seating_showtime
+    ):
+        """
+        Test reservar, confirmar, cancelar y eliminar ajustan los contadores.
+        """
+        showtime = seating_showtime
+        booking = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 3}
+        ).json()
+        assert booking["status"] == "pending"
+        assert get_counters(session_factory, showtime.id) == (7, 3, 10)
+
+        response = client.put(f"/bookings/{booking['id']}", json={"status": "confirmed"}, headers=gerente_headers)
+        assert response.status_code == 200
+        assert get_counters(session_factory, showtime.id) == (7, 3, 10)
+
+        response = client.put(f"/bookings/{booking['id']}", json={"status": "cancelled"}, headers=gerente_headers)
+        assert response.status_code == 200
+        assert get_counters(session_factory, showtime.id) == (10, 0, 10)
+
+        # Eliminar una reserva cancelada no devuelve los asientos dos veces
+        client.delete(f"/bookings/{booking['id']}")
+        assert get_counters(session_factory, showtime.id) == (10, 0, 10)
+
+        response = client.get(f"/showtimes/{showtime.id}")
+        assert (response.json()["capacity"], response.json()["seats_sold"]) == (10, 0)
+
+    def test_invalid_transitions_rejected(
+        self, client: TestClient, gerente_headers, cliente_user, seating_showtime
+    ):
+        """
+        Test no se puede volver a pending ni reactivar una reserva cancelada.
+        """
+        booking = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": seating_showtime.id, "seats_booked": 1}
+        ).json()
+        client.put(f"/bookings/{booking['id']}", json={"status": "confirmed"}, headers=gerente_headers)
+
+        response = client.put(f"/bookings/{booking['id']}", json={"status": "pending"}, headers=gerente_headers)
+        assert response.status_code == 400
+
+        client.put(f"/bookings/{booking['id']}", json={"status": "cancelled"}, headers=gerente_headers)
+        response = client.put(f"/bookings/{booking['id']}", json={"status": "confirmed"}, headers=gerente_headers)
+        assert response.status_code == 400
+        assert "cancelled" in response.json()["detail"]
+
+    def test_concurrent_cancel_and_delete_release_seats_once(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, seating_showtime
+    ):
+        """
+        Test dos transacciones que leyeron la reserva activa: solo la primera devuelve los asientos.
+        """
+        booking_id = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": seating_showtime.id, "seats_booked": 2}
+        ).json()["id"]
+
+        async def run():
+            async with session_factory() as first, session_factory() as second:
+                stale = [(await s.execute(select(Booking).where(Booking.id == booking_id))).scalars().one()
+                         for s in (first, second)]
+                won = await transition_booking(first, stale[0], BookingStatus.cancelled)
+                await first.commit()
+                lost = await transition_booking(second, stale[1], BookingStatus.cancelled)
+                deleted = await delete_booking_row(second, booking_id)
+                await second.commit()
+                again = await delete_booking_row(second, booking_id)
+                return won, lost, deleted, again
+
+        assert asyncio.run(run()) == (True, False, False, None)
+
+    def test_update_loses_race_with_conflict(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, seating_showtime, monkeypatch
+    ):
+        """
+        Test si el estado cambió tras la lectura, PUT responde 409 sin devolver asientos.
+        """
+        booking_id = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": seating_showtime.id, "seats_booked": 2}
+        ).json()["id"]
+        transition = bookings.transition_booking
+
+        async def raced(db, booking, new):
+            # Otra transacción confirmó la reserva entre la lectura y el UPDATE
+            await db.execute(
+                update(Booking).where(Booking.id == booking.id).values(status=BookingStatus.confirmed)
+                .execution_options(synchronize_session=False)
+            )
+            return await transition(db, booking, new)
+        monkeypatch.setattr(bookings, "transition_booking", raced)
+
+        response = client.put(f"/bookings/{booking_id}", json={"status": "cancelled"}, headers=gerente_headers)
+        assert response.status_code == 409
+        assert get_counters(session_factory, seating_showtime.id) == (8, 2, 10)
+
+    def test_cannot_oversell(self, client: TestClient, session_factory, cliente_user, seating_showtime):
+        """
+        Test la reserva que excede los asientos libres no descuenta nada.
+        """
+        showtime = seating_showtime
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 8})
+        response = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 3}
+        )
+        assert response.status_code == 400
+        assert get_counters(session_factory, showtime.id) == (2, 8, 10)
+
+    def test_update_capacity(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, seating_showtime
+    ):
+        """
+        Test cambiar la capacidad recalcula los asientos disponibles.
+        """
+        showtime = seating_showtime
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 4})
+
+        response = client.put(f"/showtimes/{showtime.id}", json={"capacity": 20}, headers=gerente_headers)
+        assert response.status_code == 200
+        assert (response.json()["available_seats"], response.json()["seats_sold"]) == (16, 4)
+
+        response = client.put(f"/showtimes/{showtime.id}", json={"capacity": 3}, headers=gerente_headers)
+        assert response.status_code == 400
+        assert get_counters(session_factory, showtime.id) == (16, 4, 20)
+
+    def test_backfill_seat_counters(self, client: TestClient, session_factory, cliente_user, seating_showtime):
+        """
+        Test el backfill rellena seats_sold y la capacidad de horarios antiguos.
+        """
+        showtime = seating_showtime
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 2})
+
+        async def run():
+            async with session_factory() as session:
+                await session.execute(
+                    update(Showtime).where(Showtime.id == showtime.id).values(seats_sold=0, capacity=None)
+                )
+                await session.commit()
+                return await backfill_seat_counters(session, batch_size=3)
+        assert asyncio.run(run()) >= 1
+
+        assert get_counters(session_factory, showtime.id) == (8, 2, 10)
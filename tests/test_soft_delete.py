@@ -0,0 +1,167 @@
+"""
+Tests para el borrado lógico de películas y horarios.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from models import Booking, Movie, MovieSales, Showtime
+from soft_delete import purge_deleted
+
+
+@pytest.fixture
+def soft_delete_movie(db_session, unique_id):
+    """
+    Fixture que crea una película con dos horarios.
+    """
+    movie = Movie(title=f"Soft Delete Movie {unique_id}", duration=100)
+    db_session.add(movie)
+    asyncio.run(db_session.commit())
+
+    showtimes = []
+    for hours in (0, 3):
+        start_time = datetime(2034, 3, 1, 12, 0) + timedelta(hours=hours)
+        showtime = Showtime(
+            movie_id=movie.id,
+            theater=f"Soft Delete Theater {unique_id}",
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=2),
+            available_seats=20,
+            capacity=20,
+            price=600
+        )
+        db_session.add(showtime)
+        showtimes.append(showtime)
+    asyncio.run(db_session.commit())
+    return movie, showtimes
+
+
+def run(session_factory, fn):
+    async def wrapper():
+        async with session_factory() as session:
+            return await fn(session)
+    return asyncio.run(wrapper())
+
+
+def deleted_at(session_factory, model, row_id):
+    async def fn(session):
+        result = await session.execute(
+            select(model.deleted_at).where(model.id == row_id).execution_options(include_deleted=True)
+        )
+        return result.first()
+    return run(session_factory, fn)
+
+
+class TestSoftDelete:
+    """Tests para el borrado lógico."""
+
+    def test_delete_showtime_keeps_row_and_bookings(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, soft_delete_movie
+    ):
+        """
+        Test eliminar un horario con reservas lo oculta sin borrarlo.
+        """
+        _, (showtime, _) = soft_delete_movie
+        booking = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 2}
+        ).json()
+
+        response = client.delete(f"/showtimes/{showtime.id}", headers=gerente_headers)
+        assert response.status_code == 200
+
+        assert client.get(f"/showtimes/{showtime.id}").status_code == 404
+        response = client.get("/showtimes/", params={"limit": 100000})
+        assert showtime.id not in [s["id"] for s in response.json()]
+        assert deleted_at(session_factory, Showtime, showtime.id)[0] is not None
+
+        # La reserva sigue existiendo, pero ya no se puede reservar en el horario
+        assert client.get(f"/bookings/{booking['id']}").status_code == 200
+        response = client.post(
+            "/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime.id, "seats_booked": 1}
+        )
+        assert response.status_code == 404
+
+    def test_delete_movie_hides_its_showtimes(
+        self, client: TestClient, session_factory, gerente_headers, soft_delete_movie
+    ):
+        """
+        Test eliminar una película oculta también sus horarios.
+        """
+        movie, showtimes = soft_delete_movie
+
+        response = client.delete(f"/movies/{movie.id}", headers=gerente_headers)
+        assert response.status_code == 200
+
+        assert client.get(f"/movies/{movie.id}").status_code == 404
+        for showtime in showtimes:
+            assert client.get(f"/showtimes/{showtime.id}").status_code == 404
+            assert deleted_at(session_factory, Showtime, showtime.id)[0] is not None
+
+    def test_cancel_after_delete_reverts_sales(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, soft_delete_movie
+    ):
+        """
+        Test cancelar o eliminar reservas de un horario eliminado devuelve asientos y descuenta ventas.
+        """
+        movie, (showtime, other) = soft_delete_movie
+        cancelled, deleted = [
+            client.post(
+                "/bookings/", json={"user_id": cliente_user.id, "showtime_id": s.id, "seats_booked": 2}
+            ).json()
+            for s in (showtime, other)
+        ]
+        assert client.delete(f"/showtimes/{showtime.id}", headers=gerente_headers).status_code == 200
+        assert client.delete(f"/movies/{movie.id}", headers=gerente_headers).status_code == 200
+
+        response = client.put(f"/bookings/{cancelled['id']}", headers=gerente_headers, json={"status": "cancelled"})
+        assert response.status_code == 200
+        assert client.delete(f"/bookings/{deleted['id']}").status_code == 200
+
+        async def fn(session):
+            sales = await session.execute(
+                select(MovieSales.revenue, MovieSales.seats_sold, MovieSales.bookings_count)
+                .where(MovieSales.movie_id == movie.id)
+            )
+            seats = await session.execute(
+                select(Showtime.seats_sold, Showtime.available_seats)
+                .where(Showtime.movie_id == movie.id).execution_options(include_deleted=True)
+            )
+            return sales.one(), seats.all()
+        sales, seats = run(session_factory, fn)
+        assert tuple(sales) == (0, 0, 0)
+        assert [tuple(row) for row in seats] == [(0, 20), (0, 20)]
+
+    def test_purge_removes_only_unreferenced_rows(
+        self, client: TestClient, session_factory, gerente_headers, cliente_user, soft_delete_movie
+    ):
+        """
+        Test la purga elimina horarios sin reservas y conserva lo referenciado.
+        """
+        movie, (booked, empty) = soft_delete_movie
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": booked.id, "seats_booked": 1})
+        client.delete(f"/movies/{movie.id}", headers=gerente_headers)
+
+        async def backdate(session):
+            for model in (Movie, Showtime):
+                await session.execute(
+                    update(model).where(model.deleted_at.is_not(None)).values(deleted_at=datetime(2000, 1, 1))
+                )
+            await session.commit()
+        run(session_factory, backdate)
+
+        purged = run(session_factory, lambda s: purge_deleted(s, timedelta(days=30), batch_size=1))
+        assert purged["showtimes"] >= 1
+
+        assert deleted_at(session_factory, Showtime, empty.id) is None
+        assert deleted_at(session_factory, Showtime, booked.id) is not None
+        assert deleted_at(session_factory, Movie, movie.id) is not None
+
+        async def bookings(session):
+            result = await session.execute(select(Booking.id).where(Booking.showtime_id == booked.id))
+            return result.scalars().all()
+        assert len(run(session_factory, bookings)) == 1
@@ -0,0 +1,153 @@
+"""
+Tests para los límites de intentos de login.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import auth
+from models import User, UserRole
+from routers import auth_router
+import throttling
+from throttling import LoginThrottle, MemoryBackend, RedisBackend, login_rejections
+
+
+@pytest.fixture
+def throttle(monkeypatch):
+    """
+    Fixture que sustituye el límite de logins por uno nuevo con límites bajos,
+    con el reloj parado en mitad de una ventana.
+    """
+    monkeypatch.setattr(throttling, "time", SimpleNamespace(time=lambda: 600030.0))
+    throttle = LoginThrottle(
+        MemoryBackend(), max_failures_per_ip=6, ip_window=60, max_failures_per_user=3, user_window=60
+    )
+    monkeypatch.setattr(auth_router, "login_throttle", throttle)
+    return throttle
+
+
+@pytest.fixture
+def verify_calls(monkeypatch):
+    """
+    Fixture que cuenta las verificaciones de bcrypt.
+    """
+    calls = []
+    original = auth.verify_password
+
+    def counting_verify(plain_password, hashed_password):
+        calls.append(hashed_password)
+        return original(plain_password, hashed_password)
+    monkeypatch.setattr(auth, "verify_password", counting_verify)
+    return calls
+
+
+def login(client, username, password="wrong"):
+    return client.post("/auth/token", data={"username": username, "password": password})
+
+
+class TestLoginThrottling:
+    """Tests para la protección contra fuerza bruta."""
+
+    def test_memory_backend_sliding_window(self, monkeypatch):
+        """
+        Test la ventana cuenta los eventos y se reinicia.
+        """
+        monkeypatch.setattr(throttling, "time", SimpleNamespace(time=lambda: 600030.0))
+        backend = MemoryBackend()
+
+        async def run():
+            for _ in range(3):
+                await backend.hit("k", 60)
+            counted = await backend.count("k", 60)
+            await backend.reset("k", 60)
+            return counted, await backend.count("k", 60)
+        assert asyncio.run(run()) == (3, 0)
+
+    def test_memory_backend_bounds_keys(self, monkeypatch):
+        """
+        Test al superar `max_keys` se descarta la clave usada hace más tiempo, aunque siga viva.
+        """
+        monkeypatch.setattr(throttling, "time", SimpleNamespace(time=lambda: 600030.0))
+        backend = MemoryBackend(max_keys=2)
+
+        async def run():
+            for key in ["a", "b", "c", "b", "d"]:
+                await backend.hit(key, 60)
+            return [await backend.count(key, 60) for key in "abcd"]
+        assert asyncio.run(run()) == [0, 2, 0, 1]
+        assert len(backend._buckets) == 2
+
+    def test_redis_reset_deletes_exact_keys(self, monkeypatch):
+        """
+        Test el reinicio en Redis borra las claves de sus dos ventanas, sin patrones ni SCAN.
+        """
+        class FakeRedis:
+            def __init__(self):
+                self.deleted = []
+
+            async def delete(self, *keys):
+                self.deleted.extend(keys)
+
+        backend = RedisBackend.__new__(RedisBackend)
+        backend.client = FakeRedis()
+        backend.prefix = "login-throttle"
+        monkeypatch.setattr(throttling, "time", SimpleNamespace(time=lambda: 600.0))
+        asyncio.run(backend.reset("user:a*[b]?", 60))
+        assert backend.client.deleted == ["login-throttle:user:a*[b]?:9", "login-throttle:user:a*[b]?:10"]
+
+    def test_username_locked_without_bcrypt(self, client: TestClient, throttle, verify_calls, unique_id):
+        """
+        Test tras varios fallos el usuario se rechaza sin verificar la contraseña.
+        """
+        username = f"victim_{unique_id}"
+        for _ in range(3):
+            assert login(client, username).status_code == 401
+        assert len(verify_calls) == 3
+
+        rejected_before = login_rejections.value(reason="username")
+        response = login(client, username)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "60"
+        assert len(verify_calls) == 3
+        assert login_rejections.value(reason="username") == rejected_before + 1
+
+    def test_ip_limit_across_usernames(self, client: TestClient, throttle, verify_calls, unique_id):
+        """
+        Test el límite por IP se aplica aunque se roten los usuarios.
+        """
+        for i in range(6):
+            assert login(client, f"spray_{unique_id}_{i}").status_code == 401
+        response = login(client, f"spray_{unique_id}_last")
+        assert response.status_code == 429
+        assert len(verify_calls) == 6
+
+    def test_unknown_user_runs_dummy_verify(self, client: TestClient, throttle, verify_calls, unique_id):
+        """
+        Test un usuario inexistente también verifica contra un hash (mismo coste).
+        """
+        assert login(client, f"ghost_{unique_id}").status_code == 401
+        assert verify_calls == [auth._dummy_password_hash()]
+
+    def test_success_resets_username_failures(
+        self, client: TestClient, throttle, db_session, unique_id
+    ):
+        """
+        Test un login correcto reinicia los fallos del usuario.
+        """
+        user = User(
+            username=f"returning_{unique_id}",
+            email=f"returning_{unique_id}@example.com",
+            password_hash=auth.get_password_hash("secret"),
+            role=UserRole.cliente
+        )
+        db_session.add(user)
+        asyncio.run(db_session.commit())
+
+        for _ in range(2):
+            login(client, user.username)
+        assert login(client, user.username, "secret").status_code == 200
+        for _ in range(2):
+            assert login(client, user.username).status_code == 401
@@ -0,0 +1,112 @@
+"""
+Tests para tokens de refresco, rotación y revocación.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from auth import ALGORITHM, SECRET_KEY, get_password_hash
+from models import User, UserRole
+from tokens import ACCESS_TOKEN_EXPIRE_MINUTES, TokenDenylist, refresh_reuse_detected
+
+
+@pytest.fixture
+def gerente_login(client: TestClient, db_session, unique_id):
+    """
+    Fixture que crea un gerente y devuelve la respuesta de su login.
+    """
+    user = User(
+        username=f"token_gerente_{unique_id}",
+        email=f"token_gerente_{unique_id}@example.com",
+        password_hash=get_password_hash("tokenpass"),
+        role=UserRole.gerente
+    )
+    db_session.add(user)
+    asyncio.run(db_session.commit())
+    response = client.post("/auth/token", data={"username": user.username, "password": "tokenpass"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+class TestTokens:
+    """Tests para el flujo de tokens."""
+
+    def test_login_returns_short_lived_access_and_refresh_token(self, gerente_login):
+        """
+        Test el login devuelve un token de acceso corto con jti y un token de refresco.
+        """
+        payload = jwt.decode(gerente_login["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+        assert payload["jti"]
+        assert payload["fam"]
+        lifetime = payload["exp"] - datetime.utcnow().timestamp()
+        assert 0 < lifetime <= ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 5
+        assert gerente_login["refresh_token"]
+        assert gerente_login["expires_in"] == int(ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+    def test_refresh_rotates_token(self, client: TestClient, gerente_login):
+        """
+        Test canjear el token de refresco devuelve uno nuevo y tokens válidos.
+        """
+        response = client.post("/auth/refresh", json={"refresh_token": gerente_login["refresh_token"]})
+        assert response.status_code == 200
+        rotated = response.json()
+        assert rotated["refresh_token"] != gerente_login["refresh_token"]
+        assert client.get("/analytics/daily", headers=bearer(rotated)).status_code == 200
+
+        response = client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+        assert response.status_code == 200
+
+    def test_reuse_revokes_family(self, client: TestClient, gerente_login):
+        """
+        Test reutilizar un token rotado revoca toda la sesión.
+        """
+        rotated = client.post("/auth/refresh", json={"refresh_token": gerente_login["refresh_token"]}).json()
+        reuses_before = refresh_reuse_detected.value()
+
+        response = client.post("/auth/refresh", json={"refresh_token": gerente_login["refresh_token"]})
+        assert response.status_code == 401
+        assert refresh_reuse_detected.value() == reuses_before + 1
+
+        # El token legítimo de la misma familia también queda revocado
+        response = client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+        assert response.status_code == 401
+        assert client.get("/analytics/daily", headers=bearer(rotated)).status_code == 401
+
+    def test_invalid_refresh_token(self, client: TestClient):
+        """
+        Test un token de refresco desconocido.
+        """
+        response = client.post("/auth/refresh", json={"refresh_token": "not-a-token"})
+        assert response.status_code == 401
+
+    def test_logout_revokes_access_token(self, client: TestClient, session_factory, gerente_login):
+        """
+        Test cerrar sesión revoca el token de acceso y el de refresco.
+        """
+        assert client.get("/analytics/daily", headers=bearer(gerente_login)).status_code == 200
+
+        response = client.post("/auth/logout", headers=bearer(gerente_login))
+        assert response.status_code == 200
+
+        assert client.get("/analytics/daily", headers=bearer(gerente_login)).status_code == 401
+        response = client.post("/auth/refresh", json={"refresh_token": gerente_login["refresh_token"]})
+        assert response.status_code == 401
+
+        # Otro proceso recibe la revocación al sincronizar
+        payload = jwt.decode(gerente_login["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+        denylist = TokenDenylist()
+
+        async def sync():
+            async with session_factory() as session:
+                await denylist.sync(session)
+        asyncio.run(sync())
+        assert denylist.is_revoked(payload)
+        assert payload["jti"] in denylist
@@ -2,12 +2,18 @@
 Tests para endpoints de gestión de usuarios.
 """
 
+import asyncio
+
 import pytest
 import pytest_asyncio
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
 
 from auth import get_password_hash
+from database import Base, get_db
 from models import User
 
 
@@ -197,4 +203,156 @@ class TestUsers:
         response = client.delete("/users/999")
 
         assert response.status_code == 404
-        assert "User not found" in response.json()["detail"]
\ No newline at end of file
+        assert "User not found" in response.json()["detail"]
+
+class TestBulkUsers:
+    """Tests para el alta masiva de usuarios."""
+
+    def test_bulk_create(self, client, gerente_headers, unique_id):
+        """
+        Test alta masiva con conflictos por registro.
+        """
+        records = [
+            {"username": f"bulk{i}_{unique_id}", "email": f"bulk{i}_{unique_id}@example.com", "password": f"pass{i}"}
+            for i in range(4)
+        ]
+        records.append({"username": f"bulk0_{unique_id}", "email": f"other_{unique_id}@example.com", "password": "x"})
+        records.append({"username": f"bad_{unique_id}", "email": "not-an-email", "password": "x"})
+
+        response = client.post("/users/bulk", json=records, headers=gerente_headers)
+        assert response.status_code == 200
+        report = response.json()
+        assert report["inserted"] == 4
+        assert report["failed"] == 2
+        errors = {error["row"]: error["error"] for error in report["errors"]}
+        assert errors[4] == "Duplicate username in request"
+        assert "email" in errors[5]
+
+        # Los usuarios creados pueden iniciar sesión
+        response = client.post("/auth/token", data={"username": f"bulk2_{unique_id}", "password": "pass2"})
+        assert response.status_code == 200
+
+        # Repetir el alta: todos chocan con los ya registrados
+        response = client.post("/users/bulk", json=records[:4], headers=gerente_headers)
+        report = response.json()
+        assert report["inserted"] == 0
+        assert {error["error"] for error in report["errors"]} == {"Username already registered"}
+
+    def test_bulk_create_retries_copy_conflict(self, client, gerente_headers, monkeypatch, unique_id):
+        """
+        Test el error sin envolver del COPY de asyncpg también reintenta el bloque.
+        """
+        import imports
+        from asyncpg.exceptions import UniqueViolationError
+
+        insert_rows = imports._insert_rows
+        calls = []
+
+        async def racing_insert(session, model, rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                # Otro alta ocupa el primer username antes del COPY
+                await insert_rows(session, model, [dict(rows[0], email=f"racer_{unique_id}@example.com")])
+                await session.commit()
+                raise UniqueViolationError("duplicate key value violates unique constraint")
+            await insert_rows(session, model, rows)
+
+        monkeypatch.setattr(imports, "_insert_rows", racing_insert)
+        records = [
+            {"username": f"copy{i}_{unique_id}", "email": f"copy{i}_{unique_id}@example.com", "password": "x"}
+            for i in range(3)
+        ]
+        report = client.post("/users/bulk", json=records, headers=gerente_headers).json()
+        assert calls == [3, 2]
+        assert report["inserted"] == 2
+        assert report["errors"] == [{"row": 0, "error": "Username already registered"}]
+
+    def test_bulk_create_email_conflict(self, client, gerente_headers, test_users, unique_id):
+        """
+        Test alta masiva con un email ya registrado.
+        """
+        records = [{"username": f"fresh_{unique_id}", "email": test_users[0].email, "password": "x"}]
+        response = client.post("/users/bulk", json=records, headers=gerente_headers)
+        assert response.json()["errors"] == [{"row": 0, "error": "Email already registered"}]
+
+    def test_bulk_create_requires_gerente(self, client):
+        """
+        Test el alta masiva requiere autenticación.
+        """
+        response = client.post("/users/bulk", json=[])
+        assert response.status_code == 401
+
+
+class TestUserUniqueness:
+    """Tests para la unicidad de username y email al crear y actualizar."""
+
+    def test_create_duplicates(self, client, gerente_headers, test_users, unique_id):
+        """
+        Test el alta con username o email ya registrados devuelve 400.
+        """
+        response = client.post("/users/", json={
+            "username": test_users[0].username, "email": f"new_{unique_id}@example.com", "password": "x"
+        }, headers=gerente_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Username already registered"
+
+        response = client.post("/users/", json={
+            "username": f"new_{unique_id}", "email": test_users[0].email, "password": "x"
+        }, headers=gerente_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Email already registered"
+
+        response = client.post("/users/", json={
+            "username": f"new_{unique_id}", "email": f"new_{unique_id}@example.com", "password": "x"
+        }, headers=gerente_headers)
+        assert response.status_code == 200
+        assert response.json()["username"] == f"new_{unique_id}"
+
+    def test_update_duplicates(self, client, test_users):
+        """
+        Test cambiar a un username o email de otro usuario devuelve 400.
+        """
+        response = client.put(f"/users/{test_users[1].id}", json={"username": test_users[0].username})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Username already registered"
+
+        response = client.put(f"/users/{test_users[1].id}", json={"email": test_users[0].email})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Email already registered"
+
+        response = client.get(f"/users/{test_users[1].id}")
+        assert response.json()["username"] == test_users[1].username
+
+    def test_concurrent_registration(self, test_app, tmp_path, monkeypatch):
+        """
+        Test altas simultáneas del mismo usuario: una se crea y el resto recibe 400, sin 500.
+        """
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/users.db")
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_db():
+            async with factory() as session:
+                yield session
+        monkeypatch.setitem(test_app.dependency_overrides, get_db, override_get_db)
+
+        async def register(count: int):
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            transport = ASGITransport(app=test_app)
+            async with AsyncClient(transport=transport, base_url="http://test") as ac:
+                responses = await asyncio.gather(*(
+                    ac.post(
+                        "/users/",
+                        json={"username": "racer", "email": "racer@example.com", "password": f"pass{i}"},
+                        headers={"Authorization": "Bearer anonymous"},
+                    )
+                    for i in range(count)
+                ))
+            async with factory() as session:
+                users = (await session.execute(select(func.count()).select_from(User))).scalar()
+            await engine.dispose()
+            return [response.status_code for response in responses], users
+
+        statuses, users = asyncio.run(register(6))
+        assert sorted(statuses) == [200, 400, 400, 400, 400, 400]
+        assert users == 1
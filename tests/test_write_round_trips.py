@@ -0,0 +1,123 @@
+"""
+Tests para las sentencias que ejecutan los endpoints de escritura.
+
+Los valores generados (id, created_at, updated_at, contadores) salen del
+INSERT/UPDATE o de los defaults de Python, así que tras el commit no se
+relee la fila.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from catalog import catalog
+
+
+def touching(statements, table: str):
+    """Sentencias que leen o escriben `table`."""
+    return [s for s in statements if f"FROM {table} " in s or f"INTO {table} " in s or s.startswith(f"UPDATE {table} ")]
+
+
+def create_movie(client: TestClient, headers) -> dict:
+    return client.post("/movies/", headers=headers, json={"title": "Round trip", "duration": 90}).json()
+
+
+def create_showtime(client: TestClient, headers, movie_id: int, unique_id: str) -> dict:
+    start = datetime.now() + timedelta(days=500)
+    return client.post("/showtimes/", headers=headers, json={
+        "movie_id": movie_id, "theater": f"Sala writes {unique_id}", "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=2)).isoformat(), "available_seats": 10, "price": 700,
+    }).json()
+
+
+class TestWriteRoundTrips:
+    """Tests para create/update de películas, horarios y reservas."""
+
+    def test_movie_writes(self, client: TestClient, gerente_headers, captured_statements):
+        """
+        Test crear y actualizar una película no relee la fila tras el commit.
+        """
+        with captured_statements() as created:
+            movie = create_movie(client, gerente_headers)
+        with captured_statements() as updated:
+            response = client.put(f"/movies/{movie['id']}", headers=gerente_headers, json={"title": "Renamed"})
+
+        assert movie["id"] and movie["created_at"] and movie["updated_at"]
+        assert response.json()["title"] == "Renamed"
+        assert response.json()["updated_at"] >= movie["updated_at"]
+        assert created[-1] == updated[-1] == "COMMIT"
+        assert [s.split(" (")[0] for s in touching(created, "movies")] == ["INSERT INTO movies"]
+        # La carga por id del handler y el UPDATE
+        assert len(touching(updated, "movies")) == 2
+
+    def test_movie_writes_with_snapshot(self, client: TestClient, gerente_headers, session_factory, captured_statements):
+        """
+        Test con la instantánea del catálogo cargada las escrituras tampoco consultan tras el commit.
+        """
+        async def load():
+            async with session_factory() as session:
+                await catalog.refresh(session)
+        asyncio.run(load())
+
+        with captured_statements() as created:
+            movie = create_movie(client, gerente_headers)
+        with captured_statements() as updated:
+            client.put(f"/movies/{movie['id']}", headers=gerente_headers, json={"title": "Renamed"})
+        assert catalog.get(movie["id"]).title == "Renamed"
+        with captured_statements() as deleted:
+            client.delete(f"/movies/{movie['id']}", headers=gerente_headers)
+
+        assert created[-1] == updated[-1] == deleted[-1] == "COMMIT"
+        assert catalog.get(movie["id"]) is None
+
+    def test_showtime_writes(self, client: TestClient, gerente_headers, unique_id, captured_statements):
+        """
+        Test crear un horario es un INSERT y actualizarlo, capacidad incluida, un UPDATE ... RETURNING.
+        """
+        movie = create_movie(client, gerente_headers)
+        with captured_statements() as created:
+            showtime = create_showtime(client, gerente_headers, movie["id"], unique_id)
+        with captured_statements() as updated:
+            response = client.put(f"/showtimes/{showtime['id']}", headers=gerente_headers, json={"capacity": 25, "price": 800})
+
+        assert showtime["id"] and showtime["created_at"] and showtime["seats_sold"] == 0
+        assert response.json()["capacity"] == 25
+        assert response.json()["available_seats"] == 25
+        assert response.json()["price"] == 800
+        assert created[-1] == updated[-1] == "COMMIT"
+        assert len([s for s in touching(created, "showtimes") if s.startswith("INSERT")]) == 1
+        writes = [s for s in touching(updated, "showtimes") if s.startswith("UPDATE")]
+        assert len(writes) == 1 and "RETURNING" in writes[0]
+        assert len(touching(updated, "showtimes")) == 2
+
+    def test_showtime_update_rejects_capacity_below_sold(self, client: TestClient, gerente_headers, cliente_user, unique_id):
+        """
+        Test la capacidad no puede bajar de los asientos vendidos y el horario queda intacto.
+        """
+        showtime = create_showtime(client, gerente_headers, create_movie(client, gerente_headers)["id"], unique_id)
+        client.post("/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime["id"], "seats_booked": 4})
+        response = client.put(f"/showtimes/{showtime['id']}", headers=gerente_headers, json={"capacity": 3, "price": 1})
+        assert response.status_code == 400
+        current = client.get(f"/showtimes/{showtime['id']}").json()
+        assert (current["capacity"], current["seats_sold"], current["price"]) == (10, 4, 700)
+
+    def test_booking_writes(self, client: TestClient, gerente_headers, cliente_user, unique_id, captured_statements):
+        """
+        Test crear y actualizar una reserva no relee la fila tras el commit.
+        """
+        showtime = create_showtime(client, gerente_headers, create_movie(client, gerente_headers)["id"], unique_id)
+        with captured_statements() as created:
+            booking = client.post(
+                "/bookings/", json={"user_id": cliente_user.id, "showtime_id": showtime["id"], "seats_booked": 2}
+            ).json()
+        with captured_statements() as updated:
+            response = client.put(f"/bookings/{booking['id']}", headers=gerente_headers, json={"status": "confirmed"})
+
+        assert booking["id"] and booking["booking_time"] and booking["status"] == "pending"
+        assert booking["total_price"] == 1400
+        assert response.json()["status"] == "confirmed"
+        assert created[-1] == updated[-1] == "COMMIT"
+        assert [s.split(" (")[0] for s in touching(created, "bookings")] == ["INSERT INTO bookings"]
+        # La carga de la reserva y el UPDATE
+        assert len(touching(updated, "bookings")) == 2
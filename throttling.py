@@ -0,0 +1,174 @@
+"""
+Límites de intentos de login para el Sistema de Gestión de Cine.
+
+Cuenta los fallos por IP y por nombre de usuario en ventanas deslizantes
+(aproximadas con dos ventanas fijas ponderadas, O(1) por clave) y rechaza el
+login antes de hacer ningún trabajo de bcrypt. El almacenamiento es
+intercambiable: en memoria (por proceso) o compartido en Redis para que
+todos los workers vean los mismos contadores.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from metrics import Counter
+
+# Configuración
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "memory")  # "memory" o "redis://..."
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "50"))
+LOGIN_IP_WINDOW_SECONDS = float(os.getenv("LOGIN_IP_WINDOW_SECONDS", "300"))
+LOGIN_MAX_FAILURES_PER_USER = int(os.getenv("LOGIN_MAX_FAILURES_PER_USER", "10"))
+LOGIN_USER_WINDOW_SECONDS = float(os.getenv("LOGIN_USER_WINDOW_SECONDS", "300"))
+# Claves máximas en memoria; al superarlas se descartan las usadas hace más tiempo
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+
+login_rejections = Counter("login_rejections_total", "Intentos de login rechazados sin verificar la contraseña")
+login_attempts = Counter("login_attempts_total", "Intentos de login verificados por resultado")
+
+
+def _weighted(previous: float, current: float, now: float, window: float) -> float:
+    """Estimación de la ventana deslizante a partir de dos ventanas fijas."""
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+class RateLimitBackend:
+    """Almacén de contadores por ventana fija. `window` en segundos."""
+
+    async def count(self, key: str, window: float) -> float:
+        """Eventos estimados en la última ventana deslizante."""
+        raise NotImplementedError
+
+    async def hit(self, key: str, window: float):
+        raise NotImplementedError
+
+    async def reset(self, key: str, window: float):
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Contadores en memoria del proceso.
+
+    Como mucho `max_keys` claves, en orden de último uso: cada evento nuevo
+    que excede el límite descarta la clave usada hace más tiempo (O(1)).
+    """
+
+    def __init__(self, max_keys: int = LOGIN_THROTTLE_MAX_KEYS):
+        self.max_keys = max_keys
+        # clave -> [índice de la ventana actual, cuenta anterior, cuenta actual]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def _bucket(self, key: str, window: float, now: float) -> List[float]:
+        index = int(now // window)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return [index, 0, 0]
+        if bucket[0] == index:
+            return bucket
+        previous = bucket[2] if bucket[0] == index - 1 else 0
+        return [index, previous, 0]
+
+    async def count(self, key: str, window: float) -> float:
+        now = time.time()
+        _, previous, current = self._bucket(key, window, now)
+        return _weighted(previous, current, now, window)
+
+    async def hit(self, key: str, window: float):
+        now = time.time()
+        bucket = self._bucket(key, window, now)
+        bucket[2] += 1
+        self._buckets[key] = bucket
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    async def reset(self, key: str, window: float):
+        self._buckets.pop(key, None)
+
+
+class RedisBackend(RateLimitBackend):
+    """Contadores compartidos en Redis (requiere el paquete `redis`)."""
+
+    def __init__(self, url: str, prefix: str = "login-throttle"):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RedisBackend requires the 'redis' package") from e
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    def _keys(self, key: str, window: float, now: float) -> Tuple[str, str]:
+        index = int(now // window)
+        return f"{self.prefix}:{key}:{index - 1}", f"{self.prefix}:{key}:{index}"
+
+    async def count(self, key: str, window: float) -> float:
+        now = time.time()
+        previous, current = await self.client.mget(self._keys(key, window, now))
+        return _weighted(int(previous or 0), int(current or 0), now, window)
+
+    async def hit(self, key: str, window: float):
+        _, current = self._keys(key, window, time.time())
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.incr(current)
+            pipe.expire(current, int(window * 2) + 1)
+            await pipe.execute()
+
+    async def reset(self, key: str, window: float):
+        # Solo las dos ventanas que lee `count`; las anteriores ya no cuentan y caducan solas
+        await self.client.delete(*self._keys(key, window, time.time()))
+
+
+def backend_from_url(url: str) -> RateLimitBackend:
+    """Crea el almacén a partir de LOGIN_THROTTLE_BACKEND."""
+    if url == "memory":
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unknown login throttle backend: {url}")
+
+
+class LoginThrottle:
+    """Límites de fallos de login por IP y por usuario."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        max_failures_per_ip: int = LOGIN_MAX_FAILURES_PER_IP,
+        ip_window: float = LOGIN_IP_WINDOW_SECONDS,
+        max_failures_per_user: int = LOGIN_MAX_FAILURES_PER_USER,
+        user_window: float = LOGIN_USER_WINDOW_SECONDS,
+    ):
+        self.backend = backend
+        self.max_failures_per_ip = max_failures_per_ip
+        self.ip_window = ip_window
+        self.max_failures_per_user = max_failures_per_user
+        self.user_window = user_window
+
+    async def check(self, username: str, ip: str) -> Optional[float]:
+        """
+        Devuelve los segundos a esperar si el intento debe rechazarse, o None.
+
+        Solo lee contadores; no hace ningún trabajo de hashing.
+        """
+        if await self.backend.count(f"ip:{ip}", self.ip_window) >= self.max_failures_per_ip:
+            login_rejections.inc(reason="ip")
+            return self.ip_window
+        if await self.backend.count(f"user:{username.lower()}", self.user_window) >= self.max_failures_per_user:
+            login_rejections.inc(reason="username")
+            return self.user_window
+        return None
+
+    async def record_failure(self, username: str, ip: str):
+        login_attempts.inc(outcome="failure")
+        await self.backend.hit(f"ip:{ip}", self.ip_window)
+        await self.backend.hit(f"user:{username.lower()}", self.user_window)
+
+    async def record_success(self, username: str):
+        login_attempts.inc(outcome="success")
+        await self.backend.reset(f"user:{username.lower()}", self.user_window)
+
+
+login_throttle = LoginThrottle(backend_from_url(LOGIN_THROTTLE_BACKEND))
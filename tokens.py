@@ -0,0 +1,212 @@
+"""
+Tokens de refresco y revocación para el Sistema de Gestión de Cine.
+
+Los tokens de acceso duran poco (ACCESS_TOKEN_EXPIRE_MINUTES) y llevan un
+`jti` y la familia de refresco (`fam`). Revocar añade esos ids a la tabla
+`revoked_tokens`; cada proceso mantiene una copia en memoria que sincroniza
+periódicamente, de modo que validar un token no consulta la base de datos.
+Las entradas caducan cuando ya no puede quedar ningún token de acceso vivo
+que las use, así que la lista se mantiene pequeña.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from jobs import job
+from metrics import Counter, Gauge
+from models import RefreshToken, RevokedToken
+
+logger = logging.getLogger(__name__)
+
+ACCESS_TOKEN_EXPIRE_MINUTES = float(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+TOKEN_DENYLIST_SYNC_SECONDS = float(os.getenv("TOKEN_DENYLIST_SYNC_SECONDS", "5"))
+
+refresh_reuse_detected = Counter("refresh_token_reuse_total", "Tokens de refresco rotados presentados de nuevo")
+tokens_revoked = Counter("tokens_revoked_total", "Ids de token revocados")
+denylist_size = Gauge("token_denylist_size", "Ids revocados en la lista en memoria")
+
+
+class InvalidRefreshToken(Exception):
+    """Token de refresco inexistente, caducado o revocado."""
+
+
+class RefreshTokenReuse(InvalidRefreshToken):
+    """Se presentó un token ya rotado: la familia queda revocada."""
+
+
+def new_token_id() -> str:
+    return secrets.token_hex(16)
+
+
+def hash_token(raw: str) -> str:
+    """Hash del token de refresco; basta SHA-256 porque el token es aleatorio de 256 bits."""
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class TokenDenylist:
+    """Ids revocados en memoria, con su caducidad (timestamp)."""
+
+    def __init__(self):
+        self._ids: Dict[str, float] = {}
+        self._cursor: Optional[datetime] = None
+
+    def __contains__(self, token_id: Optional[str]) -> bool:
+        return token_id is not None and token_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def is_revoked(self, payload: dict) -> bool:
+        """Comprueba el `jti` y la familia de un token de acceso ya decodificado."""
+        return payload.get("jti") in self or payload.get("fam") in self
+
+    def add(self, token_id: str, expires_at: datetime):
+        self._ids[token_id] = expires_at.timestamp()
+
+    def _prune(self):
+        now = time.time()
+        self._ids = {token_id: exp for token_id, exp in self._ids.items() if exp > now}
+
+    async def sync(self, db: AsyncSession):
+        """Carga las revocaciones nuevas desde la última sincronización."""
+        now = datetime.utcnow()
+        stmt = select(RevokedToken.id, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+            RevokedToken.expires_at > now
+        )
+        if self._cursor is not None:
+            # Margen por relojes y transacciones que confirman tarde
+            stmt = stmt.where(RevokedToken.revoked_at >= self._cursor - timedelta(seconds=TOKEN_DENYLIST_SYNC_SECONDS))
+        result = await db.execute(stmt)
+        for token_id, expires_at, revoked_at in result.all():
+            self.add(token_id, expires_at)
+        self._cursor = now
+        self._prune()
+        denylist_size.set(len(self._ids))
+
+
+token_denylist = TokenDenylist()
+
+
+async def revoke_ids(db: AsyncSession, *token_ids: str):
+    """
+    Revoca ids de tokens de acceso (jti o familia) en la transacción actual.
+
+    Basta guardarlos mientras pueda existir un token de acceso que los lleve.
+    """
+    expires_at = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    for token_id in token_ids:
+        await db.merge(RevokedToken(id=token_id, revoked_at=datetime.utcnow(), expires_at=expires_at))
+        token_denylist.add(token_id, expires_at)
+    tokens_revoked.inc(len(token_ids))
+
+
+async def issue_refresh_token(db: AsyncSession, user_id: int, family_id: Optional[str] = None) -> Tuple[str, str]:
+    """Crea un token de refresco (nueva familia si no se indica). Devuelve `(token, familia)`."""
+    raw = secrets.token_urlsafe(32)
+    family_id = family_id or new_token_id()
+    db.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id,
+        token_hash=hash_token(raw),
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return raw, family_id
+
+
+async def revoke_family(db: AsyncSession, family_id: str):
+    """Revoca todos los tokens de refresco de la familia y sus tokens de acceso."""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    await revoke_ids(db, family_id)
+
+
+async def rotate_refresh_token(db: AsyncSession, raw: str) -> Tuple[int, str, str]:
+    """
+    Canjea un token de refresco por otro de la misma familia.
+
+    Devuelve `(user_id, token nuevo, familia)`. La rotación es un UPDATE
+    condicional, así que dos canjes concurrentes del mismo token no pueden
+    tener éxito ambos; el perdedor se trata como reutilización. Los errores
+    se lanzan después de confirmar la revocación.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == hash_token(raw)))
+    token = result.scalars().first()
+    if token is None or token.expires_at <= now:
+        raise InvalidRefreshToken()
+    if token.revoked_at is not None:
+        raise InvalidRefreshToken()
+
+    rotated = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == token.id, RefreshToken.rotated_at.is_(None), RefreshToken.revoked_at.is_(None))
+        .values(rotated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if rotated.rowcount == 0:
+        refresh_reuse_detected.inc()
+        logger.warning("Refresh token reuse detected for user %s (family %s)", token.user_id, token.family_id)
+        await revoke_family(db, token.family_id)
+        await db.commit()
+        raise RefreshTokenReuse()
+
+    new_raw, family_id = await issue_refresh_token(db, token.user_id, token.family_id)
+    return token.user_id, new_raw, family_id
+
+
+class DenylistSync:
+    """Sincroniza `token_denylist` con la tabla de revocaciones cada pocos segundos."""
+
+    def __init__(self, session_factory, interval: float = TOKEN_DENYLIST_SYNC_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                async with self.session_factory() as session:
+                    await token_denylist.sync(session)
+            except Exception:
+                logger.exception("Token denylist sync failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._stopping.set()
+
+
+async def prune_tokens(db: AsyncSession) -> int:
+    """Elimina revocaciones caducadas y tokens de refresco caducados."""
+    now = datetime.utcnow()
+    revoked = await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+    refresh = await db.execute(
+        delete(RefreshToken).where(or_(
+            RefreshToken.expires_at <= now,
+            RefreshToken.revoked_at <= now - timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+    )
+    await db.commit()
+    return revoked.rowcount + refresh.rowcount
+
+
+@job("auth.prune_tokens")
+async def prune_tokens_job(db: AsyncSession, payload: dict):
+    """Trabajo en segundo plano para purgar tokens caducados."""
+    await prune_tokens(db)